@@ -0,0 +1,210 @@
+# analytics.py
+"""
+Incremental analytics rollups for Dynamic AI Chatbot
+The Analytics table (model_database.py) is updated as turns are persisted,
+in the same transaction as the messages themselves (see message_writer.py):
+each batch is folded into a delta per rollup row and merged into the stored
+row, so the messages table is never rescanned.
+
+Rollup rows per session:
+- period "session": the whole conversation, dated at the session start
+- period ANALYTICS_BUCKET ("hour" or "day"): one row per bucket with activity
+
+Reading a session's rollup is an index lookup on (session_id, period, date).
+"""
+
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import and_, or_, select
+
+from model_database import Analytics, Session as ChatSession
+from history import owned_by
+
+# -------- CONFIGURATION --------
+ANALYTICS_BUCKET = os.getenv("ANALYTICS_BUCKET", "hour")  # hour | day
+ANALYTICS_MAX_BUCKETS = int(os.getenv("ANALYTICS_MAX_BUCKETS", "168"))  # most buckets one read returns
+
+SESSION = "session"
+BUCKETS = ("hour", "day")
+if ANALYTICS_BUCKET not in BUCKETS:
+    raise ValueError(f"Unknown ANALYTICS_BUCKET: {ANALYTICS_BUCKET}")
+
+
+def bucket_start(timestamp: datetime, bucket: str = ANALYTICS_BUCKET) -> datetime:
+    if bucket == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def _running_mean(mean: Optional[float], count: int, added_sum: float, added_count: int) -> Optional[float]:
+    """Mean over count + added_count values, from the old mean and the sum of the new ones"""
+    if not added_count:
+        return mean
+    return ((mean or 0.0) * count + added_sum) / (count + added_count)
+
+
+class RollupDelta:
+    """What one batch adds to one rollup row"""
+
+    __slots__ = ("user", "bot", "rt_sum", "rt_count", "rt_min", "rt_max", "sentiments",
+                 "score_sum", "intents", "length_sum", "first_at", "last_at")
+
+    def __init__(self):
+        self.user = 0
+        self.bot = 0
+        self.rt_sum = 0
+        self.rt_count = 0
+        self.rt_min = None
+        self.rt_max = None
+        self.sentiments = Counter()
+        self.score_sum = 0.0
+        self.intents = Counter()
+        self.length_sum = 0
+        self.first_at = None
+        self.last_at = None
+
+    def add(self, turn):
+        """Fold in one turn (message_writer.Turn): a user message and the bot reply"""
+        self.user += 1
+        self.bot += 1
+        self.length_sum += len(turn.message) + len(turn.response)
+        if turn.sentiment:
+            self.sentiments[turn.sentiment] += 1
+        self.score_sum += turn.sentiment_score or 0.0
+        if turn.intent:
+            self.intents[turn.intent] += 1
+        if turn.response_time is not None:
+            self.rt_sum += turn.response_time
+            self.rt_count += 1
+            self.rt_min = turn.response_time if self.rt_min is None else min(self.rt_min, turn.response_time)
+            self.rt_max = turn.response_time if self.rt_max is None else max(self.rt_max, turn.response_time)
+        self.first_at = turn.timestamp if self.first_at is None else min(self.first_at, turn.timestamp)
+        self.last_at = turn.responded_at if self.last_at is None else max(self.last_at, turn.responded_at)
+
+    def apply(self, row: Analytics):
+        """Merge into a stored row; averages are weighted by the row's existing counts"""
+        user, bot = row.user_messages or 0, row.bot_messages or 0
+        total = row.total_messages or 0
+
+        row.avg_response_time = _running_mean(row.avg_response_time, bot, self.rt_sum, self.rt_count)
+        if self.rt_count:
+            row.min_response_time = self.rt_min if row.min_response_time is None else min(row.min_response_time, self.rt_min)
+            row.max_response_time = self.rt_max if row.max_response_time is None else max(row.max_response_time, self.rt_max)
+
+        row.avg_sentiment_score = _running_mean(row.avg_sentiment_score, user, self.score_sum, self.user)
+        row.positive_sentiment_count = (row.positive_sentiment_count or 0) + self.sentiments["positive"]
+        row.negative_sentiment_count = (row.negative_sentiment_count or 0) + self.sentiments["negative"]
+        row.neutral_sentiment_count = (row.neutral_sentiment_count or 0) + self.sentiments["neutral"]
+
+        intents = Counter(row.intent_distribution or {})
+        intents.update(self.intents)
+        row.intent_distribution = dict(intents)  # a new object, so the JSON column is marked dirty
+
+        row.avg_message_length = _running_mean(row.avg_message_length, total, self.length_sum, self.user + self.bot)
+        row.user_messages = user + self.user
+        row.bot_messages = bot + self.bot
+        row.total_messages = total + self.user + self.bot
+        if row.period == SESSION:
+            row.conversation_duration = int((self.last_at - row.date).total_seconds())
+
+
+def update_rollups(db, turns: Sequence, session_pks: Sequence[int], bucket: str = ANALYTICS_BUCKET):
+    """
+    Fold a batch of persisted turns into the session and bucket rollups
+    `session_pks` holds the sessions.id each turn was stored under.
+    Runs inside the caller's transaction; existing rows are locked (FOR UPDATE)
+    so concurrent writers merge into them one after another.
+    """
+    deltas: Dict[tuple, RollupDelta] = {}
+    for turn, session_pk in zip(turns, session_pks):
+        deltas.setdefault((session_pk, SESSION), RollupDelta()).add(turn)
+        deltas.setdefault((session_pk, bucket, bucket_start(turn.timestamp, bucket)), RollupDelta()).add(turn)
+
+    touched = {key[0] for key in deltas}
+    dates = {key[2] for key in deltas if key[1] != SESSION}
+    rows = db.scalars(
+        select(Analytics)
+        .where(Analytics.session_id.in_(touched))
+        .where(or_(Analytics.period == SESSION, and_(Analytics.period == bucket, Analytics.date.in_(dates))))
+        .with_for_update()
+    ).all()
+    existing = {}
+    for row in rows:
+        key = (row.session_id, SESSION) if row.period == SESSION else (row.session_id, row.period, row.date)
+        existing[key] = row
+
+    for key, delta in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            row = Analytics(
+                session_id=key[0],
+                period=key[1],
+                date=delta.first_at if key[1] == SESSION else key[2],
+                total_messages=0, user_messages=0, bot_messages=0,
+                positive_sentiment_count=0, negative_sentiment_count=0, neutral_sentiment_count=0
+            )
+            db.add(row)
+        delta.apply(row)
+    db.flush()
+
+
+# -------- READ --------
+
+def _metrics(row: Analytics) -> Dict:
+    return {
+        "total_messages": row.total_messages,
+        "user_messages": row.user_messages,
+        "bot_messages": row.bot_messages,
+        "response_time": {
+            "avg": round(row.avg_response_time, 1) if row.avg_response_time is not None else None,
+            "min": row.min_response_time,
+            "max": row.max_response_time
+        },
+        "sentiment": {
+            "positive": row.positive_sentiment_count,
+            "negative": row.negative_sentiment_count,
+            "neutral": row.neutral_sentiment_count,
+            "avg_score": round(row.avg_sentiment_score or 0.0, 3)
+        },
+        "intents": row.intent_distribution or {},
+        "avg_message_length": round(row.avg_message_length, 1) if row.avg_message_length is not None else None
+    }
+
+
+async def session_analytics(db, session_id: str, owner: Optional[str], buckets: int = 24,
+                            bucket: str = ANALYTICS_BUCKET) -> Optional[Dict]:
+    """
+    Rollup for one session (AsyncSession) with its latest `buckets` buckets,
+    newest first; None if the session has no persisted turns or does not
+    belong to `owner` (an account email; None skips the check)
+    """
+    session_pk = select(ChatSession.id).where(ChatSession.session_id == session_id)
+    if owner is not None:
+        session_pk = session_pk.where(owned_by(owner))
+    session_pk = session_pk.scalar_subquery()
+    session_row = await db.scalar(
+        select(Analytics).where(Analytics.session_id == session_pk, Analytics.period == SESSION)
+    )
+    if session_row is None:
+        return None
+
+    bucket_rows = []
+    if buckets > 0:
+        bucket_rows = (await db.scalars(
+            select(Analytics)
+            .where(Analytics.session_id == session_row.session_id, Analytics.period == bucket)
+            .order_by(Analytics.date.desc())
+            .limit(min(buckets, ANALYTICS_MAX_BUCKETS))
+        )).all()
+
+    return {
+        "session_id": session_id,
+        "started_at": session_row.date.isoformat(),
+        "conversation_duration": session_row.conversation_duration,
+        **_metrics(session_row),
+        "bucket": bucket,
+        "buckets": [{"start": row.date.isoformat(), **_metrics(row)} for row in bucket_rows]
+    }
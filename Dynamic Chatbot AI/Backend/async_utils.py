@@ -0,0 +1,64 @@
+# async_utils.py
+"""
+Helpers for driving blocking code from the asyncio event loop
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator, Iterable
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def iterate_in_thread(iterable: Iterable, buffer_size: int = 64, executor=None) -> AsyncIterator:
+    """
+    Consume a blocking iterator on a worker thread and yield its items
+
+    At most `buffer_size` items are buffered; when the consumer is slow the
+    worker thread waits, so backpressure reaches the producer. If the consumer
+    stops early the worker stops too and the iterator is closed.
+    """
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue()
+    slots = threading.Semaphore(buffer_size)
+    cancelled = threading.Event()
+
+    def deliver(item):
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, item)
+        except RuntimeError:
+            cancelled.set()  # event loop already closed
+
+    def pump():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                slots.acquire()
+                if cancelled.is_set():
+                    return
+                deliver(item)
+        except BaseException as e:
+            deliver(_Failure(e))
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+            deliver(_DONE)
+
+    loop.run_in_executor(executor, pump)
+    try:
+        while True:
+            item = await items.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            slots.release()
+            yield item
+    finally:
+        cancelled.set()
+        slots.release()  # wake the worker if it is waiting for a slot
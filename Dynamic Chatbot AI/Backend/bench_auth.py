@@ -0,0 +1,128 @@
+# bench_auth.py
+"""
+Login throughput benchmark: blocking SQLAlchemy vs the async engine
+Serves the previous synchronous /api/login handler and the current async
+one from one uvicorn server process and hits both with concurrent clients
+from this process. Uses DATABASE_URL, or a throwaway SQLite file when it
+is not set.
+
+Usage:
+    python bench_auth.py --requests 2000 --concurrency 64 [--db-only]
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_auth.db')}"
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.orm import Session
+
+from auth import hash_password, verify_password
+from database import SessionLocal, engine, get_db
+from jwt_utils import create_access_token
+from models import Base, User
+from main import LoginRequest, login_user
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+app = FastAPI()
+app.post("/async/login")(login_user)
+
+
+@app.post("/sync/login")
+def legacy_login_user(request: LoginRequest, db: Session = Depends(get_db)):
+    """The handler as it was before the async engine: runs in FastAPI's thread pool"""
+    user = db.query(User).filter(User.email == request.email).first()
+    if not user or not verify_password(request.password, user.hashed_password):
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    return {"access_token": create_access_token({"sub": user.email}), "token_type": "bearer"}
+
+
+def ensure_user():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.email == EMAIL).first():
+            db.add(User(email=EMAIL, hashed_password=hash_password(PASSWORD)))
+            db.commit()
+    finally:
+        db.close()
+
+
+def start_server() -> tuple:
+    """Run this module's app under uvicorn in its own process, so the client does not share its GIL"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "bench_auth:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(600):
+        try:
+            httpx.get(url + "/docs")
+            return server, url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def run(url: str, total: int, concurrency: int, db_only: bool) -> tuple:
+    """Send `total` logins from `concurrency` clients, return (requests/second, p95 ms)"""
+    latencies = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        async def worker(count: int):
+            for i in range(count):
+                # --db-only logs in as unknown users: no password hashing, only the lookup
+                email = f"missing{i}@example.com" if db_only else EMAIL
+                start = time.perf_counter()
+                response = await client.post("/login", json={"email": email, "password": PASSWORD})
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == (401 if db_only else 200), response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return len(latencies) / elapsed, latencies[int(len(latencies) * 0.95)] * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark login throughput, sync vs async DB")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--db-only", action="store_true", help="unknown users: measure the query path only")
+    args = parser.parse_args()
+
+    ensure_user()
+    server, url = start_server()
+
+    print("=" * 60)
+    print("Login Throughput Benchmark")
+    print("=" * 60)
+    print(f"Database: {engine.url.get_backend_name()}   Requests: {args.requests}   "
+          f"Concurrency: {args.concurrency}{'   (db only)' if args.db_only else ''}")
+
+    for label, prefix in [("Sync engine (thread pool)", "/sync"), ("Async engine", "/async")]:
+        asyncio.run(run(url + prefix, args.concurrency, args.concurrency, args.db_only))  # warm up
+        rps, p95 = asyncio.run(run(url + prefix, args.requests, args.concurrency, args.db_only))
+        print(f"\n{label:28} {rps:8.1f} req/s   p95 {p95:7.1f} ms")
+
+    server.terminate()
+    server.wait()
+    print("=" * 60)
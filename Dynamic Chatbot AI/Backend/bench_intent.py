@@ -0,0 +1,81 @@
+# bench_intent.py
+"""
+Benchmark: intent recognition with a substring test per keyword vs. the
+keyword -> intent inverted index (intent_index.py)
+
+Usage:
+    python bench_intent.py --intents 300 --keywords 10
+"""
+
+import time
+import random
+import argparse
+
+from intent_index import IntentIndex
+
+MESSAGES = [
+    "Hello! Can you help me book an appointment for tomorrow?",
+    "This product is terrible and not working, I want to file a complaint",
+    "Thanks a lot, that explanation about neural networks was really helpful",
+    "What is the difference between a cache and an index?",
+]
+
+
+def make_patterns(intents: int, keywords: int):
+    rng = random.Random(3)
+    words = [f"word{i}" for i in range(intents * keywords)]
+    patterns = {}
+    for i in range(intents):
+        chosen = rng.sample(words, keywords)
+        # a few phrases, like "good morning" / "not working"
+        chosen[0] = f"{chosen[0]} {rng.choice(words)}"
+        patterns[f"intent{i}"] = {"keywords": chosen, "weight": 1.0}
+    patterns["greeting"] = {"keywords": ["hello", "hi", "good morning"], "weight": 1.0}
+    patterns["complaint"] = {"keywords": ["complaint", "not working", "terrible"], "weight": 0.9}
+    return patterns
+
+
+def substring_intent(patterns, text: str):
+    """The previous NLPService.recognize_intent loop"""
+    text_lower = text.lower()
+    scores = {}
+    for intent, data in patterns.items():
+        score = sum(1 for keyword in data["keywords"] if keyword in text_lower)
+        if score:
+            scores[intent] = score / len(data["keywords"]) * data["weight"]
+    if scores:
+        best = max(scores, key=scores.get)
+        return best, min(scores[best], 1.0)
+    return None
+
+
+def timed(func, rounds: int) -> float:
+    for message in MESSAGES:
+        func(message)  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in MESSAGES:
+            func(message)
+    return (time.perf_counter() - start) / (rounds * len(MESSAGES)) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark intent recognition")
+    parser.add_argument("--intents", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--keywords", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Intent recognition benchmark ({args.keywords} keywords per intent)")
+    print("=" * 60)
+    print(f"{'intents':>8} {'keywords':>9} {'substring µs':>13} {'index µs':>9} {'speedup':>8}")
+    for intents in args.intents:
+        patterns = make_patterns(intents, args.keywords)
+        index = IntentIndex(patterns)
+        keyword_count = sum(len(data["keywords"]) for data in patterns.values())
+        substring_us = timed(lambda text: substring_intent(patterns, text), args.rounds)
+        index_us = timed(index.best, args.rounds)
+        print(f"{len(patterns):>8} {keyword_count:>9} {substring_us:>13.1f} {index_us:>9.1f} "
+              f"{substring_us / index_us:>7.1f}x")
+    print("=" * 60)
@@ -0,0 +1,104 @@
+# bench_knowledge_base.py
+"""
+Benchmark: knowledge base load time, memory and lookup latency vs. size
+Generates synthetic JSON knowledge files in a temp directory.
+
+Usage:
+    python bench_knowledge_base.py --sizes 1000 10000 100000
+"""
+
+import os
+import gc
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+from knowledge_base import KnowledgeBase
+from text_matcher import AhoCorasick, WORD
+
+WORDS = ["neural", "network", "deep", "learning", "model", "data", "vector", "graph",
+         "cloud", "python", "token", "search", "index", "cache", "stream", "query"]
+
+# A larger vocabulary so term frequencies look more like real text
+VOCABULARY = WORDS + [f"term{i}" for i in range(20000)]
+
+
+def topic_matcher(topics):
+    matcher = AhoCorasick()
+    for priority, topic in enumerate(topics):
+        matcher.add(topic, priority, WORD)
+    matcher.build()
+    return matcher
+
+
+def write_knowledge(directory: str, size: int, per_file: int = 10000):
+    rng = random.Random(size)
+    for start in range(0, size, per_file):
+        entries = []
+        for i in range(start, min(start + per_file, size)):
+            topic = f"{rng.choice(WORDS)} {rng.choice(VOCABULARY)} {i}"
+            details = ", ".join(rng.choice(VOCABULARY) for _ in range(8))
+            entries.append({
+                "topic": topic,
+                "answer": f"{topic.title()} is a synthetic entry.\n\nIt covers {details}."
+            })
+        with open(os.path.join(directory, f"kb_{start:07d}.json"), "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+
+
+def bench(size: int, queries: int = 2000):
+    with tempfile.TemporaryDirectory() as directory:
+        write_knowledge(directory, size)
+
+        start = time.perf_counter()
+        kb = KnowledgeBase(directory, matcher_factory=topic_matcher)
+        load_s = time.perf_counter() - start
+        del kb
+
+        # Second load under tracemalloc, which slows loading down a lot
+        gc.collect()
+        tracemalloc.start()
+        kb = KnowledgeBase(directory, matcher_factory=topic_matcher)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        index = kb.index
+        rng = random.Random(1)
+        messages = [
+            f"tell me about {index.topics[rng.randrange(len(index))]} please" for _ in range(queries)
+        ]
+
+        start = time.perf_counter()
+        for message in messages:
+            match = index.matcher.search(message)
+            index.get(match.pattern).short
+        lookup_us = (time.perf_counter() - start) / queries * 1e6
+
+        paraphrases = [
+            f"how does a {rng.choice(WORDS)} {rng.choice(VOCABULARY)} work" for _ in range(queries)
+        ]
+        start = time.perf_counter()
+        for message in paraphrases:
+            index.search.best(message)
+        search_us = (time.perf_counter() - start) / queries * 1e6
+
+    return load_s, memory, lookup_us, search_us
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the knowledge base index")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Knowledge Base Benchmark")
+    print("=" * 60)
+    print(f"{'entries':>10} {'load s':>8} {'memory MB':>10} {'bytes/entry':>12} {'lookup µs':>10} {'bm25 µs':>9}")
+    for size in args.sizes:
+        load_s, memory, lookup_us, search_us = bench(size)
+        print(f"{size:>10} {load_s:>8.2f} {memory / 1e6:>10.1f} {memory / size:>12.0f} "
+              f"{lookup_us:>10.1f} {search_us:>9.1f}")
+    print("=" * 60)
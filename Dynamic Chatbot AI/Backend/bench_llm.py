@@ -0,0 +1,57 @@
+# bench_llm.py
+"""
+Throughput benchmark for the pooled Ollama client
+Runs against the local Ollama stub, so no model is needed.
+
+Usage:
+    python bench_llm.py --requests 2000 --concurrency 16
+"""
+
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_client import OllamaClient
+from ollama_stub import start_in_background
+
+
+def run(client_factory, total: int, concurrency: int) -> float:
+    """Send `total` prompts from `concurrency` threads, return requests/second"""
+    def one(i):
+        client = client_factory()
+        client.generate(f"User: benchmark question {i}\nAssistant:")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    return total / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pooled Ollama client")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--first-token-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_in_background(port=0, first_token_delay=args.first_token_delay)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print("=" * 60)
+    print("Ollama Client Benchmark (stub server)")
+    print("=" * 60)
+    print(f"Requests: {args.requests}   Concurrency: {args.concurrency}")
+
+    # Baseline: a brand new connection for every request
+    fresh = run(lambda: OllamaClient(base_url=url, pool_size=1), args.requests, args.concurrency)
+    print(f"\nNew connection per request: {fresh:8.1f} req/s")
+
+    # Pooled keep-alive connections shared by every thread
+    pooled_client = OllamaClient(base_url=url, pool_size=args.concurrency)
+    pooled = run(lambda: pooled_client, args.requests, args.concurrency)
+    print(f"Pooled keep-alive client:   {pooled:8.1f} req/s")
+    print(f"Speedup: {pooled / fresh:.2f}x")
+    print(f"Pool stats: {pooled_client.stats()}")
+
+    server.shutdown()
+    print("=" * 60)
@@ -0,0 +1,61 @@
+# bench_nlp.py
+"""
+Benchmark: NLPService.process_message one text at a time vs. process_batch
+(spaCy nlp.pipe, optionally with several worker processes)
+
+Usage:
+    python bench_nlp.py --texts 2000 --processes 1 2 4
+"""
+
+import time
+import random
+import argparse
+
+from nlp_service import NLPService
+
+TEMPLATES = [
+    "Hello! Can you help me book an appointment for {day} at {hour}:30 pm?",
+    "My email is user{n}@example.com and my phone is 555-{n:03d}-1234",
+    "This product is terrible and not working since {day}, I paid ${n}.99",
+    "Thank you so much, the meeting with Sarah in London went really well",
+    "What is the difference between machine learning and deep learning?",
+]
+DAYS = ["monday", "tuesday", "tomorrow", "friday", "today"]
+
+
+def make_texts(count: int):
+    rng = random.Random(7)
+    return [
+        rng.choice(TEMPLATES).format(day=rng.choice(DAYS), hour=rng.randint(1, 12), n=rng.randint(0, 999))
+        for _ in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark NLP batch processing")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args()
+
+    nlp = NLPService()
+    texts = make_texts(args.texts)
+    nlp.process_batch(texts[:50])  # warm up
+
+    print("=" * 60)
+    print(f"NLP batch benchmark ({len(texts)} texts)")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    for text in texts:
+        nlp.process_message(text)
+    single_s = time.perf_counter() - start
+    print(f"process_message loop:       {len(texts) / single_s:10.0f} texts/s")
+
+    for n_process in args.processes:
+        start = time.perf_counter()
+        nlp.process_batch(texts, batch_size=args.batch_size, n_process=n_process)
+        batch_s = time.perf_counter() - start
+        print(f"process_batch n_process={n_process}: {len(texts) / batch_s:10.0f} texts/s "
+              f"({single_s / batch_s:.1f}x)")
+    print("=" * 60)
@@ -0,0 +1,85 @@
+# bench_nlp_startup.py
+"""
+Benchmark: NLPService startup cost
+Each configuration runs in a fresh interpreter and reports
+- cold import: `import nlp_service`
+- init: NLPService() constructor
+- first call: first process_message (includes lazy model loading)
+- steady state: mean process_message latency afterwards
+
+Usage:
+    python bench_nlp_startup.py --calls 200
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+CONFIGS = [
+    # name, NLP_SPACY_EXCLUDE, NLP_PRELOAD
+    ("full pipeline, preloaded", "", "true"),
+    ("NER only, preloaded", None, "true"),
+    ("NER only, lazy", None, "false"),
+]
+
+MESSAGE = "Can you book a meeting with Sarah in London tomorrow at 3pm? My email is sarah@example.com"
+
+
+def child(calls: int):
+    start = time.perf_counter()
+    import nlp_service
+    import_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    service = nlp_service.NLPService()
+    if nlp_service.NLP_PRELOAD:
+        service.preload(background=False)  # measure the full preload inside init
+    init_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    service.process_message(MESSAGE)
+    first_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        service.process_message(MESSAGE)
+    steady_s = (time.perf_counter() - start) / calls
+
+    print(json.dumps({"import": import_s, "init": init_s, "first": first_s, "steady": steady_s}))
+
+
+def run(exclude, preload, calls: int) -> dict:
+    env = dict(os.environ, NLP_PRELOAD=preload)
+    if exclude is not None:
+        env["NLP_SPACY_EXCLUDE"] = exclude
+    else:
+        env.pop("NLP_SPACY_EXCLUDE", None)
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", "--calls", str(calls)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark NLPService startup")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.calls)
+        sys.exit(0)
+
+    print("=" * 72)
+    print("NLPService startup benchmark")
+    print("=" * 72)
+    print(f"{'configuration':<26} {'import ms':>10} {'init ms':>10} {'first ms':>10} {'steady ms':>10}")
+    for name, exclude, preload in CONFIGS:
+        result = run(exclude, preload, args.calls)
+        print(f"{name:<26} {result['import'] * 1000:>10.1f} {result['init'] * 1000:>10.1f} "
+              f"{result['first'] * 1000:>10.1f} {result['steady'] * 1000:>10.2f}")
+    print("=" * 72)
@@ -0,0 +1,64 @@
+# bench_sentiment.py
+"""
+Benchmark: per-tier sentiment latency (see sentiment.py)
+- fast: lexicon scorer, one text at a time and as a batch
+- accurate: TextBlob polarity
+- memo hit: any tier, text seen before
+
+Usage:
+    python bench_sentiment.py --texts 2000
+"""
+
+import time
+import random
+import argparse
+
+from sentiment import SentimentAnalyzer, FAST, ACCURATE
+
+TEMPLATES = [
+    "I really love this product, it works great {n}",
+    "This is terrible, the app is not working and support was awful {n}",
+    "Can you tell me how neural networks learn from data? {n}",
+    "Thanks so much, that was very helpful {n}",
+    "The weather is okay today, nothing special {n}",
+]
+
+
+def make_texts(count: int):
+    rng = random.Random(5)
+    return [rng.choice(TEMPLATES).format(n=i) for i in range(count)]  # unique texts: no memo hits
+
+
+def per_text_us(func, texts) -> float:
+    start = time.perf_counter()
+    func(texts)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sentiment tiers")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--accurate-texts", type=int, default=200)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    SentimentAnalyzer(memo_size=0).analyze("warm up", ACCURATE)  # exclude the TextBlob import
+
+    single = SentimentAnalyzer(memo_size=0)
+    batch = SentimentAnalyzer(memo_size=0)
+    memo = SentimentAnalyzer(memo_size=len(texts))
+    memo.analyze_batch(texts, FAST)
+
+    rows = [
+        ("fast, one at a time", lambda ts: [single.analyze(t, FAST) for t in ts], texts),
+        ("fast, analyze_batch", lambda ts: batch.analyze_batch(ts, FAST), texts),
+        ("accurate (TextBlob)", lambda ts: batch.analyze_batch(ts, ACCURATE), texts[:args.accurate_texts]),
+        ("memo hit", lambda ts: [memo.analyze(t, FAST) for t in ts], texts),
+    ]
+
+    print("=" * 60)
+    print("Sentiment tier benchmark")
+    print("=" * 60)
+    for name, func, sample in rows:
+        print(f"{name:<24} {per_text_us(func, sample):>10.1f} µs/text")
+    print("=" * 60)
@@ -1,16 +1,192 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 import os
+import time
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+# Without DATABASE_URL a local SQLite file is used, so tests and demos need no server
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chatbot.db')}"
+DATABASE_URL = os.getenv("DATABASE_URL") or DEFAULT_DATABASE_URL
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True
-)
+# -------- POOL CONFIGURATION --------
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))          # connections kept open
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))    # extra connections under bursts
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # reopen connections older than this, -1 never
+DB_PRE_PING = os.getenv("DB_PRE_PING", "idle")               # always | idle | never
+DB_PING_IDLE = float(os.getenv("DB_PING_IDLE", "30"))        # idle: ping only after this many idle seconds
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "30"))  # per statement (asyncpg), lock wait (SQLite)
+
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+if DB_PRE_PING not in PRE_PING_STRATEGIES:
+    raise ValueError(f"Unknown DB_PRE_PING strategy: {DB_PRE_PING}")
+
+# Async drivers for each sync URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+}
+
+
+def to_async_url(url: str) -> str:
+    """postgresql://... -> postgresql+asyncpg://..., sqlite://... -> sqlite+aiosqlite://..., mysql://... -> mysql+aiomysql://..."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+# -------- POOL METRICS --------
+
+class PoolMetrics:
+    """Checkout wait times, overflow connections, timeouts and pings for one engine"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.ping_failures = 0
+
+    def record_checkout(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+class _InstrumentedPool:
+    """Mixin for QueuePool classes; `metrics` is set on the generated subclass"""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        # Covers waiting for a free connection, opening overflow ones and pinging
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.count("timeouts")
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _inc_overflow(self):
+        opened = super()._inc_overflow()
+        if opened and self._overflow > 0:  # beyond pool_size
+            self.metrics.count("overflow_events")
+        return opened
+
+
+def instrumented(pool_class, metrics: PoolMetrics):
+    # A class attribute survives engine.dispose(), which recreates the pool from its class
+    return type(f"Instrumented{pool_class.__name__}", (_InstrumentedPool, pool_class), {"metrics": metrics})
+
+
+def engine_options(url: str, metrics: PoolMetrics, is_async: bool = False) -> dict:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+
+    if backend == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # One shared in-memory database for every thread
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+    if backend == "sqlite":
+        connect_args = {"timeout": DB_COMMAND_TIMEOUT}  # wait on a locked file instead of failing
+    elif is_async and backend == "postgresql":
+        connect_args = {"timeout": DB_CONNECT_TIMEOUT, "command_timeout": DB_COMMAND_TIMEOUT}
+    else:
+        connect_args = {"connect_timeout": int(DB_CONNECT_TIMEOUT)}  # psycopg2, pymysql, aiomysql
+
+    # aiosqlite would otherwise open a new connection (and thread) per checkout
+    pool_class = AsyncAdaptedQueuePool if is_async else QueuePool
+    return {
+        "poolclass": instrumented(pool_class, metrics),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_PRE_PING == "always",
+        "connect_args": connect_args,
+    }
+
+
+def configure_engine(sync_engine, metrics: PoolMetrics):
+    """Idle-only pre-ping and SQLite pragmas, as pool events"""
+    if DB_PRE_PING == "idle":
+        @event.listens_for(sync_engine, "checkin")
+        def remember_checkin(dbapi_connection, connection_record):
+            connection_record.info["checked_in_at"] = time.monotonic()
+
+        @event.listens_for(sync_engine, "checkout")
+        def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+            # Recently used connections are trusted; only idle ones pay for a round trip
+            checked_in_at = connection_record.info.get("checked_in_at")
+            if checked_in_at is None or time.monotonic() - checked_in_at < DB_PING_IDLE:
+                return
+            metrics.count("pings")
+            try:
+                sync_engine.dialect.do_ping(dbapi_connection)
+            except Exception:
+                metrics.count("ping_failures")
+                raise exc.DisconnectionError()  # the pool replaces the connection and retries
+
+    if sync_engine.dialect.name == "sqlite":
+        @event.listens_for(sync_engine, "connect")
+        def sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # WAL lets the message writer and request handlers read while one writes
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+
+def pool_stats(engine, metrics: PoolMetrics) -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    with metrics._lock:
+        stats.update({
+            "checkouts": metrics.checkouts,
+            "avg_wait_ms": round(metrics.wait_seconds / metrics.checkouts * 1000, 3) if metrics.checkouts else None,
+            "max_wait_ms": round(metrics.max_wait_seconds * 1000, 3),
+            "overflow_events": metrics.overflow_events,
+            "timeouts": metrics.timeouts,
+            "pings": metrics.pings,
+            "ping_failures": metrics.ping_failures,
+        })
+    return stats
+
+
+# -------- SYNC ENGINE --------
+# Used by scripts, training jobs and the background message writer
+sync_pool_metrics = PoolMetrics()
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, sync_pool_metrics))
+configure_engine(engine, sync_pool_metrics)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -20,3 +196,38 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# -------- ASYNC ENGINE --------
+# Used by request handlers so queries do not occupy FastAPI's thread pool.
+# Derived from DATABASE_URL unless ASYNC_DATABASE_URL is set.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+async_pool_metrics = PoolMetrics()
+try:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        **engine_options(ASYNC_DATABASE_URL, async_pool_metrics, is_async=True)
+    )
+except exc.InvalidRequestError as e:
+    raise RuntimeError(
+        f"No async driver for {make_url(ASYNC_DATABASE_URL).drivername}; "
+        f"set ASYNC_DATABASE_URL to an async URL (DATABASE_URL schemes mapped automatically: {', '.join(sorted(ASYNC_DRIVERS))})"
+    ) from e
+configure_engine(async_engine.sync_engine, async_pool_metrics)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def database_stats() -> dict:
+    """Pool state and checkout metrics for both engines (served by /api/stats)"""
+    return {
+        "backend": engine.dialect.name,
+        "pre_ping": DB_PRE_PING,
+        "sync": pool_stats(engine, sync_pool_metrics),
+        "async": pool_stats(async_engine.sync_engine, async_pool_metrics),
+    }
@@ -0,0 +1,80 @@
+# entity_extractor.py
+"""
+Regex entity extraction for Dynamic AI Chatbot
+All patterns are compiled once into a single named-group alternation, so a
+message is scanned in one pass. Matches never overlap: at each position the
+first alternative that matches wins, in the priority order below.
+"""
+
+import re
+from typing import Dict, List, NamedTuple
+
+_MONTHS = "january|february|march|april|may|june|july|august|september|october|november|december"
+_WEEKDAYS = "monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+
+# (group, label, pattern), highest priority first: "$1,200" is MONEY rather
+# than NUMBER, "555-123-4567" is PHONE, "12/05/2024" is DATE.
+# Patterns are split by how they can start so that the scanner tries only the
+# relevant branch at each position instead of every alternative.
+ANYWHERE_PATTERNS = [
+    ("EMAIL", "EMAIL", r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"),
+    ("URL", "URL", r"https?://(?:[a-zA-Z0-9$\-_@.&+!*(),/:;=?#~]|%[0-9a-fA-F]{2})+"),
+]
+
+DIGIT_PATTERNS = [  # start with a digit, "(", "+" or "$"
+    ("PHONE", "PHONE", r"\(\d{3}\)\s*\d{3}[-.]?\d{4}\b"
+                       r"|\+\d{1,3}\s*\d{1,4}\s*\d{1,4}\s*\d{1,9}\b"
+                       r"|\b\d{3}[-.]?\d{3}[-.]?\d{4}\b"),
+    ("MONEY", "MONEY", r"\$\d+(?:,\d{3})*(?:\.\d{2})?"
+                       r"|\b\d+(?:\.\d+)?\s*(?:dollars?|usd|eur|euros?|rupees?|inr)\b"),
+    ("DATE", "DATE", r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b"),
+    ("TIME", "TIME", r"\b\d{1,2}:\d{2}(?:\s*[ap]m)?\b|\b\d{1,2}\s*[ap]m\b"),
+    ("NUMBER", "NUMBER", r"\b\d+(?:\.\d+)?\b"),
+]
+
+WORD_PATTERNS = [  # start at the beginning of a word
+    ("DATE_WORD", "DATE", r"(?:" + _MONTHS + r")\s+\d{1,2}(?:st|nd|rd|th)?\b"
+                          r"|(?:today|tomorrow|yesterday|" + _WEEKDAYS + r")\b"),
+    ("TIME_WORD", "TIME", r"(?:morning|afternoon|evening|night)\b"),
+]
+
+
+def _alternation(patterns) -> str:
+    return "|".join(f"(?P<{group}>{pattern})" for group, _, pattern in patterns)
+
+
+ENTITY_REGEX = re.compile(
+    _alternation(ANYWHERE_PATTERNS)
+    + r"|(?=[\d(+$])(?:" + _alternation(DIGIT_PATTERNS) + ")"
+    + r"|\b(?=[a-z])(?:" + _alternation(WORD_PATTERNS) + ")",
+    re.IGNORECASE
+)
+
+# group name -> entity label
+LABELS = {
+    group: label
+    for group, label, _ in ANYWHERE_PATTERNS + DIGIT_PATTERNS + WORD_PATTERNS
+}
+
+
+class Entity(NamedTuple):
+    label: str
+    text: str
+    start: int
+    end: int
+
+
+def extract(text: str) -> List[Entity]:
+    """Non-overlapping entities in order of position"""
+    return [
+        Entity(LABELS[match.lastgroup], match.group(), match.start(), match.end())
+        for match in ENTITY_REGEX.finditer(text)
+    ]
+
+
+def extract_dicts(text: str) -> List[Dict]:
+    """Same as extract(), in the {"text", "label"} shape the chat API returns"""
+    return [
+        {"text": match.group(), "label": LABELS[match.lastgroup]}
+        for match in ENTITY_REGEX.finditer(text)
+    ]
@@ -0,0 +1,195 @@
+# history.py
+"""
+Conversation history and transcript export for Dynamic AI Chatbot
+Reads the messages table (model_database.py) with keyset pagination on
+(session_id, timestamp, id): every page is an index range scan that starts
+where the previous one ended, so page 1000 costs the same as page 1.
+Exports stream NDJSON (optionally gzip-compressed) in batches of the same
+keyset order, so memory stays constant however long the session or range.
+"""
+
+import os
+import re
+import json
+import zlib
+import base64
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+
+from model_database import Message, Session as ChatSession
+from models import User
+
+# -------- CONFIGURATION --------
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "200"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))  # rows fetched per query while exporting
+
+# Columns only (no ORM objects), so nothing accumulates in the session's identity map
+COLUMNS = (
+    Message.id, ChatSession.session_id, Message.sender, Message.message_text, Message.timestamp,
+    Message.intent, Message.confidence, Message.sentiment, Message.sentiment_score, Message.entities,
+    Message.response_time, Message.model_used, Message.tokens_used,
+)
+
+
+def encode_cursor(timestamp: datetime, message_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{message_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for cursors this module did not produce"""
+    try:
+        timestamp, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(message_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def owned_by(owner: str):
+    """Condition on ChatSession: the session belongs to the account with this email"""
+    return ChatSession.user_id == select(User.id).where(User.email == owner).scalar_subquery()
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC; convert aware datetimes (e.g. "...Z") to match"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def export_filename(session_id: Optional[str], compress: bool) -> str:
+    """Download name for an export; the session id is client-chosen, so only [A-Za-z0-9_-] is kept"""
+    name = re.sub(r"[^A-Za-z0-9_-]", "_", session_id)[:64] if session_id else "range"
+    return f"chat-export-{name}.ndjson" + (".gz" if compress else "")
+
+
+def message_dict(row) -> Dict:
+    return {
+        "id": row.id,
+        "session_id": row.session_id,
+        "sender": row.sender,
+        "text": row.message_text,
+        "timestamp": row.timestamp.isoformat(),
+        "intent": row.intent,
+        "confidence": row.confidence,
+        "sentiment": row.sentiment,
+        "sentiment_score": row.sentiment_score,
+        "entities": row.entities,
+        "response_time": row.response_time,
+        "model_used": row.model_used,
+        "tokens_used": row.tokens_used,
+    }
+
+
+# -------- HISTORY --------
+
+async def history_page(db, session_id: str, owner: Optional[str], limit: int = HISTORY_PAGE_SIZE,
+                       before: Optional[str] = None) -> Optional[Dict]:
+    """
+    One page of a session's messages (AsyncSession), oldest first within the page
+    Pages run from the newest messages backwards: pass `next_cursor` as `before`
+    to get the page before this one. None if the session does not exist or
+    does not belong to `owner` (an account email; None skips the check).
+    """
+    query = select(ChatSession.id, ChatSession.total_messages).where(ChatSession.session_id == session_id)
+    if owner is not None:
+        query = query.where(owned_by(owner))
+    session = (await db.execute(query)).first()
+    if session is None:
+        return None
+
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+    query = (
+        select(*COLUMNS)
+        .join(ChatSession, ChatSession.id == Message.session_id)
+        .where(Message.session_id == session.id)
+        .order_by(Message.timestamp.desc(), Message.id.desc())
+        .limit(limit + 1)  # one extra row tells whether an older page exists
+    )
+    if before is not None:
+        query = query.where(tuple_(Message.timestamp, Message.id) < tuple_(*decode_cursor(before)))
+
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "session_id": session_id,
+        "total_messages": session.total_messages or 0,
+        "messages": [message_dict(row) for row in reversed(rows)],
+        "next_cursor": encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+    }
+
+
+# -------- EXPORT --------
+
+async def session_exists(db, session_id: str, owner: Optional[str]) -> bool:
+    """Whether `owner` (None: anyone) has a persisted session with this id"""
+    query = select(ChatSession.id).where(ChatSession.session_id == session_id)
+    if owner is not None:
+        query = query.where(owned_by(owner))
+    return await db.scalar(query) is not None
+
+
+async def iter_messages(session_factory, owner: Optional[str], session_id: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator:
+    """
+    Every message of a session and/or time range [since, until), oldest first,
+    limited to the sessions of `owner` (None: every session)
+    Each batch is its own short query resuming after the last row of the previous
+    one, so no connection or transaction is held while the client reads.
+    """
+    query = (
+        select(*COLUMNS)
+        .join(ChatSession, ChatSession.id == Message.session_id)
+        .order_by(Message.timestamp, Message.id)
+        .limit(batch_size)
+    )
+    if owner is not None:
+        query = query.where(owned_by(owner))
+    if session_id is not None:
+        # Compare on the integer key so the (session_id, timestamp, id) index drives the scan
+        session_pks = select(ChatSession.id).where(ChatSession.session_id == session_id)
+        if owner is not None:
+            session_pks = session_pks.where(owned_by(owner))
+        query = query.where(Message.session_id.in_(session_pks))
+    if since is not None:
+        query = query.where(Message.timestamp >= since)
+    if until is not None:
+        query = query.where(Message.timestamp < until)
+
+    after = None
+    while True:
+        batch_query = query if after is None else query.where(tuple_(Message.timestamp, Message.id) > tuple_(*after))
+        async with session_factory() as db:
+            rows = (await db.execute(batch_query)).all()
+        for row in rows:
+            yield row
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1].timestamp, rows[-1].id)
+
+
+async def export_ndjson(session_factory, owner: Optional[str], session_id: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None, compress: bool = False,
+                        batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """NDJSON lines (one message each), gzip-compressed on the fly when `compress` is set"""
+    # wbits=31: gzip container, readable by gunzip / gzip.open
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    lines = []
+    async for row in iter_messages(session_factory, owner, session_id, since, until, batch_size):
+        lines.append(json.dumps(message_dict(row), ensure_ascii=False) + "\n")
+        if len(lines) >= batch_size:
+            chunk = "".join(lines).encode("utf-8")
+            lines = []
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    chunk = "".join(lines).encode("utf-8")
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
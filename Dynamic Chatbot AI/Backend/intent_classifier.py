@@ -0,0 +1,213 @@
+# intent_classifier.py
+"""
+Trainable intent classifier for Dynamic AI Chatbot
+Multinomial Naive Bayes over hashed word n-grams, in NumPy only.
+Trained from the IntentTraining table (model_database.py), saved as a compact
+.npz file that loads in milliseconds, and scores whole batches at once.
+
+Usage:
+    python intent_classifier.py --output intent_model.npz [--validated-only]
+"""
+
+import os
+import zlib
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from intent_index import tokenize
+
+# -------- CONFIGURATION --------
+INTENT_MODEL_PATH = os.getenv(
+    "NLP_INTENT_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_model.npz")
+)
+N_FEATURES = 2 ** 18  # hash buckets
+NGRAMS = 2            # word unigrams + bigrams
+
+
+def hash_features(text: str, n_features: int = N_FEATURES, ngrams: int = NGRAMS) -> Counter:
+    """Hashed word n-gram counts; crc32 so the hashes are stable across processes"""
+    tokens = tokenize(text)
+    counts = Counter()
+    for n in range(1, ngrams + 1):
+        for i in range(len(tokens) - n + 1):
+            gram = " ".join(tokens[i:i + n])
+            counts[zlib.crc32(gram.encode("utf-8")) % n_features] += 1
+    return counts
+
+
+class IntentClassifier:
+    """
+    Multinomial Naive Bayes with additive smoothing
+    Only hash buckets seen in training are stored; every other bucket has the
+    same smoothed log-probability per intent, kept in the table's last row.
+    """
+
+    def __init__(self, intents: Sequence[str], feature_ids: np.ndarray, log_probs: np.ndarray,
+                 class_log_prior: np.ndarray, n_features: int = N_FEATURES, ngrams: int = NGRAMS):
+        self.intents = list(intents)
+        self.feature_ids = feature_ids          # sorted bucket ids seen in training
+        self.log_probs = log_probs              # (len(feature_ids) + 1, intents)
+        self.class_log_prior = class_log_prior  # (intents,)
+        self.n_features = n_features
+        self.ngrams = ngrams
+
+    # -------- TRAINING --------
+
+    @classmethod
+    def fit(cls, texts: Sequence[str], labels: Sequence[str], alpha: float = 0.1,
+            n_features: int = N_FEATURES, ngrams: int = NGRAMS) -> "IntentClassifier":
+        if not texts:
+            raise ValueError("No training examples")
+        intents = sorted(set(labels))
+        intent_ids = {intent: i for i, intent in enumerate(intents)}
+
+        per_class: List[Counter] = [Counter() for _ in intents]
+        for text, label in zip(texts, labels):
+            per_class[intent_ids[label]].update(hash_features(text, n_features, ngrams))
+
+        feature_ids = np.array(sorted(set().union(*per_class)), dtype=np.int64)
+        position = {feature: i for i, feature in enumerate(feature_ids.tolist())}
+        counts = np.zeros((len(feature_ids) + 1, len(intents)), dtype=np.float64)
+        for c, counter in enumerate(per_class):
+            for feature, count in counter.items():
+                counts[position[feature], c] = count
+
+        totals = counts.sum(axis=0) + alpha * n_features
+        log_probs = np.log(counts + alpha) - np.log(totals)  # last row = unseen bucket
+
+        label_counts = Counter(labels)
+        priors = np.array([label_counts[intent] for intent in intents], dtype=np.float64)
+        class_log_prior = np.log(priors / priors.sum())
+
+        return cls(intents, feature_ids, log_probs.astype(np.float32),
+                   class_log_prior.astype(np.float32), n_features, ngrams)
+
+    # -------- SCORING --------
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """(texts, intents) matrix of posterior probabilities"""
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for feature, count in hash_features(text, self.n_features, self.ngrams).items():
+                rows.append(row)
+                cols.append(feature)
+                values.append(count)
+
+        scores = np.tile(self.class_log_prior.astype(np.float64), (len(texts), 1))
+        if rows:
+            rows = np.array(rows, dtype=np.int64)
+            cols = np.array(cols, dtype=np.int64)
+            # Row of each bucket in the table; buckets never seen in training
+            # use the shared last row
+            unseen = len(self.feature_ids)
+            index = np.searchsorted(self.feature_ids, cols)
+            found = index < unseen
+            found[found] = self.feature_ids[index[found]] == cols[found]
+            index[~found] = unseen
+            contributions = self.log_probs[index] * np.array(values, dtype=np.float64)[:, None]
+            for c in range(len(self.intents)):
+                scores[:, c] += np.bincount(rows, weights=contributions[:, c], minlength=len(texts))
+
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """(intent, probability) for every text, in input order"""
+        if not texts:
+            return []
+        probabilities = self.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        return [(self.intents[i], float(probabilities[row, i])) for row, i in enumerate(best)]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        return self.predict_batch([text])[0]
+
+    # -------- PERSISTENCE --------
+
+    def save(self, path: str = INTENT_MODEL_PATH):
+        np.savez_compressed(
+            path,
+            intents=np.array(self.intents),
+            feature_ids=self.feature_ids,
+            log_probs=self.log_probs,
+            class_log_prior=self.class_log_prior,
+            config=np.array([self.n_features, self.ngrams], dtype=np.int64)
+        )
+
+    @classmethod
+    def load(cls, path: str = INTENT_MODEL_PATH) -> "IntentClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            n_features, ngrams = data["config"].tolist()
+            return cls(data["intents"].tolist(), data["feature_ids"], data["log_probs"],
+                       data["class_log_prior"], n_features, ngrams)
+
+    def stats(self) -> Dict:
+        return {
+            "intents": len(self.intents),
+            "features": len(self.feature_ids),
+            "bytes": self.log_probs.nbytes + self.feature_ids.nbytes
+        }
+
+
+def load_training_data(db, validated_only: bool = False) -> Tuple[List[str], List[str]]:
+    """(texts, intents) from the IntentTraining table"""
+    from model_database import IntentTraining
+
+    query = db.query(IntentTraining.text, IntentTraining.intent)
+    if validated_only:
+        query = query.filter(IntentTraining.is_validated.is_(True))
+    rows = query.all()
+    return [row.text for row in rows], [row.intent for row in rows]
+
+
+if __name__ == "__main__":
+    import time
+    import random
+    import argparse
+
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Train the intent classifier from IntentTraining")
+    parser.add_argument("--output", default=INTENT_MODEL_PATH)
+    parser.add_argument("--validated-only", action="store_true")
+    parser.add_argument("--alpha", type=float, default=0.1)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction kept for evaluation")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Intent Classifier Training")
+    print("=" * 60)
+
+    db = SessionLocal()
+    try:
+        texts, labels = load_training_data(db, args.validated_only)
+    finally:
+        db.close()
+    print(f"Examples: {len(texts)} ({len(set(labels))} intents)")
+    if not texts:
+        print("✗ No IntentTraining rows to train from")
+        raise SystemExit(1)
+
+    examples = list(zip(texts, labels))
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout)) if len(examples) > 10 else len(examples)
+    train, test = examples[:split], examples[split:]
+
+    if test:
+        model = IntentClassifier.fit([t for t, _ in train], [l for _, l in train], args.alpha)
+        predictions = model.predict_batch([t for t, _ in test])
+        accuracy = sum(p == l for (p, _), (_, l) in zip(predictions, test)) / len(test)
+        print(f"Hold-out accuracy: {accuracy:.1%} on {len(test)} examples")
+
+    model = IntentClassifier.fit(texts, labels, args.alpha)  # final model uses every example
+    model.save(args.output)
+
+    start = time.perf_counter()
+    IntentClassifier.load(args.output)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"✓ Saved {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB, loads in {load_ms:.1f} ms)")
+    print("=" * 60)
@@ -0,0 +1,67 @@
+# intent_index.py
+"""
+Keyword intent recognition for Dynamic AI Chatbot
+Inverted index from keyword tokens to intents: a message is tokenized once
+and every token looks up only the keywords that start with it, so the cost
+per token stays constant no matter how many intents and keywords there are.
+Matching is on whole tokens: "hi" does not fire on "this", nor "no" on "know".
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+|\?")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class IntentIndex:
+    """
+    Built from NLPService-style patterns:
+        {"greeting": {"keywords": ["hello", "good morning"], "weight": 1.0}, ...}
+
+    confidence(intent) = distinct keywords matched / number of keywords * weight
+    """
+
+    def __init__(self, intent_patterns: Dict[str, Dict]):
+        self.order = {intent: position for position, intent in enumerate(intent_patterns)}
+        self.sizes = {intent: len(data["keywords"]) for intent, data in intent_patterns.items()}
+        self.weights = {intent: data["weight"] for intent, data in intent_patterns.items()}
+
+        # first token -> [(remaining phrase tokens, intent, keyword id)]
+        self.index: Dict[str, List[Tuple[Tuple[str, ...], str, int]]] = {}
+        keyword_id = 0
+        for intent, data in intent_patterns.items():
+            for keyword in data["keywords"]:
+                tokens = tokenize(keyword)
+                if tokens:
+                    self.index.setdefault(tokens[0], []).append((tuple(tokens[1:]), intent, keyword_id))
+                keyword_id += 1
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Score of every intent with at least one keyword match, in pattern order"""
+        tokens = tokenize(text)
+        count = len(tokens)
+        matched: Dict[str, set] = {}
+
+        for position, token in enumerate(tokens):
+            for rest, intent, keyword_id in self.index.get(token, ()):
+                end = position + 1 + len(rest)
+                if rest and (end > count or tuple(tokens[position + 1:end]) != rest):
+                    continue
+                matched.setdefault(intent, set()).add(keyword_id)
+
+        return {
+            intent: len(matched[intent]) / self.sizes[intent] * self.weights[intent]
+            for intent in sorted(matched, key=self.order.get)
+        }
+
+    def best(self, text: str) -> Optional[Tuple[str, float]]:
+        """(intent, confidence) with the highest score, or None; ties go to the earlier intent"""
+        scores = self.scores(text)
+        if not scores:
+            return None
+        intent = max(scores, key=scores.get)
+        return intent, min(scores[intent], 1.0)
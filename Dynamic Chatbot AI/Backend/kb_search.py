@@ -0,0 +1,162 @@
+# kb_search.py
+"""
+Ranked retrieval over the knowledge base (BM25)
+Finds the best entry for paraphrased questions that contain no exact topic,
+e.g. "how do nets with many layers learn" -> "deep learning"
+
+A high score alone is not enough: one rare word shared with an answer
+("write code" in the ChatGPT entry) would win. A hit is only used when it
+names a word of the entry's topic, or when the entry contains at least
+KB_MIN_TERMS of the query's terms covering KB_MIN_COVERAGE of its weight.
+"""
+
+import os
+import re
+import math
+import heapq
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# -------- CONFIGURATION --------
+KB_MIN_CONFIDENCE = float(os.getenv("KB_MIN_CONFIDENCE", "0.4"))  # BM25 score / ideal score
+KB_MIN_COVERAGE = float(os.getenv("KB_MIN_COVERAGE", "0.5"))      # share of the query's IDF the entry contains
+KB_MIN_TERMS = int(os.getenv("KB_MIN_TERMS", "3"))                # matched terms needed without a topic word
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about all also an and any are as at be been being but by can could did do does doing
+for from get had has have how i if in into is it its just know me more most much my no
+not of on or our please so some such tell than that the their them then there these they
+this those to too up us use used very was we were what when where which while who why
+will with would you your many explain describe define
+""".split())
+
+
+def stem(token: str) -> str:
+    """Very light suffix stripping so learn/learns/learning share a term"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 5 and token.endswith("ing"):
+        return token[:-3]
+    if len(token) > 4 and token.endswith("ed"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        stem(token) for token in _TOKEN.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class SearchHit(NamedTuple):
+    topic: str
+    score: float
+    confidence: float
+    coverage: float = 0.0      # IDF share of the query terms found in the entry
+    matched: int = 0           # query terms found in the entry
+    topic_match: bool = False  # a query term is a word of the entry's topic
+
+    def accepted(self, min_confidence: float = KB_MIN_CONFIDENCE, min_coverage: float = KB_MIN_COVERAGE,
+                 min_terms: int = KB_MIN_TERMS) -> bool:
+        """Whether this hit is strong enough to answer from the knowledge base"""
+        if self.confidence < min_confidence:
+            return False
+        return self.topic_match or (self.matched >= min_terms and self.coverage >= min_coverage)
+
+
+class BM25Index:
+    """
+    Sparse inverted index with BM25 weights precomputed at build time
+    A query only sums stored weights for its terms, so the cost depends on
+    the postings of the query terms, not on the knowledge base size.
+
+    confidence = best score / score of an ideal document containing every
+    query term once (unknown terms count at maximum IDF), capped at 1.0
+    """
+
+    TOPIC_BOOST = 3  # topic words count as if they appeared this many times
+
+    def __init__(self, documents: Iterable, k1: float = 1.2, b: float = 0.75):
+        """documents: iterable of (topic, text) pairs"""
+        self.topics: List[str] = []
+        self.topic_terms: List[frozenset] = []
+        term_freqs: List[Dict[str, int]] = []
+        lengths = []
+
+        for topic, text in documents:
+            freqs: Dict[str, int] = {}
+            for term in tokenize(topic) * self.TOPIC_BOOST + tokenize(text):
+                freqs[term] = freqs.get(term, 0) + 1
+            self.topics.append(topic)
+            self.topic_terms.append(frozenset(tokenize(topic)))
+            term_freqs.append(freqs)
+            lengths.append(sum(freqs.values()))
+
+        count = len(self.topics)
+        avg_length = (sum(lengths) / count) if count else 1.0
+
+        document_freq: Dict[str, int] = {}
+        for freqs in term_freqs:
+            for term in freqs:
+                document_freq[term] = document_freq.get(term, 0) + 1
+
+        self.idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in document_freq.items()
+        }
+        self.max_idf = math.log(1 + (count + 0.5) / 0.5)
+
+        # term -> (doc ids, weights)
+        self.postings: Dict[str, tuple] = {}
+        for doc_id, freqs in enumerate(term_freqs):
+            norm = k1 * (1 - b + b * lengths[doc_id] / avg_length)
+            for term, tf in freqs.items():
+                ids, weights = self.postings.setdefault(term, (array("i"), array("f")))
+                ids.append(doc_id)
+                weights.append(self.idf[term] * tf * (k1 + 1) / (tf + norm))
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def search(self, query: str, limit: int = 3) -> List[SearchHit]:
+        terms = set(tokenize(query))
+        if not terms or not self.topics:
+            return []
+
+        scores: Dict[int, float] = {}
+        found: Dict[int, float] = {}  # IDF of the query terms each entry contains
+        matched: Dict[int, int] = {}
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            idf = self.idf[term]
+            for doc_id, weight in zip(*posting):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+                found[doc_id] = found.get(doc_id, 0.0) + idf
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        if not scores:
+            return []
+
+        ideal = sum(self.idf.get(term, self.max_idf) for term in terms)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            SearchHit(
+                self.topics[doc_id], score, min(score / ideal, 1.0),
+                found[doc_id] / ideal, matched[doc_id], not terms.isdisjoint(self.topic_terms[doc_id])
+            )
+            for doc_id, score in best
+        ]
+
+    def best(self, query: str, limit: int = 3) -> Optional[SearchHit]:
+        """Highest-ranked of the top `limit` hits that passes SearchHit.accepted, or None"""
+        for hit in self.search(query, limit):
+            if hit.accepted():
+                return hit
+        return None
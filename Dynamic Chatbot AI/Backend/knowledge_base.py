@@ -0,0 +1,205 @@
+# knowledge_base.py
+"""
+Knowledge Base for Dynamic AI Chatbot
+Loads Q&A entries from a file or directory (JSON, YAML, Markdown) into a
+precompiled, immutable index and hot-reloads it when the files change.
+
+Formats:
+- JSON / YAML: a list of {"topic": ..., "answer": ..., "short": optional}
+  or a mapping of topic -> answer
+- Markdown: every "## Topic" heading starts an entry; the body is the answer
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from kb_search import BM25Index
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# -------- CONFIGURATION --------
+KB_PATH = os.getenv("KB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge"))
+KB_RELOAD_INTERVAL = float(os.getenv("KB_RELOAD_INTERVAL", "5"))  # seconds, 0 disables
+
+SUPPORTED_EXTENSIONS = (".json", ".yaml", ".yml", ".md")
+
+
+class KBEntry(NamedTuple):
+    topic: str
+    answer: str
+    short: str
+
+
+def short_answer(answer: str) -> str:
+    """Short explanation: the first line of the answer"""
+    return answer.split("\n")[0]
+
+
+def make_entry(topic: str, answer: str, short: Optional[str] = None) -> KBEntry:
+    return KBEntry(topic.strip().lower(), answer, short or short_answer(answer))
+
+
+# -------- PARSERS --------
+
+def _entries_from_data(data) -> List[KBEntry]:
+    if isinstance(data, dict):
+        return [make_entry(topic, answer) for topic, answer in data.items()]
+    return [make_entry(item["topic"], item["answer"], item.get("short")) for item in data or []]
+
+
+def _parse_markdown(text: str) -> List[KBEntry]:
+    entries = []
+    topic, body = None, []
+    for line in text.splitlines():
+        if line.startswith("## "):
+            if topic:
+                entries.append(make_entry(topic, "\n".join(body).strip()))
+            topic, body = line[3:].strip(), []
+        elif topic:
+            body.append(line)
+    if topic:
+        entries.append(make_entry(topic, "\n".join(body).strip()))
+    return entries
+
+
+def load_file(path: str) -> List[KBEntry]:
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8") as f:
+        if extension == ".json":
+            return _entries_from_data(json.load(f))
+        if extension in (".yaml", ".yml"):
+            if yaml is None:
+                print(f"⚠ Skipping {path}: PyYAML is not installed")
+                return []
+            return _entries_from_data(yaml.safe_load(f))
+        if extension == ".md":
+            return _parse_markdown(f.read())
+    return []
+
+
+def list_sources(path: str) -> List[str]:
+    """Knowledge files under `path`, in load (= priority) order"""
+    if os.path.isfile(path):
+        return [path]
+    sources = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                sources.append(os.path.join(root, name))
+    return sources
+
+
+def source_signature(path: str) -> Tuple:
+    """Cheap change detector: (file, mtime, size) for every source"""
+    signature = []
+    for source in list_sources(path):
+        try:
+            stat = os.stat(source)
+            signature.append((source, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            continue
+    return tuple(signature)
+
+
+# -------- INDEX --------
+
+class KnowledgeIndex:
+    """
+    Immutable snapshot of the knowledge base
+    - entries: topic -> KBEntry (full and short answers side by side)
+    - topics: topics in priority order (earlier files and entries win)
+    - matcher: whatever `matcher_factory(topics)` builds, e.g. an Aho-Corasick automaton
+    - search: BM25 index over topics and answers for paraphrased questions
+    """
+
+    def __init__(self, entries: List[KBEntry], matcher_factory: Optional[Callable] = None):
+        self.entries: Dict[str, KBEntry] = {}
+        for entry in entries:
+            self.entries.setdefault(entry.topic, entry)  # first definition wins
+        self.topics = list(self.entries)
+        self.matcher = matcher_factory(self.topics) if matcher_factory else None
+        self.search = BM25Index((entry.topic, entry.answer) for entry in self.entries.values())
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, topic: str) -> Optional[KBEntry]:
+        return self.entries.get(topic)
+
+
+class KnowledgeBase:
+    """
+    Hot-reloadable knowledge base
+    Readers take `kb.index` once per request and use that snapshot; reloads
+    build a complete new index on a background thread and swap the reference,
+    so requests never block on, or observe, a half-built index.
+    """
+
+    def __init__(self, path: str = KB_PATH, matcher_factory: Optional[Callable] = None):
+        self.path = path
+        self.matcher_factory = matcher_factory
+        self._signature = source_signature(path)
+        self.index = self._build()
+
+        self._reloads = 0
+        self._reload_errors = 0
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def _build(self) -> KnowledgeIndex:
+        entries = []
+        for source in list_sources(self.path):
+            entries.extend(load_file(source))
+        return KnowledgeIndex(entries, self.matcher_factory)
+
+    def reload(self) -> bool:
+        """Rebuild the index if the sources changed; returns True when swapped"""
+        signature = source_signature(self.path)
+        if signature == self._signature:
+            return False
+        try:
+            index = self._build()
+        except Exception as e:
+            # Keep serving the previous index until the files are fixed
+            self._reload_errors += 1
+            print(f"⚠ Knowledge base reload failed: {e}")
+            return False
+
+        self.index = index
+        self._signature = signature
+        self._reloads += 1
+        print(f"✓ Knowledge base reloaded ({len(index)} entries)")
+        return True
+
+    def start_watching(self, interval: float = KB_RELOAD_INTERVAL):
+        """Poll the sources every `interval` seconds on a daemon thread"""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                self.reload()
+
+        self._watcher = threading.Thread(target=watch, name="kb-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        index = self.index
+        return {
+            "path": self.path,
+            "entries": len(index),
+            "loaded_at": index.loaded_at,
+            "reloads": self._reloads,
+            "reload_errors": self._reload_errors
+        }
@@ -0,0 +1,207 @@
+# llm_cache.py
+"""
+Completion cache for Dynamic AI Chatbot
+Caches LLM completions keyed on the effective prompt and model parameters
+Backends: in-process LRU+TTL (default) or Redis
+"""
+
+import os
+import json
+import time
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from singleflight import normalize_prompt
+
+# Prefer redis-py's asyncio client (the maintained successor of aioredis);
+# aioredis itself fails to import on Python 3.11+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    try:
+        import aioredis
+    except Exception:
+        aioredis = None
+
+# -------- CONFIGURATION --------
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")  # memory | redis | none
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "600"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+def completion_key(prompt: str, model: str, options: Optional[Dict] = None) -> str:
+    """Stable hash of everything that determines a completion"""
+    material = json.dumps({
+        "prompt": normalize_prompt(prompt),
+        "model": model,
+        "options": options or {}
+    }, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class CompletionCache(ABC):
+    """Base class: async get/set plus hit/miss accounting"""
+
+    backend = "none"
+
+    def __init__(self, ttl: int = LLM_CACHE_TTL):
+        self.ttl = ttl
+        self._hits = 0
+        self._misses = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """The cached completion, or None (counted via _record)"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str):
+        """Store a completion for `ttl` seconds"""
+
+    def _record(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return value
+
+    def stats(self) -> Dict:
+        lookups = self._hits + self._misses
+        return {
+            "backend": self.backend,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            "ttl": self.ttl
+        }
+
+
+class MemoryCompletionCache(CompletionCache):
+    """
+    In-process cache with LRU eviction bounded by entry count and bytes
+    Expired entries are dropped lazily on lookup and from the LRU end on insert
+    """
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        ttl: int = LLM_CACHE_TTL
+    ):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, value, size)
+        self._bytes = 0
+        self._evictions = 0
+        self._expired = 0
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return self._record(None)
+
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self._expired += 1
+            return self._record(None)
+
+        self._entries.move_to_end(key)
+        return self._record(value)
+
+    async def set(self, key: str, value: str):
+        size = len(value.encode("utf-8")) + len(key)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        # Least recently used entries are the likeliest to have expired;
+        # stop at the first live one so an insert stays cheap
+        now = time.monotonic()
+        while self._entries:
+            oldest = next(iter(self._entries))
+            if self._entries[oldest][0] >= now:
+                break
+            self._remove(oldest)
+            self._expired += 1
+
+        self._entries[key] = (now + self.ttl, value, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def stats(self) -> Dict:
+        data = super().stats()
+        data.update({
+            "entries": len(self._entries),
+            "bytes_used": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self._evictions,
+            "expired": self._expired
+        })
+        return data
+
+
+class RedisCompletionCache(CompletionCache):
+    """
+    Redis-backed cache shared by every worker process
+    Entries expire via SETEX; size bounds come from the server's maxmemory
+    policy (use allkeys-lru). Redis errors count as misses, never failures.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str = REDIS_URL, ttl: int = LLM_CACHE_TTL, prefix: str = "llm:completion:"):
+        if aioredis is None:
+            raise RuntimeError("Redis cache backend requires the 'redis' package")
+        super().__init__(ttl)
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._bytes_written = 0
+        self._errors = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            return self._record(await self._redis.get(self.prefix + key))
+        except Exception:
+            self._errors += 1
+            return self._record(None)
+
+    async def set(self, key: str, value: str):
+        try:
+            await self._redis.set(self.prefix + key, value, ex=self.ttl)
+            self._bytes_written += len(value.encode("utf-8"))
+        except Exception:
+            self._errors += 1
+
+    def stats(self) -> Dict:
+        data = super().stats()
+        data.update({
+            "bytes_written": self._bytes_written,
+            "errors": self._errors
+        })
+        return data
+
+
+def create_completion_cache(backend: str = LLM_CACHE_BACKEND) -> Optional[CompletionCache]:
+    """Build the cache selected by LLM_CACHE_BACKEND (None disables caching)"""
+    if backend == "redis":
+        return RedisCompletionCache()
+    if backend == "memory":
+        return MemoryCompletionCache()
+    return None
@@ -0,0 +1,240 @@
+# llm_client.py
+"""
+LLM Client for Dynamic AI Chatbot
+Talks to the Ollama HTTP API over a pool of persistent keep-alive connections
+"""
+
+import os
+import json
+import queue
+import threading
+import http.client
+from urllib.parse import urlparse
+from typing import Dict, Iterator, Optional
+
+# -------- CONFIGURATION --------
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://127.0.0.1:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3:8b")
+OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "8"))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "120"))
+
+# Errors that mean a pooled keep-alive connection went stale and the
+# request can safely be retried on a fresh connection
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class LLMError(Exception):
+    """Raised when the LLM backend cannot produce a completion"""
+
+
+class OllamaClient:
+    """
+    Thread-safe Ollama client
+    Features:
+    - Bounded pool of keep-alive HTTP connections (created lazily)
+    - Blocking and token-streaming generation
+    - Request / connection counters for monitoring
+    """
+
+    def __init__(
+        self,
+        base_url: str = OLLAMA_URL,
+        model: str = OLLAMA_MODEL,
+        pool_size: int = OLLAMA_POOL_SIZE,
+        timeout: float = OLLAMA_TIMEOUT
+    ):
+        parsed = urlparse(base_url)
+        self.base_url = base_url
+        self.model = model
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+        self._host = parsed.hostname or "127.0.0.1"
+        self._https = parsed.scheme == "https"
+        self._port = parsed.port or (443 if self._https else 80)
+
+        # Every slot starts empty (None) and gets a connection on first use
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(None)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections_opened = 0
+        self._errors = 0
+
+    # -------- CONNECTION POOL --------
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        conn_class = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        with self._lock:
+            self._connections_opened += 1
+        return conn_class(self._host, self._port, timeout=self.timeout)
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        try:
+            conn = self._pool.get(timeout=self.timeout)
+        except queue.Empty:
+            raise LLMError("Timed out waiting for a free Ollama connection")
+        return conn or self._new_connection()
+
+    def _release(self, conn: Optional[http.client.HTTPConnection]):
+        """Return a connection to the pool (None frees the slot)"""
+        self._pool.put(conn)
+
+    def _discard(self, conn: Optional[http.client.HTTPConnection]):
+        if conn is not None:
+            conn.close()
+        self._release(None)
+
+    def _post(self, conn: http.client.HTTPConnection, path: str, payload: Dict) -> http.client.HTTPResponse:
+        body = json.dumps(payload).encode("utf-8")
+        conn.request("POST", path, body=body, headers={
+            "Content-Type": "application/json",
+            "Connection": "keep-alive"
+        })
+        return conn.getresponse()
+
+    def _open_response(self, path: str, payload: Dict):
+        """Send a request, retrying once if the pooled connection was stale"""
+        with self._lock:
+            self._requests += 1
+
+        conn = self._acquire()
+        for attempt in range(2):
+            try:
+                response = self._post(conn, path, payload)
+                break
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if attempt == 1:
+                    self._discard(None)
+                    raise
+                conn = self._new_connection()
+            except Exception:
+                self._discard(conn)
+                raise
+
+        if response.status != 200:
+            detail = response.read().decode("utf-8", errors="replace")
+            self._release(conn)
+            raise LLMError(f"Ollama returned HTTP {response.status}: {detail}")
+
+        return conn, response
+
+    # -------- GENERATION --------
+
+    def _payload(self, prompt: str, stream: bool, options: Optional[Dict]) -> Dict:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream
+        }
+        if options:
+            payload["options"] = options
+        return payload
+
+    def generate(self, prompt: str, options: Optional[Dict] = None) -> str:
+        """
+        Generate a full completion for a prompt
+
+        Args:
+            prompt: Prompt text sent to the model
+            options: Optional Ollama model options (temperature, num_predict, ...)
+
+        Returns:
+            The completion text
+        """
+        try:
+            conn, response = self._open_response("/api/generate", self._payload(prompt, False, options))
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+
+        try:
+            data = json.loads(response.read())
+        except Exception:
+            self._discard(conn)
+            with self._lock:
+                self._errors += 1
+            raise
+
+        self._release(conn)
+        if data.get("error"):
+            raise LLMError(data["error"])
+        return data.get("response", "")
+
+    def generate_stream(self, prompt: str, options: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Generate a completion token by token
+
+        Args:
+            prompt: Prompt text sent to the model
+            options: Optional Ollama model options
+
+        Yields:
+            Text fragments as the model produces them
+        """
+        try:
+            conn, response = self._open_response("/api/generate", self._payload(prompt, True, options))
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+
+        finished = False
+        try:
+            for line in response:
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise LLMError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    finished = True
+                    break
+        finally:
+            if finished:
+                # Drain the terminating chunk so the connection can be reused
+                response.read()
+                self._release(conn)
+            else:
+                # Abandoned or failed mid-stream: the socket is in an unknown state
+                with self._lock:
+                    self._errors += 1
+                self._discard(conn)
+
+    # -------- MONITORING --------
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "base_url": self.base_url,
+                "model": self.model,
+                "pool_size": self.pool_size,
+                "idle_slots": self._pool.qsize(),
+                "requests": self._requests,
+                "connections_opened": self._connections_opened,
+                "errors": self._errors
+            }
+
+    def close(self):
+        """Close every idle pooled connection"""
+        drained = []
+        while True:
+            try:
+                drained.append(self._pool.get_nowait())
+            except queue.Empty:
+                break
+        for conn in drained:
+            if conn is not None:
+                conn.close()
+            self._pool.put(None)
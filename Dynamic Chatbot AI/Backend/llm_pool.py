@@ -0,0 +1,116 @@
+# llm_pool.py
+"""
+Bounded LLM worker pool for Dynamic AI Chatbot
+Keeps blocking LLM calls off the event loop and sheds load when saturated
+"""
+
+import os
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterable
+
+from async_utils import iterate_in_thread
+
+# -------- CONFIGURATION --------
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))
+LLM_RETRY_AFTER = int(os.getenv("LLM_RETRY_AFTER", "5"))
+
+
+class PoolSaturated(Exception):
+    """Raised when a request cannot be admitted to the LLM pool"""
+
+    def __init__(self, detail: str, retry_after: int = LLM_RETRY_AFTER):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class LLMWorkerPool:
+    """
+    Admission-controlled pool of LLM worker threads
+    Features:
+    - At most `max_concurrency` LLM calls run at once
+    - At most `max_queue` requests wait for a worker; more are rejected at once
+    - Waiting requests give up after `queue_timeout` seconds
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_queue: int = LLM_MAX_QUEUE,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._workers = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._running = 0
+
+        # Counters
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def admit(self):
+        """Fail fast if a new request would not fit in the queue"""
+        if self._running + self._waiting >= self.max_concurrency + self.max_queue:
+            self._rejected += 1
+            raise PoolSaturated("LLM queue is full, please retry shortly")
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Wait (bounded by queue_timeout) for a free LLM worker"""
+        self.admit()
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._workers.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise PoolSaturated("Timed out waiting for an LLM worker")
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        try:
+            yield
+        finally:
+            self._running -= 1
+            self._completed += 1
+            self._workers.release()
+
+    async def run(self, func: Callable, *args):
+        """Run a blocking call on an LLM worker thread"""
+        async with self.slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def stream(self, iterable: Iterable) -> AsyncIterator:
+        """Consume a blocking iterator (e.g. a token stream) on an LLM worker thread"""
+        async with self.slot():
+            async for item in iterate_in_thread(iterable, executor=self._executor):
+                yield item
+
+    def load(self) -> float:
+        """Share of the pool (workers + queue) in use; 1.0 means new requests are rejected"""
+        return (self._running + self._waiting) / (self.max_concurrency + self.max_queue)
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "waiting": self._waiting,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
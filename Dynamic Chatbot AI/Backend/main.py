@@ -1,69 +1,132 @@
 # FREE Backend - No OpenAI API Key Required!
 # This is an AI that answers questions locally
-from email.mime import message
-import subprocess
-from database import engine
-from models import Base
+import os
+import json
+import time
+import asyncio
+from datetime import datetime
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Header, status
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel, EmailStr
-from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
-from fastapi import Depends
-from dependencies import get_current_user
-from database import get_db
-from models import User
-from auth import hash_password
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from database import engine, get_async_db, SessionLocal, AsyncSessionLocal, async_engine, database_stats
+from models import Base, User
+from auth import hash_password, verify_password
+from jwt_utils import create_access_token
+from dependencies import get_current_user, decode_access_token
+from llm_client import OllamaClient, LLMError
+from llm_pool import LLMWorkerPool, PoolSaturated
+from singleflight import SingleFlight
+from session_store import create_session_store
+from text_matcher import AhoCorasick, WORD, PREFIX
+from knowledge_base import KnowledgeBase
+from nlp_pipeline import NLPPipeline, inflight_load, FAST as FAST_TIER
+from sentiment import sentiment_analyzer
+from llm_cache import create_completion_cache, completion_key
+from message_writer import MessageWriter, Turn, MESSAGE_PERSIST, create_tables as create_message_tables
+from analytics import session_analytics
+from history import history_page, export_ndjson, export_filename, naive_utc, session_exists, HISTORY_PAGE_SIZE
+
 
 class RegisterRequest(BaseModel):
     email: EmailStr
     password: str
-from auth import verify_password
-from jwt_utils import create_access_token
-   
+
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
 
 
 Base.metadata.create_all(bind=engine)
+if MESSAGE_PERSIST:
+    create_message_tables(engine)
 # -------- LLM INTERFACE (OLLAMA) --------
-OLLAMA_PATH = r"C:\Users\akash\AppData\Local\Programs\Ollama\ollama.exe"
+# Endpoint, model and pool size come from OLLAMA_URL, OLLAMA_MODEL and
+# OLLAMA_POOL_SIZE (see llm_client.py); run ollama_stub.py to test without a model
+llm_client = OllamaClient()
+
+# At most LLM_MAX_CONCURRENCY generations run at once and LLM_MAX_QUEUE wait
+# (see llm_pool.py); anything beyond that is rejected with 503 + Retry-After
+llm_pool = LLMWorkerPool()
+llm_singleflight = SingleFlight()
+
+# Completion cache in front of the LLM, selected by LLM_CACHE_BACKEND
+# (memory | redis | none, see llm_cache.py)
+llm_cache = create_completion_cache()
+
+LLM_ERROR_PREFIX = "⚠️"
+
+def is_llm_error(text: str) -> bool:
+    return text.startswith(LLM_ERROR_PREFIX)
 
 def generate_llm_response(prompt: str) -> str:
     try:
-        result = subprocess.run(
-            [OLLAMA_PATH, "run", "llama3:8b"],
-            input=prompt,
-            text=True,
-            capture_output=True,
-            timeout=120
-        )
-
-        if result.stdout.strip():
-            return result.stdout.strip()
+        result = llm_client.generate(prompt)
 
-        if result.stderr.strip():
-            return f"⚠️ Ollama error: {result.stderr.strip()}"
+        if result.strip():
+            return result.strip()
 
         return "⚠️ LLM returned no output."
 
+    except LLMError as e:
+        return f"⚠️ Ollama error: {str(e)}"
     except Exception as e:
         return f"⚠️ Exception calling Ollama: {str(e)}"
 
 
+def generate_llm_stream(prompt: str):
+    """Yield completion tokens as Ollama produces them"""
+    try:
+        produced = False
+        for token in llm_client.generate_stream(prompt):
+            produced = True
+            yield token
+
+        if not produced:
+            yield "⚠️ LLM returned no output."
+
+    except LLMError as e:
+        yield f"⚠️ Ollama error: {str(e)}"
+    except Exception as e:
+        yield f"⚠️ Exception calling Ollama: {str(e)}"
+
+
 # -------- PROMPT BUILDER --------
 
-def build_prompt(history, user_message):
+PROMPT_HISTORY = 6  # most recent user/assistant entries carried into the prompt
+
+def build_prompt(history, user_message, analysis=None):
+    # Name, facts and preferences always go in; only the turns are cut to the latest few
+    facts = [msg for msg in history if msg["role"] == "system"]
+    turns = [msg for msg in history if msg["role"] != "system"]
     conversation = ""
-    for msg in history[-6:]:
+    for msg in facts + turns[-PROMPT_HISTORY:]:
         conversation += f"{msg['role'].capitalize()}: {msg['content']}\n"
 
+    # What the NLP stage found in the message (see analyze_message)
+    notes = ""
+    if analysis:
+        notes = f"Message analysis: intent={analysis['intent']}, sentiment={analysis['sentiment']}"
+        if analysis["entities"]:
+            notes += ", entities=" + "; ".join(f"{e['label']} {e['text']}" for e in analysis["entities"])
+        notes += "\n"
+
     prompt = f"""
 You are a helpful, conversational AI assistant.
 Answer clearly and naturally.
 
 Conversation so far:
 {conversation}
-
+{notes}
 User: {user_message}
 Assistant:
 """
@@ -71,23 +134,65 @@ Assistant:
 
 # ----------FastAPI Backend--------------------
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from datetime import datetime
-import re
-
 app = FastAPI()
+
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request, exc: PoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.on_event("startup")
+def start_knowledge_base_watcher():
+    knowledge_base.start_watching()
+
+
+@app.on_event("startup")
+def preload_nlp():
+    # The fast tier needs no models; heavier default tiers load spaCy in the background
+    if nlp_pipeline.default_tier != FAST_TIER:
+        nlp_pipeline.service.preload()
+
+
+@app.on_event("startup")
+def start_message_writer():
+    if message_writer is not None:
+        message_writer.start()
+
+
+@app.on_event("shutdown")
+async def flush_message_writer():
+    if message_writer is not None:
+        await message_writer.close()
+
+
+@app.on_event("shutdown")
+def shutdown_llm():
+    knowledge_base.stop_watching()
+    nlp_executor.shutdown(wait=False)
+    llm_pool.shutdown()
+    llm_client.close()
+
+
+@app.on_event("shutdown")
+async def close_database():
+    await async_engine.dispose()
+
+
 @app.post("/api/login")
-def login_user(
+async def login_user(
     request: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 1. Find user by email
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
 
-    # 2. Check email & password
-    if not user or not verify_password(request.password, user.hashed_password):
+    # 2. Check email & password (hashing is CPU-bound, keep it off the event loop)
+    if not user or not await run_in_threadpool(verify_password, request.password, user.hashed_password):
         raise HTTPException(
             status_code=401,
             detail="Invalid email or password"
@@ -103,12 +208,12 @@ def login_user(
 
 
 @app.post("/api/register")
-def register_user(
+async def register_user(
     request: RegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 1. Check if user already exists
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
     if user:
         raise HTTPException(
             status_code=400,
@@ -116,7 +221,7 @@ def register_user(
         )
 
     # 2. Hash password
-    hashed_pw = hash_password(request.password)
+    hashed_pw = await run_in_threadpool(hash_password, request.password)
 
     # 3. Create user
     new_user = User(
@@ -126,8 +231,15 @@ def register_user(
 
     # 4. Save to DB
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Registered concurrently by another request
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        )
 
     return {"message": "User registered successfully"}
 
@@ -147,134 +259,142 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     response: str
-    intent: str
+    intent: str  # NLPService label (nlp_service.py intent_patterns, or the classifier's), "general" if none
     sentiment: str
     entities: list
     response_time: int
+    timings: dict = {}  # ms per stage: nlp, rules, cache, generation, total
+    nlp_tier: Optional[str] = None  # tier that actually ran (may be lower than requested)
 # ------------------------------
-# SESSION MEMORY (IN-MEMORY)
+# SESSION MEMORY
 # ------------------------------
-SESSION_MEMORY = {}
-
-def get_session_history(session_id: str):
-    return SESSION_MEMORY.get(session_id, [])
-
-def save_to_memory(session_id: str, role: str, content: str):
-    SESSION_MEMORY.setdefault(session_id, []).append({
-        "role": role,
-        "content": content
-    })
-
-
-# Knowledge Base - Add more Q&A here!
-KNOWLEDGE_BASE = {
-    "machine learning": """Machine Learning is a subset of artificial intelligence that enables computers to learn and improve from experience without being explicitly programmed. 
-
-Key concepts:
-• Supervised Learning - Learning from labeled data
-• Unsupervised Learning - Finding patterns in unlabeled data
-• Neural Networks - Inspired by the human brain
-• Deep Learning - Multiple layers of neural networks
-
-Applications include image recognition, natural language processing, recommendation systems, and autonomous vehicles.""",
-
-    "deep learning": """Deep Learning is a subset of machine learning that uses artificial neural networks with multiple layers (hence "deep") to progressively extract higher-level features from raw input.
-
-Key features:
-• Uses neural networks with many layers
-• Automatically learns feature representations
-• Excels at tasks like image recognition, speech recognition, and NLP
-• Requires large amounts of data and computational power
-
-Popular frameworks: TensorFlow, PyTorch, Keras""",
-
-    "neural network": """A Neural Network is a computing system inspired by biological neural networks in animal brains. It consists of interconnected nodes (neurons) organized in layers.
-
-Structure:
-• Input Layer - Receives data
-• Hidden Layers - Process information
-• Output Layer - Produces results
-
-Types: Feedforward, Convolutional (CNN), Recurrent (RNN), Transformer""",
-
-    "nlp": """Natural Language Processing (NLP) is a branch of AI that helps computers understand, interpret, and manipulate human language.
-
-Key tasks:
-• Text Classification
-• Sentiment Analysis
-• Named Entity Recognition (NER)
-• Machine Translation
-• Question Answering
-• Text Summarization
-
-Popular models: BERT, GPT, T5, RoBERTa""",
-
-    "python": """Python is a high-level, interpreted programming language known for its simplicity and readability. It's extremely popular for:
-
-• Data Science & Machine Learning
-• Web Development
-• Automation & Scripting
-• Scientific Computing
-
-Key libraries: NumPy, Pandas, TensorFlow, PyTorch, Scikit-learn, Django, Flask""",
-
-    "ai": """Artificial Intelligence (AI) is the simulation of human intelligence by machines. It includes:
-
-• Machine Learning - Learning from data
-• Deep Learning - Neural networks
-• Natural Language Processing - Understanding text
-• Computer Vision - Understanding images
-• Robotics - Physical AI systems
-
-AI is transforming industries from healthcare to finance to transportation.""",
-
-    "data science": """Data Science is an interdisciplinary field that uses scientific methods, processes, and algorithms to extract knowledge and insights from structured and unstructured data.
+# SESSION_BACKEND=memory keeps sessions in this process (bounded by SESSION_TTL,
+# SESSION_MAX_SESSIONS, SESSION_MAX_BYTES, SESSION_MAX_TURNS); SESSION_BACKEND=redis
+# shares them so uvicorn can run with --workers N (see session_store.py)
+session_store = create_session_store()
+
+def memory_key(user: Optional[str], session_id: str) -> str:
+    """Store key for a conversation; session ids are client-chosen, so each account gets its own"""
+    return f"{user}:{session_id}"
+
+async def get_session_history(session_id: str):
+    return await session_store.get_history(session_id)
+
+async def save_to_memory(session_id: str, role: str, content: str):
+    await session_store.append(session_id, role, content)
+
+async def get_session_profile(session_id: str):
+    """Name, facts and preferences for a session, maintained on write"""
+    return await session_store.get_profile(session_id)
+
+async def save_turn(session_id: str, message: str, response: str):
+    """Remember a completed exchange so later prompts carry the conversation"""
+    if is_llm_error(response):
+        return
+    await save_to_memory(session_id, "user", message)
+    await save_to_memory(session_id, "assistant", response)
+
+
+# -------- CHAT PERSISTENCE --------
+# Every turn is also stored in the sessions/messages tables (model_database.py).
+# Writes are queued and flushed in bulk by a background task (see
+# message_writer.py); MESSAGE_PERSIST=false turns this off.
+message_writer = MessageWriter(SessionLocal) if MESSAGE_PERSIST else None
+
+
+async def persist_turn(session_id: str, message: str, response: str, analysis: dict,
+                       user: Optional[str], started_at: datetime, response_time: int,
+                       model_used: str, tokens_used: Optional[int] = None):
+    # Like save_turn, failed generations are not stored
+    if message_writer is None or is_llm_error(response):
+        return
+    await message_writer.submit(Turn(
+        session_id=session_id,
+        message=message,
+        response=response,
+        user=user,
+        timestamp=started_at,
+        responded_at=datetime.utcnow(),
+        intent=analysis["intent"],
+        confidence=analysis["confidence"],
+        sentiment=analysis["sentiment"],
+        sentiment_score=analysis["sentiment_score"],
+        entities=analysis["entities"],
+        response_time=response_time,
+        model_used=model_used,
+        tokens_used=tokens_used
+    ))
+
+
+# -------- RULE MATCHER --------
+# Every knowledge base topic and rule phrase lives in one Aho-Corasick automaton,
+# so a message is scanned once no matter how many topics there are.
+# Groups are listed in the order get_rule_response checks them.
+RULE_PHRASES = {
+    "ask_name": (["what is my name", "do you know my name"], WORD),
+    "recall": (["what do you know about me"], WORD),
+    "greeting": (["hello", "hi", "hey", "greetings"], WORD),
+    "thanks": (["thank"], PREFIX),
+    "help": (["help", "assist"], PREFIX),
+    "capabilities": (["what can you do", "your capabilities"], WORD),
+}
 
-Key skills:
-• Statistics & Mathematics
-• Programming (Python, R)
-• Data Visualization
-• Machine Learning
-• Domain Knowledge
+def build_rule_matcher(topics) -> AhoCorasick:
+    matcher = AhoCorasick()
+    for priority, topic in enumerate(topics):
+        # Topics match whole words, plus a plain plural ("neural networks")
+        matcher.add(topic, ("topic", priority, topic), WORD)
+        matcher.add(topic + "s", ("topic", priority, topic), WORD)
+    for group, (phrases, boundary) in RULE_PHRASES.items():
+        for phrase in phrases:
+            matcher.add(phrase, (group, 0, phrase), boundary)
+    matcher.build()
+    return matcher
 
-Career paths: Data Scientist, ML Engineer, Data Analyst, AI Researcher""",
+# Knowledge Base - add Q&A files under Backend/knowledge (or KB_PATH)!
+# Edits are picked up without a restart (see knowledge_base.py)
+knowledge_base = KnowledgeBase(matcher_factory=build_rule_matcher)
 
-    "chatgpt": """ChatGPT is a large language model developed by OpenAI based on the GPT (Generative Pre-trained Transformer) architecture.
 
-Features:
-• Understands and generates human-like text
-• Can answer questions, write code, create content
-• Trained on vast amounts of internet text
-• Uses transformer architecture
-• Supports conversational interactions
+def match_rules(kb_index, message_lower: str) -> dict:
+    """Single pass: group -> matched key, keeping the highest-priority topic"""
+    found = {}
+    for match in kb_index.matcher.iter_matches(message_lower):
+        group, priority, key = match.payload
+        if group not in found or priority < found[group][0]:
+            found[group] = (priority, key)
+    return {group: key for group, (_, key) in found.items()}
 
-You're talking to a chatbot inspired by ChatGPT right now!"""
-}
 
-def get_ai_response(message: str, session_id: str) -> str:
-    history = get_session_history(session_id)
+async def get_rule_response(message: str, session_id: str):
+    """Answer from memory, the knowledge base and canned rules; None means ask the LLM"""
 
-    def prefers_short_answers():
-        return any(
-            entry["role"] == "system" and entry["content"] == "pref:short_answers"
-            for entry in reversed(history)
-    )
+    async def prefers_short_answers():
+        return await session_store.has_preference(session_id, "short_answers")
 
     message_lower = message.lower().strip()
+    kb_index = knowledge_base.index  # one consistent snapshot per message
+    matched = match_rules(kb_index, message_lower)
 
 
     # -------- NAME MEMORY LOGIC --------
     if message_lower.startswith("my name is"):
         name = message.split("my name is")[-1].strip().title()
-        save_to_memory(session_id, "system", f"name:{name}")
+        await save_to_memory(session_id, "system", f"name:{name}")
         return f"Nice to meet you, {name}! I’ll remember your name 😊"
-    elif "what is my name" in message_lower or "do you know my name" in message_lower:
-        for entry in reversed(history):
-            if entry["role"] == "system" and entry["content"].startswith("name:"):
-                name = entry["content"].split("name:")[-1]
-                return f"Your name is {name}! 😊"
+    elif "ask_name" in matched:
+        name = (await get_session_profile(session_id))["name"]
+        if name:
+            return f"Your name is {name}! 😊"
         return "I don't know your name yet. You can tell me by saying 'My name is ...'."
 
+# -------- PREFERENCE: SHORT ANSWERS --------
+    # Checked before the fact patterns, otherwise "i prefer " swallows it
+    if message_lower.startswith("i prefer short"):
+        await save_to_memory(session_id, "system", "pref:short_answers")
+        return "Got it 👍 I’ll keep explanations short."
+
+
 # -------- USER FACT MEMORY --------
     fact_patterns = [
     "i like ",
@@ -291,23 +411,13 @@ def get_ai_response(message: str, session_id: str) -> str:
     for pattern in fact_patterns:
         if message_lower.startswith(pattern):
             fact = message[len(pattern):].strip()
-            save_to_memory(session_id, "system", f"fact:{pattern}{fact}")
+            await save_to_memory(session_id, "system", f"fact:{pattern}{fact}")
             return "Got it 👍 I’ll remember that."
         
 
-# -------- PREFERENCE: SHORT ANSWERS --------
-    if message_lower.startswith("i prefer short"):
-        save_to_memory(session_id, "system", "pref:short_answers")
-        return "Got it 👍 I’ll keep explanations short."
-    
-
 # -------- FACT RECALL --------
-    if "what do you know about me" in message_lower:
-        facts = [
-            entry["content"].replace("fact:", "")
-            for entry in reversed(history)
-            if entry["role"] == "system" and entry["content"].startswith("fact:")
-    ]
+    if "recall" in matched:
+        facts = list(reversed((await get_session_profile(session_id))["facts"]))
 
         if facts:
             return "Here’s what I remember about you:\n- " + "\n- ".join(facts)
@@ -316,25 +426,24 @@ def get_ai_response(message: str, session_id: str) -> str:
 
 
     # Check knowledge base for matches
-    for topic, response in KNOWLEDGE_BASE.items():
-        if topic in message_lower:
-            if prefers_short_answers():
-            # Short explanation (first 1–2 lines)
-                short = response.split("\n")[0]
-                return short
-            return response
+    if "topic" in matched:
+        entry = kb_index.get(matched["topic"])
+        if await prefers_short_answers():
+            # Short explanation, precomputed when the index was built
+            return entry.short
+        return entry.answer
 
     
     # Greeting responses
-    if any(word in message_lower for word in ["hello", "hi", "hey", "greetings"]):
+    if "greeting" in matched:
         return "Hello! I'm here to help you learn about AI, Machine Learning, Deep Learning, and related topics. What would you like to know?"
     
     # Gratitude responses
-    if any(word in message_lower for word in ["thank", "thanks"]):
+    if "thanks" in matched:
         return "You're welcome! Feel free to ask me anything about AI, ML, Deep Learning, NLP, Data Science, or programming!"
     
     # Help requests
-    if any(word in message_lower for word in ["help", "assist"]):
+    if "help" in matched:
         return """I can help you with:
 • Machine Learning concepts
 • Deep Learning & Neural Networks
@@ -347,7 +456,7 @@ def get_ai_response(message: str, session_id: str) -> str:
 Just ask me a question about any of these topics!"""
     
     # Question about capabilities
-    if "what can you do" in message_lower or "your capabilities" in message_lower:
+    if "capabilities" in matched:
         return """I can:
 ✓ Answer questions about AI, ML, and Deep Learning
 ✓ Explain programming concepts (especially Python)
@@ -358,8 +467,62 @@ Just ask me a question about any of these topics!"""
 ✓ Extract entities like emails and dates
 
 Try asking me about any of these topics!"""
-    prompt = build_prompt(history,message)
-    return generate_llm_response(prompt)
+
+    # Ranked retrieval for questions that paraphrase a topic; weak or one-word
+    # matches go to the LLM (KB_MIN_CONFIDENCE / KB_MIN_COVERAGE / KB_MIN_TERMS, see kb_search.py)
+    hit = kb_index.search.best(message_lower)
+    if hit is not None:
+        entry = kb_index.get(hit.topic)
+        return entry.short if await prefers_short_answers() else entry.answer
+
+    return None
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def get_ai_response(message: str, session_id: str, analysis=None, timings: Optional[dict] = None) -> str:
+    """
+    analysis: optional future from start_analysis(); its result goes into the prompt
+    timings: optional dict that receives ms per stage (rules, cache, generation)
+    """
+    timings = {} if timings is None else timings
+
+    start = time.perf_counter()
+    response = await get_rule_response(message, session_id)
+    timings["rules"] = elapsed_ms(start)
+    if response is not None:
+        return response
+
+    # Started before the rules ran, so it is normally done by now
+    analysis_result = await analysis if analysis is not None else None
+    prompt = build_prompt(await get_session_history(session_id), message, analysis_result)
+    cache_key = completion_key(prompt, llm_client.model)
+
+    if llm_cache is not None:
+        start = time.perf_counter()
+        cached = await llm_cache.get(cache_key)
+        timings["cache"] = elapsed_ms(start)
+        if cached is not None:
+            return cached
+
+    # Identical prompts already being generated share that one generation
+    start = time.perf_counter()
+    response = await llm_singleflight.do(
+        cache_key,
+        lambda: generate_and_cache(prompt, cache_key)
+    )
+    timings["generation"] = elapsed_ms(start)
+    return response
+
+
+async def generate_and_cache(prompt: str, cache_key: str) -> str:
+    # The LLM call blocks, so it runs on the bounded worker pool
+    response = await llm_pool.run(generate_llm_response, prompt)
+    if llm_cache is not None and not is_llm_error(response):
+        await llm_cache.set(cache_key, response)
+    return response
  
 
 @app.get("/health")
@@ -371,107 +534,366 @@ async def health_check():
         "message": "Backend running - No API key required!"
     }
 
+@app.get("/api/stats")
+async def stats():
+    """Runtime counters for the LLM, NLP, persistence and database pool paths"""
+    return {
+        "llm_pool": llm_pool.stats(),
+        "llm_singleflight": llm_singleflight.stats(),
+        "llm_cache": llm_cache.stats() if llm_cache is not None else None,
+        "sessions": await session_store.stats(),
+        "knowledge_base": knowledge_base.stats(),
+        "nlp": nlp_pipeline.stats(),
+        "sentiment": sentiment_analyzer.stats(),
+        "message_writer": message_writer.stats() if message_writer is not None else None,
+        "database": database_stats(),
+        "llm_client": llm_client.stats()
+    }
+
+@app.get("/api/analytics/{session_id}")
+async def get_session_analytics(
+    session_id: str,
+    buckets: int = 24,
+    current_user: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Protected analytics endpoint – requires JWT, only the caller's own sessions
+    Session totals plus the latest `buckets` time buckets (ANALYTICS_BUCKET),
+    read from rollups that message_writer.py keeps up to date
+    """
+    result = await session_analytics(db, session_id, current_user, buckets)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No analytics for this session")
+    return result
+
+@app.get("/api/history/{session_id}")
+async def get_history(
+    session_id: str,
+    limit: int = HISTORY_PAGE_SIZE,
+    before: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Protected history endpoint – requires JWT, only the caller's own sessions
+    Newest page first; pass next_cursor back as ?before= for older messages.
+    Turns appear once the write-behind queue has flushed them (WRITE_FLUSH_INTERVAL).
+    """
+    try:
+        page = await history_page(db, session_id, current_user, limit, before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return page
+
+@app.get("/api/export")
+async def export_messages(
+    session_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    compress: Optional[str] = None,
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Protected transcript export – requires JWT, only the caller's own sessions
+    Streams NDJSON (one message per line) for a session and/or a [since, until)
+    range; ?compress=gzip returns a .ndjson.gz download. Memory use is constant.
+    """
+    if session_id is None and since is None and until is None:
+        raise HTTPException(status_code=400, detail="Give a session_id, a since/until range, or both")
+    if compress not in (None, "gzip"):
+        raise HTTPException(status_code=400, detail="compress must be gzip")
+    # Compared with naive UTC columns; a mismatch would only fail once the 200 is sent
+    since, until = naive_utc(since), naive_utc(until)
+    # Checked before streaming starts, so a foreign session is a 404 and not an empty 200;
+    # a short-lived session, so no connection is held while the client downloads
+    if session_id is not None:
+        async with AsyncSessionLocal() as db:
+            if not await session_exists(db, session_id, current_user):
+                raise HTTPException(status_code=404, detail="Session not found")
+
+    filename = export_filename(session_id, compress == "gzip")
+    return StreamingResponse(
+        export_ndjson(AsyncSessionLocal, current_user, session_id, since, until, compress == "gzip"),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.post("/api/chat")
 async def chat(
     request: ChatRequest,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    x_nlp_tier: Optional[str] = Header(None)
 ):
     """
     Protected chat endpoint – requires JWT
+    NLP analysis runs on a worker thread while the response is produced;
+    the X-NLP-Tier header (fast | balanced | full) overrides NLP_TIER
     """
-    start_time = datetime.now()
+    start_time = time.perf_counter()
+    started_at = datetime.utcnow()
+    timings = {}
 
-    response_text = get_ai_response(
+    memory_id = memory_key(current_user, request.session_id)
+    analysis = start_analysis(request.message, x_nlp_tier, timings)
+    response_text = await get_ai_response(
         request.message,
-        request.session_id
+        memory_id,
+        analysis,
+        timings
+    )
+    await save_turn(memory_id, request.message, response_text)
+
+    result = await analysis
+    timings["total"] = elapsed_ms(start_time)
+    await persist_turn(
+        request.session_id, request.message, response_text, result, current_user, started_at,
+        # Rule answers never reach the cache or generation stages
+        int(timings["total"]), llm_client.model if timings.keys() & {"cache", "generation"} else "rules"
     )
-
-    sentiment = analyze_sentiment(request.message)
-    intent = detect_intent(request.message)
-    entities = extract_entities(request.message)
-
-    end_time = datetime.now()
-    response_time = int((end_time - start_time).total_seconds() * 1000)
 
     return ChatResponse(
         response=response_text,
-        intent=intent,
-        sentiment=sentiment,
-        entities=entities,
-        response_time=response_time
+        intent=result["intent"],
+        sentiment=result["sentiment"],
+        entities=result["entities"],
+        response_time=int(timings["total"]),
+        timings=timings,
+        nlp_tier=result["tier"]
     )
 
 
-def analyze_sentiment(text: str) -> str:
-    """Analyze sentiment of the message"""
-    text_lower = text.lower()
-    
-    positive_words = ["good", "great", "excellent", "happy", "love", "thanks", "thank you", 
-                     "awesome", "amazing", "wonderful", "fantastic", "perfect"]
-    negative_words = ["bad", "terrible", "awful", "hate", "sad", "angry", "worst", 
-                     "horrible", "poor", "disappointed", "frustrating"]
-    
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
-    
-    if positive_count > negative_count:
-        return "positive"
-    elif negative_count > positive_count:
-        return "negative"
+async def chat_events(message: str, session_id: str, tier: Optional[str] = None, user: Optional[str] = None):
+    """
+    Produce the event sequence for one chat turn, shared by SSE and WebSocket
+    Yields (event, data): meta (intent/sentiment/entities/tier), token (text), done (timings)
+    """
+    start_time = time.perf_counter()
+    started_at = datetime.utcnow()
+    memory_id = memory_key(user, session_id)
+
+    analysis = await start_analysis(message, tier)
+    yield "meta", analysis
+
+    response_text = await get_rule_response(message, memory_id)
+    first_token_ms = None
+    token_count = 0
+
+    if response_text is not None:
+        source = "rules"
+        first_token_ms = int((time.perf_counter() - start_time) * 1000)
+        token_count = 1
+        yield "token", {"text": response_text}
     else:
-        return "neutral"
+        prompt = build_prompt(await get_session_history(memory_id), message, analysis)
+        cache_key = completion_key(prompt, llm_client.model)
+        cached = await llm_cache.get(cache_key) if llm_cache is not None else None
+
+        if cached is not None:
+            source = "cache"
+            first_token_ms = int((time.perf_counter() - start_time) * 1000)
+            token_count = 1
+            response_text = cached
+            yield "token", {"text": cached}
+        else:
+            source = "llm"
+            tokens = []
+            try:
+                async for token in llm_pool.stream(generate_llm_stream(prompt)):
+                    if first_token_ms is None:
+                        first_token_ms = int((time.perf_counter() - start_time) * 1000)
+                    token_count += 1
+                    tokens.append(token)
+                    yield "token", {"text": token}
+            except PoolSaturated as e:
+                yield "error", {"detail": e.detail, "retry_after": e.retry_after}
+                return
+
+            response_text = "".join(tokens).strip()
+            if response_text and not any(is_llm_error(t) for t in tokens):
+                if llm_cache is not None:
+                    await llm_cache.set(cache_key, response_text)
+            else:
+                response_text = None  # nothing worth remembering
+
+    response_time = int((time.perf_counter() - start_time) * 1000)
+    if response_text is not None:
+        await save_turn(memory_id, message, response_text)
+        await persist_turn(
+            session_id, message, response_text, analysis, user, started_at, response_time,
+            "rules" if source == "rules" else llm_client.model, token_count if source == "llm" else None
+        )
+    yield "done", {
+        "source": source,
+        "tokens": token_count,
+        "first_token_ms": first_token_ms,
+        "response_time": response_time
+    }
 
-def detect_intent(text: str) -> str:
-    """Detect the intent of the message"""
-    text_lower = text.lower()
-    
-    if any(word in text_lower for word in ["hello", "hi", "hey", "greetings", "good morning", "good evening"]):
-        return "greeting"
-    elif "?" in text or any(word in text_lower for word in ["what", "how", "why", "when", "where", "who", "which"]):
-        return "question"
-    elif any(word in text_lower for word in ["thank", "thanks", "appreciate", "grateful"]):
-        return "gratitude"
-    elif any(word in text_lower for word in ["help", "assist", "support", "need"]):
-        return "help_request"
-    elif any(word in text_lower for word in ["explain", "tell me", "describe", "define"]):
-        return "explanation"
-    else:
-        return "statement"
 
-def extract_entities(text: str) -> list:
-    """Extract entities from text"""
-    entities = []
-    
-    # Email detection
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
-    for email in emails:
-        entities.append({"text": email, "label": "EMAIL"})
-    
-    # URL detection
-    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-    urls = re.findall(url_pattern, text)
-    for url in urls:
-        entities.append({"text": url, "label": "URL"})
-    
-    # Phone number detection
-    phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-    phones = re.findall(phone_pattern, text)
-    for phone in phones:
-        entities.append({"text": phone, "label": "PHONE"})
-    
-    # Date detection (simple)
-    months = ["january", "february", "march", "april", "may", "june", 
-              "july", "august", "september", "october", "november", "december"]
-    if any(month in text.lower() for month in months):
-        entities.append({"text": "date mentioned", "label": "DATE"})
-    
-    # Number detection
-    numbers = re.findall(r'\b\d+\b', text)
-    if numbers:
-        entities.append({"text": f"{len(numbers)} number(s)", "label": "NUMBER"})
-    
-    return entities
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: str = Depends(get_current_user),
+    x_nlp_tier: Optional[str] = Header(None)
+):
+    """
+    Protected streaming chat endpoint – requires JWT
+    Events: meta (intent/sentiment/entities/tier), token (text fragments), done (timings)
+    """
+    async def event_stream():
+        async for event, data in chat_events(request.message, request.session_id, x_nlp_tier, current_user):
+            yield sse_event(event, data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# -------- WEBSOCKET TRANSPORT --------
+# One socket authenticates once and multiplexes many session_id conversations.
+# Backpressure: a connection stops reading new frames while WS_MAX_INFLIGHT
+# turns are running, and producers wait when the send queue is full.
+WS_MAX_INFLIGHT = int(os.getenv("WS_MAX_INFLIGHT", "4"))
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+
+
+async def authenticate_websocket(websocket: WebSocket, token: Optional[str]) -> Optional[str]:
+    """Accept the socket and authenticate via ?token= or a first {"type": "auth"} frame"""
+    await websocket.accept()
+
+    if token is None:
+        try:
+            frame = json.loads(await websocket.receive_text())
+            if frame.get("type") == "auth":
+                token = frame.get("token")
+        except (json.JSONDecodeError, AttributeError):
+            pass
+
+    try:
+        current_user = decode_access_token(token or "")
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return None
+
+    await websocket.send_json({"type": "ready", "user": current_user})
+    return current_user
+
+
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Protected WebSocket chat endpoint – requires JWT once per connection
+    Client frames: {"session_id": ..., "message": ..., "request_id": optional, "tier": optional}
+    Server frames: ready, meta, token, done, error (tagged with session_id/request_id)
+    """
+    current_user = await authenticate_websocket(websocket, token)
+    if current_user is None:
+        return
+
+    outbox = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+    inflight = asyncio.Semaphore(WS_MAX_INFLIGHT)
+    session_locks = {}
+    tasks = set()
+
+    async def writer():
+        while True:
+            await websocket.send_json(await outbox.get())
+
+    async def handle_turn(session_id: str, message: str, request_id, tier: Optional[str]):
+        # Turns in the same session run in order so memory stays consistent
+        lock = session_locks.setdefault(session_id, asyncio.Lock())
+        try:
+            async with lock:
+                async for event, data in chat_events(message, session_id, tier, current_user):
+                    await outbox.put({
+                        "type": event,
+                        "session_id": session_id,
+                        "request_id": request_id,
+                        **data
+                    })
+        except Exception as e:
+            await outbox.put({
+                "type": "error",
+                "session_id": session_id,
+                "request_id": request_id,
+                "detail": str(e)
+            })
+        finally:
+            inflight.release()
+
+    writer_task = asyncio.create_task(writer())
+    try:
+        while True:
+            await inflight.acquire()
+            try:
+                frame = json.loads(await websocket.receive_text())
+                request = ChatRequest(**frame)
+            except (json.JSONDecodeError, TypeError, ValueError) as e:
+                inflight.release()
+                await outbox.put({"type": "error", "detail": f"Invalid frame: {e}"})
+                continue
+
+            task = asyncio.create_task(
+                handle_turn(request.session_id, request.message, frame.get("request_id"), frame.get("tier"))
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks | {writer_task}:
+            task.cancel()
+
+
+# -------- MESSAGE ANALYSIS --------
+# Intent, sentiment and entities come from one pipeline (see nlp_pipeline.py)
+# and run on their own small thread pool, so they overlap with rule matching
+# and generation. The tier is NLP_TIER or the X-NLP-Tier header, and steps
+# down automatically while the LLM queue or the NLP backlog is filling up,
+# or while a tier runs over its latency budget.
+NLP_WORKERS = int(os.getenv("NLP_WORKERS", "2"))
+nlp_executor = ThreadPoolExecutor(max_workers=NLP_WORKERS, thread_name_prefix="nlp")
+nlp_backlog = 0  # analyses submitted and not finished yet
+
+
+def nlp_load() -> float:
+    return max(llm_pool.load(), inflight_load(nlp_backlog))
+
+
+nlp_pipeline = NLPPipeline(load_signal=nlp_load)
+
+
+def analyze_message(message: str, tier: Optional[str] = None, timings: Optional[dict] = None) -> dict:
+    analysis = nlp_pipeline.analyze(message, tier)
+    if timings is not None:
+        timings["nlp"] = analysis["ms"]
+    return analysis
+
+
+def start_analysis(message: str, tier: Optional[str] = None, timings: Optional[dict] = None) -> asyncio.Future:
+    """Schedule analyze_message on the NLP threads; await the future for the result"""
+    global nlp_backlog
+    nlp_backlog += 1
+
+    def finished(_):
+        global nlp_backlog
+        nlp_backlog -= 1
+
+    future = asyncio.get_running_loop().run_in_executor(nlp_executor, analyze_message, message, tier, timings)
+    future.add_done_callback(finished)
+    return future
 
 if __name__ == "__main__":
     import uvicorn
@@ -485,6 +907,8 @@ if __name__ == "__main__":
     print("📝 Endpoints:")
     print("   Health: http://127.0.0.1:8000/health")
     print("   Chat:   http://127.0.0.1:8000/api/chat")
+    print("   Stream: http://127.0.0.1:8000/api/chat/stream (SSE)")
+    print("   Socket: ws://127.0.0.1:8000/ws/chat?token=<JWT>")
     print("=" * 60)
     
     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
@@ -0,0 +1,362 @@
+# message_writer.py
+"""
+Write-behind persistence of chat turns for Dynamic AI Chatbot
+Turns are queued in memory and one background task writes them to the
+sessions and messages tables (model_database.py) in bulk, so the request
+path never waits on the database.
+- a batch is written when it reaches WRITE_BATCH_SIZE turns or
+  WRITE_FLUSH_INTERVAL seconds after its first turn, whichever comes first
+- the queue holds at most WRITE_QUEUE_SIZE turns; when it is full,
+  WRITE_QUEUE_POLICY decides: drop (discard the new turn at once) or
+  block (the request waits up to WRITE_BLOCK_TIMEOUT seconds, then drops)
+- close() writes everything still queued (called on shutdown)
+"""
+
+import os
+import time
+import asyncio
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Column, Index, MetaData, String, Table, bindparam, func, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+
+from analytics import update_rollups
+from model_database import Session as ChatSession, Message, Analytics
+from models import User
+
+# -------- CONFIGURATION --------
+MESSAGE_PERSIST = os.getenv("MESSAGE_PERSIST", "true").lower() in ("1", "true", "yes")
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "200"))          # turns per bulk insert
+WRITE_FLUSH_INTERVAL = float(os.getenv("WRITE_FLUSH_INTERVAL", "0.5"))  # max seconds a turn waits
+WRITE_QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", "10000"))         # turns held in memory
+WRITE_QUEUE_POLICY = os.getenv("WRITE_QUEUE_POLICY", "drop")           # drop | block
+WRITE_BLOCK_TIMEOUT = float(os.getenv("WRITE_BLOCK_TIMEOUT", "1.0"))
+WRITE_SHUTDOWN_TIMEOUT = float(os.getenv("WRITE_SHUTDOWN_TIMEOUT", "10"))
+
+DROP = "drop"
+BLOCK = "block"
+POLICIES = (DROP, BLOCK)
+
+_STOP = object()
+
+
+class Turn(NamedTuple):
+    """One user message and the bot's reply, with its analysis and timings"""
+    session_id: str
+    message: str
+    response: str
+    user: Optional[str] = None           # account email, links new sessions to users.id
+    timestamp: Optional[datetime] = None  # when the message arrived
+    responded_at: Optional[datetime] = None
+    intent: Optional[str] = None
+    confidence: Optional[float] = None
+    sentiment: Optional[str] = None
+    sentiment_score: Optional[float] = None
+    entities: Optional[list] = None
+    response_time: Optional[int] = None  # ms
+    model_used: Optional[str] = None
+    tokens_used: Optional[int] = None
+
+
+def create_tables(engine):
+    """Create the sessions, messages and analytics tables (and their indexes) if they do not exist yet"""
+    tables = [ChatSession.__table__, Message.__table__, Analytics.__table__]
+    ChatSession.metadata.create_all(bind=engine, tables=tables)
+    _drop_global_session_key(engine)
+    # create_all skips indexes added to tables that already exist
+    for table in tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _drop_global_session_key(engine):
+    """Older databases have a unique index on sessions.session_id alone; sessions are now unique per user"""
+    for index in inspect(engine).get_indexes(ChatSession.__tablename__):
+        if index["unique"] and index["column_names"] == ["session_id"]:
+            # A detached copy of the table, so the model's metadata is left alone
+            table = Table(ChatSession.__tablename__, MetaData(), Column("session_id", String(100)))
+            Index(index["name"], table.c.session_id).drop(bind=engine)
+
+
+SessionKey = Tuple[Optional[int], str]  # (users.id, client session_id)
+
+
+def _session_ids(db, keys: Sequence[SessionKey]) -> Dict[SessionKey, int]:
+    rows = db.execute(
+        select(ChatSession.user_id, ChatSession.session_id, ChatSession.id)
+        .where(ChatSession.session_id.in_({session_id for _, session_id in keys}))
+    ).all()
+    wanted = set(keys)
+    return {(user_id, session_id): pk for user_id, session_id, pk in rows if (user_id, session_id) in wanted}
+
+
+def _message_rows(turn: Turn, session_pk: int) -> List[Dict]:
+    user_row = {
+        "session_id": session_pk,
+        "message_text": turn.message,
+        "sender": "user",
+        "timestamp": turn.timestamp,
+        "intent": turn.intent,
+        "sentiment": turn.sentiment,
+        "sentiment_score": turn.sentiment_score,
+        "entities": turn.entities,
+        "confidence": turn.confidence,
+        "response_time": None,
+        "model_used": None,
+        "tokens_used": None,
+    }
+    bot_row = {
+        **{key: None for key in user_row},
+        "session_id": session_pk,
+        "message_text": turn.response,
+        "sender": "bot",
+        "timestamp": turn.responded_at or turn.timestamp,
+        "response_time": turn.response_time,
+        "model_used": turn.model_used,
+        "tokens_used": turn.tokens_used,
+    }
+    return [user_row, bot_row]
+
+
+def write_turns(db, turns: Sequence[Turn]):
+    """
+    Persist a batch of turns in one transaction:
+    1 select + 1 insert for unknown sessions, 1 bulk insert of messages,
+    1 executemany update of session counters and the analytics rollups
+    (see analytics.py), however many turns there are
+    """
+    now = datetime.utcnow()
+    turns = [
+        turn._replace(timestamp=turn.timestamp or now, responded_at=turn.responded_at or turn.timestamp or now)
+        for turn in turns
+    ]
+    # A session belongs to the account that sent it: the same session_id from
+    # another account is a different session, never a write into this one
+    emails = {turn.user for turn in turns if turn.user}
+    user_ids = dict(db.execute(
+        select(User.email, User.id).where(User.email.in_(emails))
+    ).all()) if emails else {}
+    turn_keys = [(user_ids.get(turn.user), turn.session_id) for turn in turns]
+    keys = sorted(set(turn_keys), key=lambda key: (key[1], key[0] or 0))
+    ids = _session_ids(db, keys)
+
+    missing = [key for key in keys if key not in ids]
+    if missing:
+        first = {}
+        for key, turn in zip(turn_keys, turns):
+            first.setdefault(key, turn)
+        db.execute(insert(ChatSession), [
+            {
+                "session_id": key[1],
+                "user_id": key[0],
+                "started_at": first[key].timestamp,
+                "last_activity": first[key].timestamp,
+                "total_messages": 0,
+                "avg_sentiment": 0.0,
+                "is_active": True,
+            }
+            for key in missing
+        ])
+        ids.update(_session_ids(db, missing))
+    session_pks = [ids[key] for key in turn_keys]
+
+    rows = []
+    counters: Dict[int, Dict] = {}
+    for turn, session_pk in zip(turns, session_pks):
+        rows.extend(_message_rows(turn, session_pk))
+        counter = counters.setdefault(session_pk, {"sid": session_pk, "turns": 0, "score_sum": 0.0, "last_at": None})
+        counter["turns"] += 1
+        counter["score_sum"] += turn.sentiment_score or 0.0
+        counter["last_at"] = max(counter["last_at"] or turn.responded_at, turn.responded_at)
+    db.execute(insert(Message), rows)
+
+    # avg_sentiment is the running mean over user messages (two messages per turn)
+    table = ChatSession.__table__
+    previous_turns = func.coalesce(table.c.total_messages, 0) / 2.0
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("sid"))
+        .values(
+            total_messages=func.coalesce(table.c.total_messages, 0) + bindparam("turns") * 2,
+            avg_sentiment=(func.coalesce(table.c.avg_sentiment, 0.0) * previous_turns + bindparam("score_sum"))
+            / (previous_turns + bindparam("turns")),
+            last_activity=bindparam("last_at"),
+        ),
+        list(counters.values())
+    )
+    update_rollups(db, turns, session_pks)
+    db.commit()
+
+
+class MessageWriter:
+    """
+    Usage:
+        writer = MessageWriter(SessionLocal)
+        writer.start()                        # inside the running event loop
+        await writer.submit(Turn(session_id, message, response, ...))
+        await writer.close()                  # writes what is still queued
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        batch_size: int = WRITE_BATCH_SIZE,
+        flush_interval: float = WRITE_FLUSH_INTERVAL,
+        queue_size: int = WRITE_QUEUE_SIZE,
+        policy: str = WRITE_QUEUE_POLICY,
+        block_timeout: float = WRITE_BLOCK_TIMEOUT
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown write queue policy: {policy}")
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # One writer thread: batches are written in order and never contend with each other
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self._queued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0          # turns in batches that could not be written
+        self._failed_batches = 0
+        self._batches = 0
+        self._write_seconds = 0.0
+
+    # -------- PRODUCER --------
+
+    async def submit(self, turn: Turn) -> bool:
+        """Queue a turn for writing; False when it was dropped"""
+        if self._closed:
+            self._dropped += 1
+            return False
+        try:
+            if self.policy == BLOCK:
+                await asyncio.wait_for(self._queue.put(turn), self.block_timeout)
+            else:
+                self._queue.put_nowait(turn)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            self._dropped += 1
+            return False
+        self._queued += 1
+        return True
+
+    # -------- WRITER --------
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _next_batch(self) -> list:
+        """Wait for one turn, then collect more until the batch is full or the interval ends"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = await self._next_batch()
+            if batch[-1] is _STOP:
+                batch.pop()
+                stopping = True
+            if batch:
+                await loop.run_in_executor(self._executor, self._write, batch)
+
+    def _write(self, batch: List[Turn]):
+        start = time.perf_counter()
+        # A concurrent writer (another worker) may create the same session
+        # between our select and insert; the retry then finds it
+        for attempt in range(2):
+            db = self.session_factory()
+            try:
+                write_turns(db, batch)
+                self._written += len(batch)
+                break
+            except IntegrityError as e:
+                db.rollback()
+                if attempt:
+                    self._fail(batch, e)
+            except Exception as e:
+                db.rollback()
+                self._fail(batch, e)
+                break
+            finally:
+                db.close()
+        self._batches += 1
+        self._write_seconds += time.perf_counter() - start
+
+    def _fail(self, batch: List[Turn], error: Exception):
+        # The batch is lost; the counters keep that visible in /api/stats
+        self._failed += len(batch)
+        self._failed_batches += 1
+        print(f"⚠ Could not persist {len(batch)} chat turns: {error}")
+
+    async def close(self, timeout: float = WRITE_SHUTDOWN_TIMEOUT):
+        """Stop accepting turns and write everything already queued, within `timeout` seconds"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is None:
+            self.start()  # never started: write the backlog now
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        finished = False
+        try:
+            # With a full queue and a dead writer task the put would never return,
+            # so queueing the stop marker counts against the same timeout
+            await asyncio.wait_for(self._queue.put(_STOP), timeout)
+            await asyncio.wait_for(self._task, max(deadline - loop.time(), 0))
+            finished = True
+        except asyncio.TimeoutError:
+            print(f"⚠ Gave up flushing chat turns after {timeout}s ({self._queue.qsize()} left)")
+        except Exception as e:
+            print(f"⚠ Chat turn writer stopped: {e} ({self._queue.qsize()} left)")
+        self._task.cancel()
+        # Whatever is still queued will not be written
+        self._dropped += sum(1 for turn in self._drain() if turn is not _STOP)
+        # After a timeout a batch may still be writing; joining that thread would
+        # block the event loop past the timeout, so it is left to finish on its own
+        self._executor.shutdown(wait=finished)
+
+    def _drain(self):
+        while True:
+            try:
+                yield self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+    def stats(self) -> Dict:
+        return {
+            "policy": self.policy,
+            "queue_depth": self._queue.qsize(),
+            "queued": self._queued,
+            "written": self._written,
+            "dropped": self._dropped,
+            "failed_turns": self._failed,
+            "failed_batches": self._failed_batches,
+            "batches": self._batches,
+            "avg_batch_ms": round(self._write_seconds / self._batches * 1000, 2) if self._batches else None
+        }
@@ -4,7 +4,7 @@ Database Models for Dynamic AI Chatbot
 Includes: Users, Sessions, Messages, Analytics, Feedback, and Intent Training
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, JSON, Boolean, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -44,12 +44,14 @@ class User(Base):
 class Session(Base):
     """Session model for tracking conversation sessions"""
     __tablename__ = "sessions"
+    # session_id is chosen by the client, so it is only unique per account
+    __table_args__ = (Index("ux_sessions_user_session", "user_id", "session_id", unique=True),)
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     
     # Session Information
-    session_id = Column(String(100), unique=True, nullable=False, index=True)
+    session_id = Column(String(100), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     
     # Timestamps
@@ -76,6 +78,8 @@ class Session(Base):
 class Message(Base):
     """Message model for storing all chat messages"""
     __tablename__ = "messages"
+    # Keyset pagination / export order within a session (see history.py)
+    __table_args__ = (Index("ix_messages_session_timestamp_id", "session_id", "timestamp", "id"),)
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -115,6 +119,8 @@ class Message(Base):
 class Analytics(Base):
     """Analytics model for storing aggregated session metrics"""
     __tablename__ = "analytics"
+    # One row per session and period: the whole session, or one time bucket
+    __table_args__ = (UniqueConstraint("session_id", "period", "date", name="uq_analytics_period"),)
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -123,7 +129,8 @@ class Analytics(Base):
     session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False, index=True)
     
     # Timestamp
-    date = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    period = Column(String(10), nullable=False, default="session")  # 'session', 'hour' or 'day'
+    date = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)  # session start / bucket start
     
     # Message Metrics
     total_messages = Column(Integer, default=0)
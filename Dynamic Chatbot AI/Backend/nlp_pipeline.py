@@ -0,0 +1,236 @@
+# nlp_pipeline.py
+"""
+Unified NLP pipeline for Dynamic AI Chatbot
+One entry point for intent, sentiment and entities, in three tiers:
+- fast:     keyword/classifier intent, lexicon sentiment, regex entities
+- balanced: fast + spaCy NER
+- full:     balanced + TextBlob sentiment
+Each tier declares a latency budget. Under load, or while a tier's recent
+latency is over its budget, requests are moved to a cheaper tier instead of
+queueing behind slow analyses.
+
+Usage:
+    pipeline = NLPPipeline()
+    result = pipeline.analyze("Book a table for tomorrow", tier="balanced")
+"""
+
+import os
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+from entity_extractor import extract as extract_regex_entities
+from nlp_service import NLPService
+from sentiment import sentiment_analyzer, FAST as FAST_SENTIMENT, ACCURATE as ACCURATE_SENTIMENT
+
+FAST = "fast"
+BALANCED = "balanced"
+FULL = "full"
+TIERS = (FAST, BALANCED, FULL)  # cheapest first
+
+# -------- CONFIGURATION --------
+NLP_TIER = os.getenv("NLP_TIER", FAST)  # default tier; requests may ask for another (X-NLP-Tier)
+TIER_BUDGETS_MS = {
+    FAST: float(os.getenv("NLP_BUDGET_FAST_MS", "2")),
+    BALANCED: float(os.getenv("NLP_BUDGET_BALANCED_MS", "25")),
+    FULL: float(os.getenv("NLP_BUDGET_FULL_MS", "150")),
+}
+NLP_MAX_INFLIGHT = int(os.getenv("NLP_MAX_INFLIGHT", "8"))       # analyses running at once = full load
+NLP_DEGRADE_LOAD = float(os.getenv("NLP_DEGRADE_LOAD", "0.75"))  # load at which tiers step down
+NLP_BUDGET_PROBE = int(os.getenv("NLP_BUDGET_PROBE", "20"))      # an over-budget tier still runs 1 in N requests
+LATENCY_SMOOTHING = 0.2  # weight of the newest analysis in a tier's recent latency
+
+TIER_NEEDS_SPACY = {FAST: False, BALANCED: True, FULL: True}
+TIER_SENTIMENT = {FAST: FAST_SENTIMENT, BALANCED: FAST_SENTIMENT, FULL: ACCURATE_SENTIMENT}
+
+
+def inflight_load(count: int, limit: int = NLP_MAX_INFLIGHT) -> float:
+    """count / limit, where limit <= 0 means no limit"""
+    return count / limit if limit > 0 else 0.0
+
+
+def _overlaps(entity: Dict, spans: List[tuple]) -> bool:
+    return any(entity["start"] < end and start < entity["end"] for start, end in spans)
+
+
+class NLPPipeline:
+    """
+    Tier selection per request:
+    1. the requested tier (config default, or X-NLP-Tier), if valid
+    2. one tier cheaper when load >= NLP_DEGRADE_LOAD, the fast tier at load >= 1
+    3. one tier cheaper (repeatedly) while a tier's recent latency is over its
+       budget; 1 in NLP_BUDGET_PROBE requests still runs it, to notice recovery
+    4. the fast tier while the spaCy model is loading (it loads in the
+       background) or could not be loaded
+
+    load = max(analyses in flight / NLP_MAX_INFLIGHT, external load signal)
+    """
+
+    def __init__(self, service: Optional[NLPService] = None, default_tier: str = NLP_TIER,
+                 load_signal: Optional[Callable[[], float]] = None):
+        if default_tier not in TIERS:
+            raise ValueError(f"Unknown NLP tier: {default_tier}")
+        self.service = service or NLPService()
+        self.default_tier = default_tier
+        self.load_signal = load_signal
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._calls = {tier: 0 for tier in TIERS}
+        self._seconds = {tier: 0.0 for tier in TIERS}
+        self._over_budget = {tier: 0 for tier in TIERS}
+        self._recent_ms = {tier: None for tier in TIERS}
+        self._skipped = {tier: 0 for tier in TIERS}  # requests moved off while over budget
+        self._degraded = 0
+        self._warming = 0
+        self._unavailable = 0
+
+    # -------- TIER SELECTION --------
+
+    def load(self) -> float:
+        load = inflight_load(self._in_flight)
+        if self.load_signal is not None:
+            load = max(load, self.load_signal())
+        return load
+
+    def resolve_tier(self, requested: Optional[str] = None) -> str:
+        tier = requested if requested in TIERS else self.default_tier
+
+        load = self.load()
+        if load >= 1.0:
+            resolved = FAST
+        elif load >= NLP_DEGRADE_LOAD:
+            resolved = TIERS[max(TIERS.index(tier) - 1, 0)]
+        else:
+            resolved = tier
+
+        while resolved != FAST and self._over_budget_now(resolved):
+            resolved = TIERS[TIERS.index(resolved) - 1]
+
+        if TIER_NEEDS_SPACY[resolved] and not self.service.nlp_ready:
+            if self.service.nlp_failed:
+                with self._lock:
+                    self._unavailable += 1
+            else:
+                self.service.preload()  # no-op once loading has started
+                with self._lock:
+                    self._warming += 1
+            return FAST
+
+        if resolved != tier:
+            with self._lock:
+                self._degraded += 1
+        return resolved
+
+    def _over_budget_now(self, tier: str) -> bool:
+        """Whether `tier` should be skipped for this request because it is running slow"""
+        with self._lock:
+            recent = self._recent_ms[tier]
+            if recent is None or recent <= TIER_BUDGETS_MS[tier]:
+                return False
+            self._skipped[tier] += 1
+            if NLP_BUDGET_PROBE > 0 and self._skipped[tier] % NLP_BUDGET_PROBE == 0:
+                return False  # probe: run it and measure again
+            return True
+
+    # -------- ANALYSIS --------
+
+    def _entities(self, text: str, tier: str, doc=None) -> List[Dict]:
+        entities = [
+            {"text": e.text, "label": e.label, "start": e.start, "end": e.end}
+            for e in extract_regex_entities(text)
+        ]
+        if not TIER_NEEDS_SPACY[tier] or self.service.nlp is None:
+            return entities
+
+        if doc is None:
+            doc = self.service.nlp(text)
+        # Regex spans (emails, money, ...) win over overlapping spaCy spans
+        spans = [(e["start"], e["end"]) for e in entities]
+        named = [
+            {"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char}
+            for ent in doc.ents
+        ]
+        entities += [e for e in named if not _overlaps(e, spans)]
+        entities.sort(key=lambda e: e["start"])
+        return entities
+
+    def _record(self, tier: str, count: int, seconds: float):
+        ms = seconds / max(count, 1) * 1000
+        with self._lock:
+            self._calls[tier] += count
+            self._seconds[tier] += seconds
+            if ms > TIER_BUDGETS_MS[tier]:
+                self._over_budget[tier] += count
+            recent = self._recent_ms[tier]
+            self._recent_ms[tier] = ms if recent is None else recent + LATENCY_SMOOTHING * (ms - recent)
+
+    def analyze(self, text: str, tier: Optional[str] = None) -> Dict:
+        """
+        Returns:
+            {intent, confidence, sentiment, sentiment_score, entities, tier, requested_tier, ms}
+        """
+        return self.analyze_batch([text], tier)[0]
+
+    def analyze_batch(self, texts: Sequence[str], tier: Optional[str] = None) -> List[Dict]:
+        """Analyze many texts with one tier decision; results in input order"""
+        requested = tier if tier in TIERS else self.default_tier
+        resolved = self.resolve_tier(requested)
+        texts = list(texts)
+
+        with self._lock:
+            self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            intents = self.service.recognize_intents(texts)
+            sentiments = sentiment_analyzer.analyze_batch(texts, TIER_SENTIMENT[resolved])
+            if TIER_NEEDS_SPACY[resolved] and self.service.nlp is not None and len(texts) > 1:
+                docs = list(self.service.nlp.pipe(texts))
+            else:
+                docs = [None] * len(texts)
+            entities = [self._entities(text, resolved, doc) for text, doc in zip(texts, docs)]
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        seconds = time.perf_counter() - start
+        self._record(resolved, len(texts), seconds)
+
+        ms = round(seconds / max(len(texts), 1) * 1000, 2)
+        return [
+            {
+                "intent": intent,
+                "confidence": confidence,
+                "sentiment": sentiment,
+                "sentiment_score": sentiment_score,
+                "entities": entity_list,
+                "tier": resolved,
+                "requested_tier": requested,
+                "ms": ms
+            }
+            for (intent, confidence), (sentiment, sentiment_score), entity_list
+            in zip(intents, sentiments, entities)
+        ]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "default_tier": self.default_tier,
+                "load": round(self.load(), 3),
+                "in_flight": self._in_flight,
+                "degraded": self._degraded,
+                "warming_up": self._warming,
+                "spacy_unavailable": self._unavailable,
+                "spacy_ready": self.service.nlp_ready,
+                "tiers": {
+                    tier: {
+                        "budget_ms": TIER_BUDGETS_MS[tier],
+                        "calls": self._calls[tier],
+                        "avg_ms": round(self._seconds[tier] / self._calls[tier] * 1000, 3)
+                        if self._calls[tier] else None,
+                        "recent_ms": round(self._recent_ms[tier], 3) if self._recent_ms[tier] is not None else None,
+                        "over_budget": self._over_budget[tier],
+                        "skipped_over_budget": self._skipped[tier]
+                    }
+                    for tier in TIERS
+                }
+            }
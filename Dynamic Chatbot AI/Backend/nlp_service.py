@@ -4,11 +4,33 @@ NLP Service for Dynamic AI Chatbot
 Handles: Intent Recognition, Sentiment Analysis, Named Entity Recognition
 """
 
-import spacy
-from textblob import TextBlob
-import re
-from typing import List, Dict, Tuple
-import json
+import os
+import threading
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+
+from entity_extractor import extract as extract_regex_entities
+from intent_index import IntentIndex
+from sentiment import sentiment_analyzer, textblob_score, ACCURATE
+
+# spaCy and TextBlob are imported on first use (see _load_spacy and
+# sentiment.py): importing them costs seconds of worker boot time.
+
+# -------- CONFIGURATION --------
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "64"))  # texts per spaCy batch
+NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))     # spaCy worker processes, -1 = all CPUs
+NLP_SPACY_MODEL = os.getenv("NLP_SPACY_MODEL", "en_core_web_sm")
+# Only doc.ents is used, so components NER does not need are never loaded
+NLP_SPACY_EXCLUDE = [
+    name.strip()
+    for name in os.getenv("NLP_SPACY_EXCLUDE", "tagger,parser,attribute_ruler,lemmatizer").split(",")
+    if name.strip()
+]
+NLP_PRELOAD = os.getenv("NLP_PRELOAD", "false").lower() == "true"  # load models on a background thread
+NLP_INTENT_BACKEND = os.getenv("NLP_INTENT_BACKEND", "keywords")  # keywords | classifier
+NLP_INTENT_MIN_CONFIDENCE = float(os.getenv("NLP_INTENT_MIN_CONFIDENCE", "0.5"))  # below: keyword fallback
+
 
 class NLPService:
     """
@@ -19,18 +41,26 @@ class NLPService:
     - Named Entity Recognition (NER)
     """
     
-    def __init__(self):
-        """Initialize NLP models and patterns"""
+    def __init__(self, model: str = NLP_SPACY_MODEL, exclude: Optional[List[str]] = None,
+                 preload: bool = NLP_PRELOAD, intent_backend: str = NLP_INTENT_BACKEND):
+        """
+        Initialize patterns; the spaCy model is loaded lazily on first use
+        
+        Args:
+            model: spaCy model name
+            exclude: Pipeline components not to load (default NLP_SPACY_EXCLUDE)
+            preload: Start loading the models on a background thread right away
+            intent_backend: 'keywords', or 'classifier' for the trained model
+                            in intent_classifier.py (keywords stay the fallback)
+        """
         print("Initializing NLP Service...")
         
-        # Load spaCy model for NER
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-            print("✓ spaCy model loaded")
-        except Exception as e:
-            print(f"⚠ spaCy model not loaded: {e}")
-            print("  Run: python -m spacy download en_core_web_sm")
-            self.nlp = None
+        self.model_name = model
+        self.exclude = NLP_SPACY_EXCLUDE if exclude is None else exclude
+        self._nlp = None
+        self._nlp_loaded = False
+        self._load_lock = threading.Lock()
+        self._preloading = False
         
         # Intent patterns with keywords
         self.intent_patterns = {
@@ -86,15 +116,95 @@ class NLPService:
             }
         }
         
+        # Keyword -> intent inverted index (whole tokens and phrases)
+        self.intent_index = IntentIndex(self.intent_patterns)
+        
+        # Optional trained classifier
+        self.intent_classifier = None
+        if intent_backend == "classifier":
+            try:
+                from intent_classifier import IntentClassifier
+                self.intent_classifier = IntentClassifier.load()
+                print(f"✓ Intent classifier loaded ({len(self.intent_classifier.intents)} intents)")
+            except Exception as e:
+                print(f"⚠ Intent classifier not loaded, using keywords: {e}")
+                print("  Run: python intent_classifier.py")
+        
         print("✓ NLP Service initialized successfully")
+        
+        if preload:
+            self.preload()
+    
+    
+    @property
+    def nlp_ready(self) -> bool:
+        """True once the spaCy model has loaded successfully; never blocks"""
+        return self._nlp_loaded and self._nlp is not None
+    
+    
+    @property
+    def nlp_failed(self) -> bool:
+        """True when loading finished without a model (not installed, or broken)"""
+        return self._nlp_loaded and self._nlp is None
+    
     
+    @property
+    def nlp(self):
+        """spaCy pipeline (None if the model is unavailable), loaded on first access"""
+        if not self._nlp_loaded:
+            self._load_spacy()
+        return self._nlp
     
-    def extract_entities(self, text: str) -> List[Dict]:
+    
+    def _load_spacy(self):
+        # Double-checked: concurrent first requests load the model only once
+        with self._load_lock:
+            if self._nlp_loaded:
+                return
+            try:
+                import spacy
+                self._nlp = spacy.load(self.model_name, exclude=self.exclude)
+                print(f"✓ spaCy model loaded ({', '.join(self._nlp.pipe_names)})")
+            except Exception as e:
+                print(f"⚠ spaCy model not loaded: {e}")
+                print(f"  Run: python -m spacy download {self.model_name}")
+                self._nlp = None
+            self._nlp_loaded = True
+    
+    
+    def preload(self, background: bool = True):
+        """
+        Load spaCy (and TextBlob for the accurate sentiment tier) ahead of
+        the first message
+        
+        Args:
+            background: Load on a daemon thread and return immediately; requests
+                        arriving before it finishes wait on the same lock
+        """
+        def load():
+            self._load_spacy()
+            if sentiment_analyzer.default_tier == ACCURATE:
+                textblob_score("")
+        
+        with self._load_lock:
+            if self._preloading or self._nlp_loaded:
+                return
+            self._preloading = True
+        
+        if background:
+            threading.Thread(target=load, name="nlp-preload", daemon=True).start()
+        else:
+            load()
+    
+    
+    def extract_entities(self, text: str, doc=None) -> List[Dict]:
         """
         Extract named entities from text using spaCy and regex patterns
         
         Args:
             text: Input text to analyze
+            doc: Optional spaCy Doc for `text` that was already parsed
+                 (e.g. by nlp.pipe in process_batch)
             
         Returns:
             List of dictionaries containing entity information
@@ -104,7 +214,8 @@ class NLPService:
         # Use spaCy NER if available
         if self.nlp:
             try:
-                doc = self.nlp(text)
+                if doc is None:
+                    doc = self.nlp(text)
                 for ent in doc.ents:
                     entities.append({
                         'text': ent.text,
@@ -115,125 +226,48 @@ class NLPService:
             except Exception as e:
                 print(f"spaCy NER error: {e}")
         
-        # Additional regex-based entity extraction
-        
-        # Email extraction
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        for match in re.finditer(email_pattern, text):
-            entities.append({
-                'text': match.group(),
-                'type': 'EMAIL',
-                'start': match.start(),
-                'end': match.end()
-            })
-        
-        # Phone number extraction
-        phone_patterns = [
-            r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',  # US format: 123-456-7890
-            r'\b\(\d{3}\)\s*\d{3}[-.]?\d{4}\b',  # (123) 456-7890
-            r'\b\+\d{1,3}\s*\d{1,4}\s*\d{1,4}\s*\d{1,9}\b'  # International
-        ]
-        for pattern in phone_patterns:
-            for match in re.finditer(pattern, text):
-                entities.append({
-                    'text': match.group(),
-                    'type': 'PHONE',
-                    'start': match.start(),
-                    'end': match.end()
-                })
-        
-        # Date extraction
-        date_patterns = [
-            r'\b(today|tomorrow|yesterday)\b',
-            r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
-            r'\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b',
-            r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}(st|nd|rd|th)?\b'
-        ]
-        for pattern in date_patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                entities.append({
-                    'text': match.group(),
-                    'type': 'DATE',
-                    'start': match.start(),
-                    'end': match.end()
-                })
-        
-        # Time extraction
-        time_patterns = [
-            r'\b\d{1,2}:\d{2}\s*(am|pm|AM|PM)?\b',
-            r'\b(morning|afternoon|evening|night)\b'
-        ]
-        for pattern in time_patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                entities.append({
-                    'text': match.group(),
-                    'type': 'TIME',
-                    'start': match.start(),
-                    'end': match.end()
-                })
-        
-        # Money extraction
-        money_patterns = [
-            r'\$\d+(?:,\d{3})*(?:\.\d{2})?',
-            r'\b\d+\s*(?:dollars?|USD|EUR|rupees?|INR)\b'
-        ]
-        for pattern in money_patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                entities.append({
-                    'text': match.group(),
-                    'type': 'MONEY',
-                    'start': match.start(),
-                    'end': match.end()
-                })
-        
-        # URL extraction
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        for match in re.finditer(url_pattern, text):
+        # Regex entities (emails, phones, dates, times, money, URLs, numbers)
+        # in one pass over the text
+        for entity in extract_regex_entities(text):
             entities.append({
-                'text': match.group(),
-                'type': 'URL',
-                'start': match.start(),
-                'end': match.end()
+                'text': entity.text,
+                'type': entity.label,
+                'start': entity.start,
+                'end': entity.end
             })
         
         return entities
     
     
-    def analyze_sentiment(self, text: str) -> Tuple[str, float]:
+    def analyze_sentiment(self, text: str, tier: Optional[str] = None) -> Tuple[str, float]:
         """
-        Analyze sentiment of text using TextBlob
+        Analyze sentiment of text (see sentiment.py)
         
         Args:
             text: Input text to analyze
+            tier: 'fast' (lexicon) or 'accurate' (TextBlob); default SENTIMENT_TIER
             
         Returns:
             Tuple of (sentiment_label, polarity_score)
             - sentiment_label: 'positive', 'negative', or 'neutral'
             - polarity_score: Float between -1 (negative) and 1 (positive)
         """
+        return self.analyze_sentiments([text], tier)[0]
+    
+    
+    def analyze_sentiments(self, texts: List[str], tier: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Sentiment for many texts at once, in input order"""
         try:
-            # Use TextBlob for sentiment analysis
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
-            
-            # Classify sentiment based on polarity
-            if polarity > 0.1:
-                sentiment = 'positive'
-            elif polarity < -0.1:
-                sentiment = 'negative'
-            else:
-                sentiment = 'neutral'
-            
-            return sentiment, polarity
-            
+            return sentiment_analyzer.analyze_batch(texts, tier)
         except Exception as e:
             print(f"Sentiment analysis error: {e}")
-            return 'neutral', 0.0
+            return [('neutral', 0.0)] * len(texts)
     
     
     def recognize_intent(self, text: str) -> Tuple[str, float]:
         """
-        Recognize user intent from text using keyword matching
+        Recognize user intent from text using the trained classifier when
+        configured and confident enough, keyword matching otherwise
         
         Args:
             text: Input text to analyze
@@ -243,52 +277,59 @@ class NLPService:
             - intent: Detected intent (e.g., 'greeting', 'question', 'booking')
             - confidence_score: Float between 0 and 1
         """
-        text_lower = text.lower()
-        intent_scores = {}
-        
-        # Calculate score for each intent
-        for intent, data in self.intent_patterns.items():
-            score = 0
-            keywords = data['keywords']
-            weight = data['weight']
-            
-            # Count matching keywords
-            for keyword in keywords:
-                if keyword in text_lower:
-                    score += 1
-            
-            # Apply weight and normalize
-            if score > 0:
-                intent_scores[intent] = (score / len(keywords)) * weight
+        return self.recognize_intents([text])[0]
+    
+    
+    def recognize_intents(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """
+        Recognize intents for many texts; the classifier scores them as one
+        vectorized batch
+        
+        Returns:
+            List of (intent, confidence_score), in input order
+        """
+        if self.intent_classifier is None:
+            return [self._keyword_intent(text) for text in texts]
         
-        # Get intent with highest score
-        if intent_scores:
-            detected_intent = max(intent_scores, key=intent_scores.get)
-            confidence = min(intent_scores[detected_intent], 1.0)
-            return detected_intent, confidence
+        return [
+            prediction if prediction[1] >= NLP_INTENT_MIN_CONFIDENCE else self._keyword_intent(text)
+            for text, prediction in zip(texts, self.intent_classifier.predict_batch(texts))
+        ]
+    
+    
+    def _keyword_intent(self, text: str) -> Tuple[str, float]:
+        # Score = distinct keywords matched / number of keywords * weight,
+        # computed in one pass over the message tokens
+        best = self.intent_index.best(text)
+        if best:
+            return best
         
         # Default to 'general' if no intent detected
         return 'general', 0.5
     
     
-    def process_message(self, text: str) -> Dict:
+    def process_message(self, text: str, doc=None, intent: Optional[Tuple[str, float]] = None,
+                        sentiment: Optional[Tuple[str, float]] = None) -> Dict:
         """
         Process a message with all NLP features
         
         Args:
             text: Input message text
+            doc: Optional spaCy Doc for `text` that was already parsed
+            intent: Optional (intent, confidence) that was already computed
+            sentiment: Optional (label, score) that was already computed
             
         Returns:
             Dictionary containing all NLP analysis results
         """
         # Extract entities
-        entities = self.extract_entities(text)
+        entities = self.extract_entities(text, doc)
         
         # Analyze sentiment
-        sentiment, sentiment_score = self.analyze_sentiment(text)
+        sentiment, sentiment_score = sentiment or self.analyze_sentiment(text)
         
         # Recognize intent
-        intent, confidence = self.recognize_intent(text)
+        intent, confidence = intent or self.recognize_intent(text)
         
         # Compile results
         result = {
@@ -302,6 +343,71 @@ class NLPService:
         }
         
         return result
+    
+    
+    def iter_batch(self, texts: Iterable[str], batch_size: int = NLP_BATCH_SIZE,
+                   n_process: int = NLP_N_PROCESS) -> Iterator[Dict]:
+        """
+        Process many texts, yielding results in input order
+        
+        The input is read `batch_size` texts at a time: intents and sentiment
+        are scored for that chunk, and its texts are fed to one spaCy
+        nlp.pipe stream, which parses them in batches (and in `n_process`
+        worker processes) instead of one call per text. Results are yielded
+        as their Docs arrive, so memory stays bounded however long the input.
+        
+        With n_process > 1, call this from under `if __name__ == "__main__":`
+        since spaCy starts its workers with multiprocessing.
+        
+        Args:
+            texts: Iterable of message texts (may be a generator)
+            batch_size: Number of texts read and parsed per batch
+            n_process: Number of spaCy worker processes (-1 for all CPUs)
+            
+        Yields:
+            The same dictionaries as process_message
+        """
+        texts = iter(texts)
+        pending = deque()  # (text, intent, sentiment) read but not yielded yet, in order
+        
+        def read_chunk() -> List[str]:
+            chunk = list(islice(texts, batch_size))
+            if chunk:
+                pending.extend(zip(chunk, self.recognize_intents(chunk), self.analyze_sentiments(chunk)))
+            return chunk
+        
+        def feed():
+            # One spaCy stream for the whole input, so n_process workers start once
+            while True:
+                chunk = read_chunk()
+                if not chunk:
+                    return
+                yield from chunk
+        
+        if self.nlp:
+            try:
+                for doc in self.nlp.pipe(feed(), batch_size=batch_size, n_process=n_process):
+                    text, intent, sentiment = pending.popleft()
+                    yield self.process_message(text, doc, intent, sentiment)
+                return
+            except Exception as e:
+                print(f"spaCy batch error: {e}")
+        
+        # No model, or spaCy failed: one text at a time for whatever is left
+        while pending or read_chunk():
+            text, intent, sentiment = pending.popleft()
+            yield self.process_message(text, intent=intent, sentiment=sentiment)
+    
+    
+    def process_batch(self, texts: Iterable[str], batch_size: int = NLP_BATCH_SIZE,
+                      n_process: int = NLP_N_PROCESS) -> List[Dict]:
+        """
+        Process many texts at once (see iter_batch)
+        
+        Returns:
+            List of process_message results, in input order
+        """
+        return list(self.iter_batch(texts, batch_size, n_process))
 
 
 # Test the NLP Service
@@ -0,0 +1,142 @@
+# ollama_stub.py
+"""
+Local stub of the Ollama HTTP API
+Speaks /api/generate (blocking and streaming) and /api/tags so the chatbot
+and the LLM benchmarks can run without a real model.
+
+Usage:
+    python ollama_stub.py --port 11434 --token-delay 0.01
+"""
+
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_MODEL = "llama3:8b"
+
+
+def stub_completion(prompt: str) -> str:
+    """Deterministic reply built from the last user line of the prompt"""
+    user_lines = [line for line in prompt.splitlines() if line.startswith("User:")]
+    question = user_lines[-1][len("User:"):].strip() if user_lines else prompt.strip()
+    return f"(stub) You asked: {question}. This is a canned answer from the local Ollama stub."
+
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+    disable_nagle_algorithm = True
+
+    # Set by make_server()
+    first_token_delay = 0.0
+    token_delay = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: dict):
+        line = (json.dumps(data) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": STUB_MODEL}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid JSON body"})
+            return
+
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        model = payload.get("model", STUB_MODEL)
+        text = stub_completion(payload.get("prompt", ""))
+        tokens = [word + " " for word in text.split(" ")]
+        tokens[-1] = tokens[-1].rstrip()
+        started = time.perf_counter()
+
+        time.sleep(self.first_token_delay)
+
+        if not payload.get("stream", True):
+            time.sleep(self.token_delay * len(tokens))
+            self._send_json(200, {
+                "model": model,
+                "response": text,
+                "done": True,
+                "total_duration": int((time.perf_counter() - started) * 1e9),
+                "eval_count": len(tokens)
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens:
+            time.sleep(self.token_delay)
+            self._write_chunk({"model": model, "response": token, "done": False})
+        self._write_chunk({
+            "model": model,
+            "response": "",
+            "done": True,
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "eval_count": len(tokens)
+        })
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def make_server(host: str = "127.0.0.1", port: int = 11434,
+                first_token_delay: float = 0.0, token_delay: float = 0.0) -> ThreadingHTTPServer:
+    """Create (but do not start) a stub server; port 0 picks a free port"""
+    handler = type("ConfiguredOllamaStubHandler", (OllamaStubHandler,), {
+        "first_token_delay": first_token_delay,
+        "token_delay": token_delay
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(**kwargs) -> ThreadingHTTPServer:
+    """Start a stub server on a daemon thread and return it"""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Ollama API stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--first-token-delay", type=float, default=0.0,
+                        help="Seconds before the first token (model latency)")
+    parser.add_argument("--token-delay", type=float, default=0.0,
+                        help="Seconds between streamed tokens")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.first_token_delay, args.token_delay)
+    print("=" * 60)
+    print(f"🧪 Ollama stub running on http://{args.host}:{args.port}")
+    print("=" * 60)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
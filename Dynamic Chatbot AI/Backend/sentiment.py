@@ -0,0 +1,256 @@
+# sentiment.py
+"""
+Sentiment analysis for Dynamic AI Chatbot
+Two tiers behind one memoized API:
+- fast: precompiled word lexicon with negation and intensifiers (~µs per message)
+- accurate: TextBlob polarity (opt-in, much slower)
+Results are cached in a bounded LRU keyed on a hash of the text.
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# -------- CONFIGURATION --------
+SENTIMENT_TIER = os.getenv("SENTIMENT_TIER", "fast")  # fast | accurate
+SENTIMENT_MEMO_SIZE = int(os.getenv("SENTIMENT_MEMO_SIZE", "10000"))  # cached results, 0 disables
+
+FAST = "fast"
+ACCURATE = "accurate"
+TIERS = (FAST, ACCURATE)
+
+# Same cut-offs as the TextBlob polarity labels
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+# -------- LEXICON --------
+# word -> valence in [-1, 1]; common inflections are added by _compile_lexicon
+LEXICON = {
+    # positive
+    "good": 0.6, "great": 0.8, "excellent": 0.9, "happy": 0.7, "love": 0.8, "like": 0.4,
+    "thanks": 0.5, "thank": 0.5, "thankful": 0.6, "grateful": 0.6, "appreciate": 0.6,
+    "awesome": 0.9, "amazing": 0.9, "wonderful": 0.9, "fantastic": 0.9, "perfect": 0.9,
+    "nice": 0.5, "glad": 0.6, "pleased": 0.6, "helpful": 0.6, "enjoy": 0.6, "brilliant": 0.8,
+    "beautiful": 0.7, "best": 0.8, "better": 0.4, "cool": 0.4, "fine": 0.2, "easy": 0.3,
+    "excited": 0.7, "fun": 0.5, "impressive": 0.7, "recommend": 0.5, "satisfied": 0.6,
+    "superb": 0.9, "useful": 0.5, "works": 0.3, "working": 0.3, "yay": 0.6,
+    # negative
+    "bad": -0.6, "terrible": -0.9, "awful": -0.9, "hate": -0.8, "sad": -0.6, "angry": -0.7,
+    "worst": -0.9, "horrible": -0.9, "poor": -0.5, "disappointed": -0.6, "disappointing": -0.6,
+    "frustrating": -0.6, "frustrated": -0.6, "annoying": -0.5, "annoyed": -0.5, "broken": -0.5,
+    "useless": -0.7, "wrong": -0.4, "fail": -0.5, "failed": -0.5, "problem": -0.3,
+    "issue": -0.2, "error": -0.3, "slow": -0.3, "upset": -0.6, "unhappy": -0.6, "confusing": -0.4,
+    "difficult": -0.3, "hard": -0.2, "painful": -0.6, "ugly": -0.6, "stupid": -0.7,
+    "ridiculous": -0.6, "disgusting": -0.8, "complaint": -0.4, "sucks": -0.7, "crash": -0.5,
+}
+
+NEGATORS = frozenset([
+    "not", "no", "never", "none", "nobody", "nothing", "hardly", "without", "cannot",
+    "don't", "doesn't", "didn't", "isn't", "wasn't", "aren't", "weren't", "won't",
+    "wouldn't", "can't", "couldn't", "shouldn't", "dont", "doesnt", "didnt", "isnt", "cant",
+])
+NEGATION_SCOPE = 3   # words after a negator whose valence is flipped
+NEGATION_FACTOR = -0.5
+
+INTENSIFIERS = {
+    "very": 1.5, "really": 1.5, "so": 1.4, "extremely": 1.8, "super": 1.5, "too": 1.3,
+    "absolutely": 1.6, "totally": 1.4, "incredibly": 1.7, "quite": 1.2,
+    "slightly": 0.5, "somewhat": 0.6, "kinda": 0.6, "bit": 0.6,
+}
+
+_TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+def _compile_lexicon(lexicon: Dict[str, float]) -> Dict[str, float]:
+    """Add plural/past/gerund forms so "loved", "hates", "happily" score too"""
+    compiled = {}
+    for word, valence in lexicon.items():
+        stem = word[:-1] if word.endswith("e") else word
+        forms = [word + "s", stem + "ed", stem + "ing"]
+        if word.endswith("y"):
+            forms.append(word[:-1] + "ily")
+        for form in forms:
+            compiled.setdefault(form, valence)
+    compiled.update(lexicon)  # explicit entries win over generated forms
+    return compiled
+
+
+_COMPILED_LEXICON = _compile_lexicon(LEXICON)
+
+
+def label_for(score: float) -> str:
+    if score > POSITIVE_THRESHOLD:
+        return "positive"
+    if score < NEGATIVE_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+def _valences(text: str) -> List[float]:
+    """Valence of every sentiment word, after negation and intensifiers"""
+    valences = []
+    negated_for = 0
+    boost = 1.0
+    for token in _TOKEN.findall(text.lower()):
+        if token in NEGATORS:
+            negated_for = NEGATION_SCOPE
+            continue
+        if token in INTENSIFIERS:
+            boost *= INTENSIFIERS[token]
+            continue
+        valence = _COMPILED_LEXICON.get(token)
+        if valence is not None:
+            valence *= boost
+            if negated_for:
+                valence *= NEGATION_FACTOR
+            valences.append(valence)
+        boost = 1.0
+        if negated_for:
+            negated_for -= 1
+    return valences
+
+
+def _normalize(total):
+    """Squash a sum of valences into [-1, 1] (works on floats and arrays)"""
+    return total / np.sqrt(total * total + 1.0)
+
+
+def lexicon_score(text: str) -> float:
+    valences = _valences(text)
+    return float(_normalize(sum(valences))) if valences else 0.0
+
+
+def lexicon_scores(texts: Sequence[str]) -> np.ndarray:
+    """Scores for many texts: one flat valence array, summed per text with bincount"""
+    rows, values = [], []
+    for row, text in enumerate(texts):
+        valences = _valences(text)
+        rows.extend([row] * len(valences))
+        values.extend(valences)
+    totals = np.bincount(np.array(rows, dtype=np.int64), weights=np.array(values, dtype=np.float64),
+                         minlength=len(texts))
+    return _normalize(totals)
+
+
+_TextBlob = None
+
+
+def textblob_score(text: str) -> float:
+    global _TextBlob
+    if _TextBlob is None:
+        from textblob import TextBlob  # imported on first use: it is slow to import
+        _TextBlob = TextBlob
+    return _TextBlob(text).sentiment.polarity
+
+
+class SentimentAnalyzer:
+    """
+    Usage:
+        analyzer = SentimentAnalyzer()
+        label, score = analyzer.analyze("I love this!")             # fast tier
+        label, score = analyzer.analyze("I love this!", "accurate")  # TextBlob
+        results = analyzer.analyze_batch(messages)
+    """
+
+    def __init__(self, default_tier: str = SENTIMENT_TIER, memo_size: int = SENTIMENT_MEMO_SIZE):
+        if default_tier not in TIERS:
+            raise ValueError(f"Unknown sentiment tier: {default_tier}")
+        self.default_tier = default_tier
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[Tuple[str, bytes], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._tier_calls = {tier: 0 for tier in TIERS}
+        self._tier_seconds = {tier: 0.0 for tier in TIERS}
+
+    # -------- MEMO --------
+
+    @staticmethod
+    def _key(tier: str, text: str) -> Tuple[str, bytes]:
+        # A fixed-size digest keeps memory bounded no matter how long messages are
+        return tier, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _get(self, key) -> Optional[float]:
+        with self._lock:
+            score = self._memo.get(key)
+            if score is None:
+                self._misses += 1
+                return None
+            self._memo.move_to_end(key)
+            self._hits += 1
+            return score
+
+    def _put(self, key, score: float):
+        if self.memo_size <= 0:
+            return
+        with self._lock:
+            self._memo[key] = score
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def _record(self, tier: str, calls: int, seconds: float):
+        with self._lock:
+            self._tier_calls[tier] += calls
+            self._tier_seconds[tier] += seconds
+
+    # -------- API --------
+
+    def analyze(self, text: str, tier: Optional[str] = None) -> Tuple[str, float]:
+        """(label, polarity in [-1, 1]) for one text"""
+        return self.analyze_batch([text], tier)[0]
+
+    def analyze_batch(self, texts: Sequence[str], tier: Optional[str] = None) -> List[Tuple[str, float]]:
+        """(label, polarity) for every text, in input order; only memo misses are scored"""
+        tier = tier or self.default_tier
+        if tier not in TIERS:
+            raise ValueError(f"Unknown sentiment tier: {tier}")
+
+        keys = [self._key(tier, text) for text in texts]
+        scores = [self._get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        if missing:
+            start = time.perf_counter()
+            if tier == FAST and len(missing) == 1:
+                computed = [lexicon_score(texts[missing[0]])]
+            elif tier == FAST:
+                computed = lexicon_scores([texts[i] for i in missing]).tolist()
+            else:
+                computed = [textblob_score(texts[i]) for i in missing]
+            self._record(tier, len(missing), time.perf_counter() - start)
+
+            for i, score in zip(missing, computed):
+                scores[i] = score
+                self._put(keys[i], score)
+
+        return [(label_for(score), score) for score in scores]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "default_tier": self.default_tier,
+                "memo_entries": len(self._memo),
+                "memo_size": self.memo_size,
+                "memo_hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "tiers": {
+                    tier: {
+                        "calls": self._tier_calls[tier],
+                        "avg_us": round(self._tier_seconds[tier] / self._tier_calls[tier] * 1e6, 1)
+                        if self._tier_calls[tier] else None
+                    }
+                    for tier in TIERS
+                }
+            }
+
+
+# Shared instance for main.py and NLPService
+sentiment_analyzer = SentimentAnalyzer()
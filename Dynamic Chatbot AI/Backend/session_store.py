@@ -0,0 +1,446 @@
+# session_store.py
+"""
+Session Memory Store for Dynamic AI Chatbot
+Bounded, evicting replacement for the old module-level SESSION_MEMORY dict
+Backends: in-process (default) or Redis, shared by every uvicorn worker
+The API is async so the Redis backend never blocks the event loop.
+"""
+
+import os
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Dict, List
+
+# redis-py's asyncio client, as in llm_cache.py
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import WatchError
+except ImportError:
+    aioredis = WatchError = None
+
+# -------- CONFIGURATION --------
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")            # memory | redis
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))                 # idle seconds
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "50"))       # user/assistant turns kept
+SESSION_MAX_FACTS = int(os.getenv("SESSION_MAX_FACTS", "100"))      # system entries kept
+SESSION_MAX_ENTRY_BYTES = int(os.getenv("SESSION_MAX_ENTRY_BYTES", "16384"))  # longer messages are truncated
+
+# Rough per-entry overhead of the dict + strings, used for memory accounting
+ENTRY_OVERHEAD = 120
+
+
+def entry_size(content: str) -> int:
+    return len(content.encode("utf-8")) + ENTRY_OVERHEAD
+
+
+def clip(content: str, limit: int = SESSION_MAX_ENTRY_BYTES) -> str:
+    """Truncate to at most `limit` UTF-8 bytes, never splitting a character"""
+    encoded = content.encode("utf-8")
+    if len(encoded) <= limit:
+        return content
+    return encoded[:limit].decode("utf-8", errors="ignore")
+
+
+def parse_system_entry(content: str):
+    """Split a system entry like 'name:Ada' into ('name', 'Ada')"""
+    kind, sep, value = content.partition(":")
+    if sep and kind in ("name", "fact", "pref"):
+        return kind, value
+    return None, content
+
+
+def empty_profile() -> Dict:
+    return {"name": None, "facts": [], "prefs": set()}
+
+
+class UserProfile:
+    """Structured view of a session's system entries, updated on write"""
+
+    __slots__ = ("name", "facts", "prefs")
+
+    def __init__(self):
+        self.name = None
+        self.facts: Dict[str, None] = {}  # insertion-ordered set, oldest first
+        self.prefs = set()
+
+    def apply(self, content: str):
+        kind, value = parse_system_entry(content)
+        if kind == "name":
+            self.name = value
+        elif kind == "fact":
+            self.facts.pop(value, None)
+            self.facts[value] = None
+        elif kind == "pref":
+            self.prefs.add(value)
+
+    def forget(self, content: str):
+        kind, value = parse_system_entry(content)
+        if kind == "fact":
+            self.facts.pop(value, None)
+
+    def as_dict(self) -> Dict:
+        return {"name": self.name, "facts": list(self.facts), "prefs": set(self.prefs)}
+
+
+class SessionRecord:
+    """Memory for one session: system facts kept apart from the turn ring buffer"""
+
+    __slots__ = ("facts", "turns", "profile", "last_access", "bytes")
+
+    def __init__(self, max_turns: int):
+        self.facts: List[Dict] = []
+        self.turns = deque(maxlen=max_turns)
+        self.profile = UserProfile()
+        self.last_access = time.monotonic()
+        self.bytes = 0
+
+
+class SessionStore(ABC):
+    """Interface shared by every session memory backend (all methods are coroutines)"""
+
+    backend = "none"
+
+    @abstractmethod
+    async def get_history(self, session_id: str) -> List[Dict]:
+        """System facts first, then the retained turns in order"""
+
+    @abstractmethod
+    async def append(self, session_id: str, role: str, content: str):
+        """Add one entry; content longer than SESSION_MAX_ENTRY_BYTES is truncated"""
+
+    @abstractmethod
+    async def get_profile(self, session_id: str) -> Dict:
+        """{"name": str | None, "facts": [oldest .. newest], "prefs": set}"""
+
+    @abstractmethod
+    async def has_preference(self, session_id: str, pref: str) -> bool:
+        """Whether a pref: entry was stored for the session"""
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        """Forget the session"""
+
+    @abstractmethod
+    async def stats(self) -> Dict:
+        """Counters for /api/stats"""
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Per-process session store
+    Features:
+    - System entries (name:, fact:, pref:) survive turn trimming
+    - Each session keeps at most `max_turns` user/assistant turns (ring buffer)
+    - Entries are truncated to `max_entry_bytes`
+    - Idle sessions expire after `ttl` seconds
+    - Least recently used sessions are evicted past `max_sessions` / `max_bytes`,
+      down to the session just written if that alone is over `max_bytes`
+    """
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        ttl: int = SESSION_TTL,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        max_bytes: int = SESSION_MAX_BYTES,
+        max_turns: int = SESSION_MAX_TURNS,
+        max_facts: int = SESSION_MAX_FACTS,
+        max_entry_bytes: int = SESSION_MAX_ENTRY_BYTES
+    ):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.max_turns = max_turns
+        self.max_facts = max_facts
+        self.max_entry_bytes = max_entry_bytes
+
+        self._sessions: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Counters
+        self._expired = 0
+        self._evicted = 0
+
+    # -------- INTERNALS (call with the lock held) --------
+
+    def _drop(self, session_id: str):
+        record = self._sessions.pop(session_id)
+        self._bytes -= record.bytes
+
+    def _lookup(self, session_id: str, create: bool):
+        now = time.monotonic()
+        record = self._sessions.get(session_id)
+
+        if record is not None and now - record.last_access > self.ttl:
+            self._drop(session_id)
+            self._expired += 1
+            record = None
+
+        if record is None:
+            if not create:
+                return None
+            record = SessionRecord(self.max_turns)
+            self._sessions[session_id] = record
+        else:
+            self._sessions.move_to_end(session_id)
+
+        record.last_access = now
+        return record
+
+    def _enforce_limits(self):
+        now = time.monotonic()
+
+        # Oldest sessions sit at the front, so expired ones are found first
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest.last_access <= self.ttl:
+                break
+            self._drop(oldest_id)
+            self._expired += 1
+
+        while self._sessions and (
+            len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self._sessions)))
+            self._evicted += 1
+
+    # -------- PUBLIC API --------
+
+    async def get_history(self, session_id: str) -> List[Dict]:
+        """System facts first, then the retained turns in order"""
+        with self._lock:
+            record = self._lookup(session_id, create=False)
+            if record is None:
+                return []
+            return list(record.facts) + list(record.turns)
+
+    async def get_profile(self, session_id: str) -> Dict:
+        with self._lock:
+            record = self._lookup(session_id, create=False)
+            if record is None:
+                return empty_profile()
+            return record.profile.as_dict()
+
+    async def has_preference(self, session_id: str, pref: str) -> bool:
+        with self._lock:
+            record = self._lookup(session_id, create=False)
+            return record is not None and pref in record.profile.prefs
+
+    async def append(self, session_id: str, role: str, content: str):
+        content = clip(content, self.max_entry_bytes)
+        entry = {"role": role, "content": content}
+        size = entry_size(content)
+
+        with self._lock:
+            record = self._lookup(session_id, create=True)
+
+            if role == "system":
+                record.profile.apply(content)
+                if entry in record.facts:
+                    # Re-stating a fact makes it the most recent one again
+                    record.facts.remove(entry)
+                    record.facts.append(entry)
+                    return
+                record.facts.append(entry)
+                if len(record.facts) > self.max_facts:
+                    # Give up the oldest "fact:" before a name or preference
+                    index = next(
+                        (i for i, fact in enumerate(record.facts) if fact["content"].startswith("fact:")),
+                        0
+                    )
+                    dropped = record.facts.pop(index)
+                    record.profile.forget(dropped["content"])
+                    record.bytes -= entry_size(dropped["content"])
+                    self._bytes -= entry_size(dropped["content"])
+            else:
+                if len(record.turns) == record.turns.maxlen:
+                    dropped = record.turns[0]
+                    record.bytes -= entry_size(dropped["content"])
+                    self._bytes -= entry_size(dropped["content"])
+                record.turns.append(entry)
+
+            record.bytes += size
+            self._bytes += size
+            self._enforce_limits()
+
+    async def delete(self, session_id: str):
+        with self._lock:
+            if session_id in self._sessions:
+                self._drop(session_id)
+
+    async def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "max_turns": self.max_turns,
+                "ttl": self.ttl,
+                "expired": self._expired,
+                "evicted": self._evicted
+            }
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis-backed session store so any worker process can serve any session
+    Layout per session: a list of system entries, a capped list of turns and
+    a profile (hash for name/prefs, list for facts) maintained on write.
+    Every operation is a single pipelined round trip on the asyncio client,
+    so waiting on Redis never blocks the event loop; keys expire after `ttl`
+    idle seconds and the server's maxmemory policy bounds total memory.
+    """
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        url: str = REDIS_URL,
+        ttl: int = SESSION_TTL,
+        max_turns: int = SESSION_MAX_TURNS,
+        max_facts: int = SESSION_MAX_FACTS,
+        max_entry_bytes: int = SESSION_MAX_ENTRY_BYTES,
+        prefix: str = "chat:session:",
+        client=None
+    ):
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("Redis session backend requires the 'redis' package")
+            client = aioredis.from_url(url, decode_responses=True)
+
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self.max_facts = max_facts
+        self.max_entry_bytes = max_entry_bytes
+        self.prefix = prefix
+        self._redis = client
+        self._index = prefix + "index"  # sorted set: session_id -> last access time
+
+    def _keys(self, session_id: str):
+        base = self.prefix + session_id
+        return base + ":facts", base + ":turns", base + ":profile", base + ":userfacts"
+
+    def _touch(self, pipe, session_id: str, create: bool = True):
+        """Extend the TTL; reads (create=False) never add index entries for missing sessions"""
+        for key in self._keys(session_id):
+            pipe.expire(key, self.ttl)  # no-op on missing keys
+        pipe.zadd(self._index, {session_id: time.time()}, xx=not create)
+
+    async def _trim_facts(self, facts_key: str, userfacts_key: str):
+        """Past max_facts, drop the oldest "fact:" before a name or preference, as the memory store does"""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(facts_key)
+                    entries = await pipe.lrange(facts_key, 0, -1)
+                    if len(entries) <= self.max_facts:
+                        return
+                    oldest = next((entry for entry in entries if entry.startswith("fact:")), entries[0])
+                    pipe.multi()
+                    pipe.lrem(facts_key, 1, oldest)
+                    kind, value = parse_system_entry(oldest)
+                    if kind == "fact":
+                        pipe.lrem(userfacts_key, 0, value)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue  # another worker changed the list; look again
+
+    async def get_history(self, session_id: str) -> List[Dict]:
+        facts_key, turns_key, _, _ = self._keys(session_id)
+
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.lrange(facts_key, 0, -1)
+        pipe.lrange(turns_key, 0, -1)
+        self._touch(pipe, session_id, create=False)
+        facts, turns = (await pipe.execute())[:2]
+
+        history = [{"role": "system", "content": fact} for fact in facts]
+        history.extend(json.loads(turn) for turn in turns)
+        return history
+
+    async def append(self, session_id: str, role: str, content: str):
+        facts_key, turns_key, profile_key, userfacts_key = self._keys(session_id)
+        content = clip(content, self.max_entry_bytes)
+
+        pipe = self._redis.pipeline(transaction=True)
+        if role == "system":
+            # Re-stating a fact makes it the most recent one again
+            pipe.lrem(facts_key, 0, content)
+            pipe.rpush(facts_key, content)
+
+            kind, value = parse_system_entry(content)
+            if kind == "name":
+                pipe.hset(profile_key, "name", value)
+            elif kind == "pref":
+                pipe.hset(profile_key, "pref:" + value, 1)
+            elif kind == "fact":
+                pipe.lrem(userfacts_key, 0, value)
+                pipe.rpush(userfacts_key, value)
+        else:
+            pipe.rpush(turns_key, json.dumps({"role": role, "content": content}))
+            pipe.ltrim(turns_key, -self.max_turns, -1)
+        self._touch(pipe, session_id)
+        results = await pipe.execute()
+
+        # results[1] is the facts list length after RPUSH; trimming is rare, so it is a second step
+        if role == "system" and results[1] > self.max_facts:
+            await self._trim_facts(facts_key, userfacts_key)
+
+    async def get_profile(self, session_id: str) -> Dict:
+        _, _, profile_key, userfacts_key = self._keys(session_id)
+
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hgetall(profile_key)
+        pipe.lrange(userfacts_key, 0, -1)
+        fields, facts = await pipe.execute()
+
+        return {
+            "name": fields.get("name"),
+            "facts": facts,
+            "prefs": {key[len("pref:"):] for key in fields if key.startswith("pref:")}
+        }
+
+    async def has_preference(self, session_id: str, pref: str) -> bool:
+        _, _, profile_key, _ = self._keys(session_id)
+        return bool(await self._redis.hexists(profile_key, "pref:" + pref))
+
+    async def delete(self, session_id: str):
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(*self._keys(session_id))
+        pipe.zrem(self._index, session_id)
+        await pipe.execute()
+
+    async def stats(self) -> Dict:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.zremrangebyscore(self._index, 0, time.time() - self.ttl)
+        pipe.zcard(self._index)
+        _, sessions = await pipe.execute()
+        try:
+            memory = await self._redis.info("memory")
+        except Exception:  # INFO may be disabled (managed Redis) or unsupported (fakeredis)
+            memory = {}
+        return {
+            "backend": self.backend,
+            "sessions": sessions,
+            "bytes": memory.get("used_memory"),
+            "max_turns": self.max_turns,
+            "ttl": self.ttl
+        }
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    """Build the store selected by SESSION_BACKEND"""
+    if backend == "redis":
+        return RedisSessionStore()
+    return InMemorySessionStore()
@@ -0,0 +1,69 @@
+# singleflight.py
+"""
+Single-flight request coalescing for Dynamic AI Chatbot
+Concurrent callers asking for the same key share one in-flight computation
+"""
+
+import re
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so trivially different prompts coalesce"""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+class SingleFlight:
+    """
+    Deduplicates identical in-flight async calls
+    The first caller (leader) starts the work as its own task; later callers
+    with the same key wait on that task. A caller that is cancelled (e.g. the
+    client disconnected) does not cancel the shared work for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._followers: Dict[str, int] = {}
+
+        # Counters
+        self._calls = 0
+        self._executions = 0
+        self._coalesced = 0
+        self._saved_seconds = 0.0
+
+    async def do(self, key: str, func: Callable[[], Awaitable]):
+        """Run func() once per key among concurrent callers and share the result"""
+        self._calls += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._coalesced += 1
+            self._followers[key] += 1
+        else:
+            self._executions += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            self._followers[key] = 0
+            started = time.perf_counter()
+
+            def finished(done_task, key=key):
+                self._inflight.pop(key, None)
+                followers = self._followers.pop(key, 0)
+                if not done_task.cancelled() and done_task.exception() is None:
+                    self._saved_seconds += followers * (time.perf_counter() - started)
+
+            task.add_done_callback(finished)
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self._calls,
+            "executions": self._executions,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._inflight),
+            "coalesce_ratio": round(self._coalesced / self._calls, 4) if self._calls else 0.0,
+            "saved_seconds": round(self._saved_seconds, 3)
+        }
@@ -0,0 +1,116 @@
+# test_analytics.py
+"""
+Test the incremental analytics rollups
+Runs against a throwaway SQLite database, no server needed
+"""
+
+import os
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models import Base, User
+from model_database import Analytics, Message
+from message_writer import Turn, create_tables, write_turns
+from analytics import session_analytics
+
+START = datetime(2026, 1, 5, 9, 50)
+OWNER = "owner@example.com"
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+def turn(minute, sentiment, score, intent, response_time):
+    at = START + timedelta(minutes=minute)
+    return Turn(
+        session_id="analytics_session",
+        user=OWNER,
+        message="x" * 10,
+        response="y" * 30,
+        timestamp=at,
+        responded_at=at + timedelta(milliseconds=response_time),
+        intent=intent,
+        sentiment=sentiment,
+        sentiment_score=score,
+        response_time=response_time
+    )
+
+
+def test_analytics():
+    print("=" * 60)
+    print("Analytics Rollup Test")
+    print("=" * 60)
+
+    path = os.path.join(tempfile.mkdtemp(), "analytics.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    create_tables(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as db:
+        db.add_all([User(email=OWNER, hashed_password="-"), User(email="other@example.com", hashed_password="-")])
+        db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    print("\n1. INCREMENTAL UPDATES")
+    batches = [
+        [turn(0, "positive", 0.8, "greeting", 100), turn(5, "neutral", 0.0, "question", 300)],
+        [turn(15, "negative", -0.6, "complaint", 200)],  # next hour bucket
+        [turn(20, "positive", 0.4, "question", 600)],
+    ]
+    for batch in batches:
+        with SessionLocal() as db:
+            write_turns(db, batch)
+
+    rollup_reads = [s for s in statements if "FROM analytics" in s]
+    check("rollups never read the messages table", not any("FROM messages" in s for s in statements))
+    check("one rollup read per batch", len(rollup_reads) == len(batches))
+
+    with SessionLocal() as db:
+        rows = db.scalars(select(Analytics).order_by(Analytics.period, Analytics.date)).all()
+        messages = db.scalar(select(func.count()).select_from(Message))
+    session_row = next(row for row in rows if row.period == "session")
+    hours = [row for row in rows if row.period == "hour"]
+
+    check("one session row and one row per hour", len(hours) == 2 and messages == 8)
+    check("message counts", (session_row.total_messages, session_row.user_messages) == (8, 4))
+    check("min / avg / max response time",
+          (session_row.min_response_time, session_row.avg_response_time, session_row.max_response_time) == (100, 300, 600))
+    check("sentiment counts",
+          (session_row.positive_sentiment_count, session_row.negative_sentiment_count,
+           session_row.neutral_sentiment_count) == (2, 1, 1))
+    check("average sentiment score", abs(session_row.avg_sentiment_score - 0.15) < 1e-9)
+    check("intent distribution", session_row.intent_distribution == {"greeting": 1, "question": 2, "complaint": 1})
+    check("average message length", session_row.avg_message_length == 20)
+    check("conversation duration", session_row.conversation_duration == 20 * 60)
+    check("bucket split", [row.total_messages for row in hours] == [4, 4])
+
+    print("\n2. READ ENDPOINT QUERY")
+
+    async def read():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with async_sessionmaker(async_engine)() as db:
+            result = await session_analytics(db, "analytics_session", OWNER, buckets=1)
+            missing = await session_analytics(db, "no_such_session", OWNER)
+            foreign = await session_analytics(db, "analytics_session", "other@example.com")
+        await async_engine.dispose()
+        return result, missing, foreign
+
+    result, missing, foreign = asyncio.run(read())
+    check("session totals served", result["total_messages"] == 8 and result["response_time"]["avg"] == 300)
+    check("latest bucket first, limited", len(result["buckets"]) == 1 and result["buckets"][0]["start"].endswith("10:00:00"))
+    check("unknown session returns None", missing is None)
+    check("another user's session returns None", foreign is None)
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_analytics()
@@ -32,6 +32,25 @@ def test_chat():
     print(f"Entities: {result['entities']}")
     print(f"Response Time: {result['response_time']}ms")
 
+def test_chat_stream():
+    print("\n3b. Testing Streaming Chat Endpoint (SSE)...")
+    data = {
+        "session_id": "test_session_123",
+        "message": "Tell me something interesting about transformers"
+    }
+    with requests.post(f"{BASE_URL}/api/chat/stream", json=data, stream=True) as response:
+        print(f"Status: {response.status_code}")
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                payload = json.loads(line[len("data: "):])
+                if event == "token":
+                    print(payload["text"], end="", flush=True)
+                else:
+                    print(f"\n[{event}] {payload}")
+
 def test_analytics():
     print("\n4. Testing Analytics...")
     response = requests.get(f"{BASE_URL}/api/analytics/test_session_123")
@@ -56,6 +75,7 @@ if __name__ == "__main__":
         test_root()
         test_health()
         test_chat()
+        test_chat_stream()
         test_analytics()
         test_history()
         
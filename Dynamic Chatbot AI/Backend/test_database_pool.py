@@ -0,0 +1,99 @@
+# test_database_pool.py
+"""
+Test the database pool settings and metrics
+Runs against a throwaway SQLite file (the zero-config stand-in), no server needed
+"""
+
+import os
+import time
+import asyncio
+import tempfile
+import threading
+
+# Tiny pool so overflow and timeouts are easy to trigger; set before database.py reads them
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pool.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.update({
+    "DB_POOL_SIZE": "1", "DB_MAX_OVERFLOW": "1", "DB_POOL_TIMEOUT": "0.2",
+    "DB_PRE_PING": "idle", "DB_PING_IDLE": "0.1",
+})
+
+from sqlalchemy import exc, text
+from database import engine, async_engine, database_stats, engine_options, to_async_url, PoolMetrics
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+def sync_pool():
+    print("\n1. SYNC POOL")
+    first = engine.connect()
+    second = engine.connect()  # beyond DB_POOL_SIZE: an overflow connection
+    stats = database_stats()["sync"]
+    check("two connections in use", stats["in_use"] == 2)
+    check("overflow connection counted", stats["overflow_events"] == 1 and stats["overflow"] == 1)
+
+    try:
+        engine.connect()
+        timed_out = False
+    except exc.TimeoutError:
+        timed_out = True
+    stats = database_stats()["sync"]
+    check("pool exhaustion times out after DB_POOL_TIMEOUT", timed_out and stats["timeouts"] == 1)
+
+    # A checkout that waits for a connection released by another thread
+    threading.Timer(0.1, second.close).start()
+    third = engine.connect()
+    stats = database_stats()["sync"]
+    check(f"checkout wait recorded ({stats['max_wait_ms']:.0f} ms)", stats["max_wait_ms"] >= 50)
+    third.close()
+    first.close()
+
+    pings = database_stats()["sync"]["pings"]
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    check("recently used connection is not pinged", database_stats()["sync"]["pings"] == pings)
+    time.sleep(0.15)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    check("idle connection is pinged", database_stats()["sync"]["pings"] == pings + 1)
+
+    with engine.connect() as connection:
+        mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+    check("SQLite runs in WAL mode", mode == "wal")
+
+
+async def async_pool():
+    print("\n2. ASYNC POOL")
+    async with async_engine.connect() as connection:
+        value = (await connection.execute(text("SELECT 1"))).scalar()
+    stats = database_stats()["async"]
+    check("async engine pooled (not a connection per checkout)", stats["pool"].startswith("Instrumented"))
+    check("async checkout recorded", value == 1 and stats["checkouts"] >= 1 and stats["idle"] == 1)
+    await async_engine.dispose()
+
+
+def async_urls():
+    print("\n3. ASYNC DRIVERS")
+    check("postgresql -> asyncpg", to_async_url("postgresql://u:p@db/chat") == "postgresql+asyncpg://u:p@db/chat")
+    check("mysql+pymysql (README) -> aiomysql",
+          to_async_url("mysql+pymysql://root:pw@localhost:3306/ai_chatbot") == "mysql+aiomysql://root:pw@localhost:3306/ai_chatbot")
+    options = engine_options("mysql+aiomysql://root:pw@localhost/ai_chatbot", PoolMetrics(), is_async=True)
+    check("aiomysql gets its own timeout argument", options["connect_args"] == {"connect_timeout": 5})
+
+
+def test_database_pool():
+    print("=" * 60)
+    print("Database Pool Test")
+    print("=" * 60)
+
+    sync_pool()
+    asyncio.run(async_pool())
+    async_urls()
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_database_pool()
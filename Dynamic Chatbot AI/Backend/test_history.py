@@ -0,0 +1,147 @@
+# test_history.py
+"""
+Test keyset-paginated history and the streaming transcript export
+Runs against a throwaway SQLite database, no server needed
+"""
+
+import os
+import gzip
+import json
+import asyncio
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models import Base, User
+from message_writer import Turn, create_tables, write_turns
+from history import history_page, export_ndjson, export_filename, naive_utc, session_exists
+
+START = datetime(2026, 1, 5, 9, 0)
+TURNS = 130  # 260 messages in the long session
+ALICE = "alice@example.com"  # owns "long"
+BOB = "bob@example.com"      # owns "other" and his own, unrelated "long"
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+def populate(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    create_tables(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as db:
+        db.add_all([User(email=ALICE, hashed_password="-"), User(email=BOB, hashed_password="-")])
+        db.commit()
+        write_turns(db, [
+            Turn(session_id="long", message=f"question {i}", response=f"answer {i}", user=ALICE,
+                 timestamp=START + timedelta(minutes=i), responded_at=START + timedelta(minutes=i, seconds=1))
+            for i in range(TURNS)
+        ] + [
+            Turn(session_id="other", message="hello", response="hi", user=BOB,
+                 timestamp=START + timedelta(minutes=30), responded_at=START + timedelta(minutes=30, seconds=1)),
+            Turn(session_id="long", message="bob here", response="hi bob", user=BOB,
+                 timestamp=START + timedelta(days=1), responded_at=START + timedelta(days=1, seconds=1))
+        ])
+    with engine.connect() as connection:
+        plan = " ".join(str(row) for row in connection.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM messages WHERE session_id = 1 "
+            "AND (timestamp, id) < ('2026-01-05 10:00:00', 100) ORDER BY timestamp DESC, id DESC LIMIT 51"
+        )))
+    return plan
+
+
+async def exercise(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    queries, offsets = [], []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+        if "OFFSET" in statement:  # SQLite always renders LIMIT ? OFFSET ?
+            offsets.append(parameters[-1])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    SessionLocal = async_sessionmaker(engine)
+
+    print("\n1. KEYSET PAGINATION")
+    seen = []
+    cursor = None
+    pages = 0
+    async with SessionLocal() as db:
+        while True:
+            page = await history_page(db, "long", ALICE, limit=50, before=cursor)
+            pages += 1
+            seen = [m["text"] for m in page["messages"]] + seen
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        expected = [text for i in range(TURNS) for text in (f"question {i}", f"answer {i}")]
+        check(f"{pages} pages cover every message once, in order", seen == expected)
+        check("total_messages from the session row", page["total_messages"] == TURNS * 2)
+        check("every page starts at offset 0 (keyset, not OFFSET)", offsets and set(offsets) == {0})
+
+        try:
+            await history_page(db, "long", ALICE, before="not-a-cursor")
+            check("invalid cursor rejected", False)
+        except ValueError:
+            check("invalid cursor rejected", True)
+        check("unknown session returns None", await history_page(db, "missing", ALICE) is None)
+
+    print("\n2. STREAMING EXPORT")
+    queries.clear()
+    chunks = [chunk async for chunk in export_ndjson(SessionLocal, ALICE, session_id="long", batch_size=64)]
+    lines = b"".join(chunks).decode().splitlines()
+    check(f"session export streams {len(chunks)} chunks", len(chunks) > 1 and len(lines) == TURNS * 2)
+    check("one bounded query per batch", len([q for q in queries if "FROM messages" in q]) == -(-TURNS * 2 // 64))
+    check("oldest first", json.loads(lines[0])["text"] == "question 0")
+
+    since, until = START + timedelta(minutes=30), START + timedelta(minutes=31)
+    compressed = b"".join([chunk async for chunk in export_ndjson(SessionLocal, None, since=since, until=until, compress=True)])
+    rows = [json.loads(line) for line in gzip.decompress(compressed).decode().splitlines()]
+    check("gzip date-range export across sessions",
+          sorted(row["session_id"] for row in rows) == ["long", "long", "other", "other"])
+
+    aware = datetime(2026, 1, 5, 10, 30, tzinfo=timezone(timedelta(hours=1)))
+    check("aware range bounds become naive UTC", naive_utc(aware) == datetime(2026, 1, 5, 9, 30))
+    check("export filename keeps only [A-Za-z0-9_-]",
+          export_filename('a"; filename=x\r\n.sh', True) == "chat-export-a___filename_x___sh.ndjson.gz")
+
+    print("\n3. OWNERSHIP")
+    async with SessionLocal() as db:
+        check("another user cannot read the history", await history_page(db, "other", ALICE) is None)
+        check("another user's session does not exist for export",
+              not await session_exists(db, "other", ALICE) and await session_exists(db, "other", BOB))
+        bob_long = await history_page(db, "long", BOB)
+        check("a reused session_id is the caller's own conversation",
+              [m["text"] for m in bob_long["messages"]] == ["bob here", "hi bob"] and bob_long["total_messages"] == 2)
+    bob_export = b"".join([chunk async for chunk in export_ndjson(SessionLocal, BOB, session_id="long")])
+    check("session export holds none of the other account's messages", len(bob_export.decode().splitlines()) == 2)
+    mine = b"".join([chunk async for chunk in export_ndjson(SessionLocal, BOB, since=since, until=until)])
+    check("range export holds only the caller's sessions",
+          [json.loads(line)["session_id"] for line in mine.decode().splitlines()] == ["other", "other"])
+
+    await engine.dispose()
+
+
+def test_history():
+    print("=" * 60)
+    print("History & Export Test")
+    print("=" * 60)
+
+    path = os.path.join(tempfile.mkdtemp(), "history.db")
+    plan = populate(path)
+    print("\n0. INDEX")
+    check("pages are read through the (session_id, timestamp, id) index",
+          "ix_messages_session_timestamp_id" in plan)
+
+    asyncio.run(exercise(path))
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_history()
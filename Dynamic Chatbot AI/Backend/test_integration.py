@@ -1,9 +1,9 @@
 # test_integration.py
 """
-Integration test for NLP Service + OpenAI Service
+Integration test for NLP Pipeline + OpenAI Service
 """
 
-from nlp_service import NLPService
+from nlp_pipeline import NLPPipeline
 from openai_service import OpenAIService
 
 
@@ -14,7 +14,7 @@ def test_integration():
     
     # Initialize services
     print("\nInitializing services...")
-    nlp = NLPService()
+    nlp = NLPPipeline()
     ai = OpenAIService()
     
     # Test messages
@@ -50,14 +50,15 @@ def test_integration():
         print(f"User: {message}")
         
         # Step 1: NLP Processing
-        nlp_result = nlp.process_message(message)
+        nlp_result = nlp.analyze(message)
         print(f"\nNLP Analysis:")
         print(f"  Intent: {nlp_result['intent']} ({nlp_result['confidence']:.2f})")
         print(f"  Sentiment: {nlp_result['sentiment']} ({nlp_result['sentiment_score']:.2f})")
+        print(f"  Tier: {nlp_result['tier']} ({nlp_result['ms']}ms)")
         
         # FIXED: Handle entities printing properly
         if nlp_result['entities']:
-            entities_list = [f"{e['type']}:{e['text']}" for e in nlp_result['entities']]
+            entities_list = [f"{e['label']}:{e['text']}" for e in nlp_result['entities']]
             entities_str = ', '.join(entities_list)
             print(f"  Entities: {entities_str}")
         
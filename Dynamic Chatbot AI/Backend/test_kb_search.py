@@ -0,0 +1,68 @@
+# test_kb_search.py
+"""
+Test BM25 retrieval over the shipped knowledge base (knowledge/)
+Paraphrases should find their entry; questions that only share a word or two
+with an answer must fall through to the LLM.
+"""
+
+from knowledge_base import KnowledgeBase
+from kb_search import BM25Index, tokenize
+
+# question -> expected topic
+POSITIVE = {
+    "how do nets with many layers learn": "deep learning",
+    "what frameworks are used for deep nets": "deep learning",
+    "machine that learns from experience": "machine learning",
+    "tell me about pandas and numpy libraries": "python",
+    "which language is good for scripting and automation": "python",
+    "extract insights from data": "data science",
+    "what is named entity recognition and text summarization": "nlp",
+}
+
+# Each shares a term with some answer, but is not about that entry
+NEGATIVE = [
+    "can you write code for me",   # "write code" is in the chatgpt answer
+    "data structures in java",     # "data" / "structure" in neural network
+    "who built openai",            # "openai" in chatgpt
+    "how do i learn guitar",       # "learn" is a topic word, guitar is unknown
+    "what is the best food for a python snake",
+    "what is the weather like today",
+]
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+def test_kb_search():
+    print("=" * 60)
+    print("Knowledge Base Search Test")
+    print("=" * 60)
+
+    search = KnowledgeBase().index.search
+
+    print("\n1. PARAPHRASES ANSWERED FROM THE KB")
+    for question, topic in POSITIVE.items():
+        hit = search.best(question)
+        check(f"{question!r} -> {hit.topic if hit else None}", hit is not None and hit.topic == topic)
+
+    print("\n2. NEAR MISSES LEFT TO THE LLM")
+    for question in NEGATIVE:
+        top = search.search(question, limit=1)
+        detail = f"{top[0].topic} {top[0].confidence:.2f}" if top else "no hit"
+        check(f"{question!r} rejected (top: {detail})", search.best(question) is None)
+
+    print("\n3. HIT DETAILS")
+    index = BM25Index([("chatgpt", "can answer questions and write code"), ("python", "a programming language")])
+    hit = index.search("can you write code")[0]
+    check("coverage and matched terms", hit.coverage == 1.0 and hit.matched == 2 and not hit.topic_match)
+    check("two body terms without a topic word are not enough", not hit.accepted())
+    check("a topic word is", index.search("python language")[0].accepted())
+    check("stopwords ignored", tokenize("what is the python") == ["python"])
+    check("empty query", index.search("what is") == [] and index.best("what is") is None)
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_kb_search()
@@ -0,0 +1,67 @@
+# test_llm_cache.py
+"""
+Test the in-process completion cache (LRU, byte cap, TTL)
+No server or Redis needed
+"""
+
+import asyncio
+
+from llm_cache import MemoryCompletionCache, completion_key
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+async def exercise():
+    print("\n1. KEYS")
+    check("whitespace differences share a key",
+          completion_key("Hello   there\n", "llama3:8b") == completion_key("Hello there", "llama3:8b"))
+    check("model and options are part of the key",
+          len({completion_key("hi", "a"), completion_key("hi", "b"), completion_key("hi", "a", {"temperature": 0})}) == 3)
+
+    print("\n2. LRU")
+    cache = MemoryCompletionCache(max_entries=2, max_bytes=10_000, ttl=60)
+    await cache.set("a", "alpha")
+    await cache.set("b", "beta")
+    await cache.get("a")  # a is now the most recently used
+    await cache.set("c", "gamma")
+    check("least recently used entry evicted", await cache.get("b") is None and await cache.get("a") == "alpha")
+    stats = cache.stats()
+    check("evictions and hit ratio counted", stats["evictions"] == 1 and (stats["hits"], stats["misses"]) == (2, 1))
+
+    print("\n3. BYTE CAP")
+    cache = MemoryCompletionCache(max_entries=100, max_bytes=25, ttl=60)
+    await cache.set("k1", "x" * 10)  # 12 bytes with the key
+    await cache.set("k2", "y" * 10)
+    await cache.set("k3", "z" * 10)
+    check("bytes stay under max_bytes", cache.stats()["bytes_used"] <= 25 and await cache.get("k1") is None)
+    await cache.set("big", "w" * 100)
+    check("a value larger than the cap is not stored", await cache.get("big") is None and await cache.get("k3") == "z" * 10)
+
+    print("\n4. TTL")
+    cache = MemoryCompletionCache(max_entries=100, max_bytes=10_000, ttl=0.05)
+    await cache.set("old", "stale")
+    await asyncio.sleep(0.1)
+    check("expired entry is a miss", await cache.get("old") is None and cache.stats()["expired"] == 1)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    await asyncio.sleep(0.1)
+    await cache.set("c", "3")
+    stats = cache.stats()
+    check("expired entries dropped from the LRU end on insert", stats["entries"] == 1 and stats["expired"] == 3)
+    check("their bytes are released", stats["bytes_used"] == len("c") + len("3"))
+
+
+def test_llm_cache():
+    print("=" * 60)
+    print("Completion Cache Test")
+    print("=" * 60)
+
+    asyncio.run(exercise())
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_llm_cache()
@@ -0,0 +1,68 @@
+# test_llm_pool.py
+"""
+Test admission control in the LLM worker pool
+Blocking calls are simulated with time.sleep, no Ollama needed
+"""
+
+import time
+import asyncio
+
+from llm_pool import LLMWorkerPool, PoolSaturated
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+async def exercise():
+    print("\n1. CONCURRENCY")
+    pool = LLMWorkerPool(max_concurrency=2, max_queue=4, queue_timeout=5)
+    running, peak = 0, 0
+
+    def call(i):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        time.sleep(0.05)
+        running -= 1
+        return i
+
+    results = await asyncio.gather(*(pool.run(call, i) for i in range(6)))
+    check("every admitted call completes", results == list(range(6)) and pool.stats()["completed"] == 6)
+    check("at most max_concurrency calls run at once", peak <= 2)
+
+    print("\n2. SATURATION")
+    pool = LLMWorkerPool(max_concurrency=1, max_queue=1, queue_timeout=5)
+    calls = [asyncio.ensure_future(pool.run(time.sleep, 0.2)) for _ in range(3)]
+    outcomes = await asyncio.gather(*calls, return_exceptions=True)
+    rejected = [o for o in outcomes if isinstance(o, PoolSaturated)]
+    check("requests beyond workers + queue raise PoolSaturated", len(rejected) == 1)
+    check("rejection carries a Retry-After hint", rejected and rejected[0].retry_after > 0)
+    check("rejections are counted", pool.stats()["rejected"] == 1)
+
+    pool = LLMWorkerPool(max_concurrency=1, max_queue=4, queue_timeout=0.05)
+    outcomes = await asyncio.gather(pool.run(time.sleep, 0.3), pool.run(time.sleep, 0), return_exceptions=True)
+    check("a queued request gives up after queue_timeout",
+          isinstance(outcomes[1], PoolSaturated) and pool.stats()["timed_out"] == 1)
+
+    print("\n3. STREAMING")
+    pool = LLMWorkerPool(max_concurrency=1, max_queue=1)
+    tokens = [token async for token in pool.stream(iter(["a", "b", "c"]))]
+    check("blocking iterator consumed on a worker", tokens == ["a", "b", "c"])
+    check("slot released afterwards", pool.load() == 0.0)
+
+    pool.shutdown()
+
+
+def test_llm_pool():
+    print("=" * 60)
+    print("LLM Worker Pool Test")
+    print("=" * 60)
+
+    asyncio.run(exercise())
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_llm_pool()
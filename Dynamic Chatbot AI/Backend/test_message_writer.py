@@ -0,0 +1,194 @@
+# test_message_writer.py
+"""
+Test write-behind persistence of chat turns
+Runs against a throwaway SQLite database, no server needed
+"""
+
+import os
+import time
+import asyncio
+import tempfile
+
+from sqlalchemy import create_engine, func, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, User
+from model_database import Session as ChatSession, Message
+from message_writer import MessageWriter, Turn, create_tables
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+def make_database():
+    path = os.path.join(tempfile.mkdtemp(), "chat.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    create_tables(engine)
+    return sessionmaker(bind=engine)
+
+
+def turn(session_id, i, score=0.5):
+    return Turn(
+        session_id=session_id,
+        message=f"message {i}",
+        response=f"reply {i}",
+        user="ada@example.com",
+        intent="question",
+        confidence=0.8,
+        sentiment="positive" if score > 0 else "neutral",
+        sentiment_score=score,
+        entities=[{"text": "ada@example.com", "label": "EMAIL", "start": 0, "end": 15}],
+        response_time=40 + i,
+        model_used="llama3:8b"
+    )
+
+
+async def batching(SessionLocal):
+    print("\n1. BATCHED WRITES")
+    with SessionLocal() as db:
+        db.add(User(email="ada@example.com", hashed_password="x"))
+        db.commit()
+
+    writer = MessageWriter(SessionLocal, batch_size=50, flush_interval=0.05)
+    writer.start()
+    for i in range(120):
+        await writer.submit(turn("s1" if i % 2 else "s2", i, score=1.0 if i % 2 else 0.0))
+    await asyncio.sleep(0.3)
+    stats = writer.stats()
+    check(f"120 turns written in {stats['batches']} batches", stats["written"] == 120 and stats["batches"] <= 4)
+
+    with SessionLocal() as db:
+        messages = db.scalar(select(func.count()).select_from(Message))
+        s1 = db.scalars(select(ChatSession).where(ChatSession.session_id == "s1")).one()
+        user_id = db.scalar(select(User.id).where(User.email == "ada@example.com"))
+        first = db.scalars(select(Message).order_by(Message.id)).first()
+    check("two messages per turn", messages == 240)
+    check("session counters updated", s1.total_messages == 120)
+    check("avg_sentiment is the running mean", abs(s1.avg_sentiment - 1.0) < 1e-9)
+    check("new session linked to the user", s1.user_id == user_id)
+    check("NLP columns stored", first.intent == "question" and first.entities[0]["label"] == "EMAIL")
+
+    # Later batches keep the running mean across flushes
+    await writer.submit(turn("s1", 999, score=-1.0))
+    await writer.close()
+    with SessionLocal() as db:
+        s1 = db.scalars(select(ChatSession).where(ChatSession.session_id == "s1")).one()
+    check("close() flushes the queue", writer.stats()["written"] == 121)
+    check("running mean spans batches", abs(s1.avg_sentiment - 59 / 61) < 1e-9)
+    check("turns after close are dropped", not await writer.submit(turn("s1", 1000)))
+
+
+async def queue_policies(SessionLocal):
+    print("\n2. QUEUE POLICIES")
+    # Not started, so nothing drains the queue
+    writer = MessageWriter(SessionLocal, queue_size=5, policy="drop")
+    results = [await writer.submit(turn("s3", i)) for i in range(8)]
+    check("drop policy rejects turns beyond the queue size", results.count(False) == 3)
+    check("drops are counted", writer.stats()["dropped"] == 3)
+    await writer.close()
+    check("queued turns are written on close", writer.stats()["written"] == 5)
+
+    writer = MessageWriter(SessionLocal, queue_size=2, policy="block", block_timeout=0.05)
+    results = [await writer.submit(turn("s4", i)) for i in range(3)]
+    check("block policy waits, then drops", results == [True, True, False])
+    await writer.close()
+
+
+async def failures(SessionLocal):
+    print("\n3. FAILURES")
+    # No tables in this database, so every write fails
+    broken = sessionmaker(bind=create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'empty.db')}"))
+    writer = MessageWriter(broken, batch_size=10)
+    writer.start()
+    for i in range(3):
+        await writer.submit(turn("s5", i))
+    await writer.close()
+    stats = writer.stats()
+    check("failed batches are counted", (stats["failed_turns"], stats["failed_batches"], stats["written"]) == (3, 1, 0))
+
+    # Writer task gone and queue full: close() must still return within its timeout
+    writer = MessageWriter(SessionLocal, queue_size=2)
+    writer.start()
+    writer._task.cancel()
+    await asyncio.sleep(0)
+    for i in range(2):
+        await writer.submit(turn("s6", i))
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await writer.close(timeout=0.2)
+    check("close() gives up after its timeout", loop.time() - start < 1.0)
+    check("unwritten turns are counted as dropped", writer.stats()["dropped"] == 2)
+
+    # A batch still writing when the timeout expires must not hold up the event loop
+    def slow_session():
+        time.sleep(1.0)
+        return SessionLocal()
+
+    writer = MessageWriter(slow_session, batch_size=1, flush_interval=0)
+    writer.start()
+    await writer.submit(turn("s7", 0))
+    await asyncio.sleep(0.05)  # the write is now running on the writer thread
+    start = loop.time()
+    await writer.close(timeout=0.2)
+    check("close() does not wait for an in-flight write after its timeout", loop.time() - start < 0.6)
+
+
+async def accounts(SessionLocal):
+    print("\n4. SESSIONS PER ACCOUNT")
+    with SessionLocal() as db:
+        db.add(User(email="bob@example.com", hashed_password="x"))
+        db.commit()
+    # Bob reuses Ada's session_id, in the same batch as one of Ada's turns
+    writer = MessageWriter(SessionLocal, batch_size=10)
+    await writer.submit(turn("s1", 2000)._replace(user="bob@example.com"))
+    await writer.submit(turn("s1", 2001))
+    await writer.close()
+
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(User.email, ChatSession.total_messages, ChatSession.id)
+            .join(User, User.id == ChatSession.user_id)
+            .where(ChatSession.session_id == "s1")
+        ).all()
+        owners = {email: (total, pk) for email, total, pk in rows}
+        bob_messages = db.scalars(
+            select(Message.message_text).where(Message.session_id == owners["bob@example.com"][1])
+        ).all()
+    check("same session_id from two accounts is two sessions", sorted(owners) == ["ada@example.com", "bob@example.com"])
+    check("the other account's turn is not counted in Ada's session", owners["ada@example.com"][0] == 124)
+    check("Bob's turn is stored in Bob's session", bob_messages == ["message 2000", "reply 2000"])
+
+    # Databases created before sessions were scoped per account
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE sessions (id INTEGER PRIMARY KEY, session_id VARCHAR(100) NOT NULL, user_id INTEGER, "
+            "started_at DATETIME NOT NULL, ended_at DATETIME, last_activity DATETIME, total_messages INTEGER, "
+            "avg_sentiment FLOAT, is_active BOOLEAN)"
+        ))
+        connection.execute(text("CREATE UNIQUE INDEX ix_sessions_session_id ON sessions (session_id)"))
+    create_tables(engine)
+    indexes = {index["name"]: bool(index["unique"]) for index in inspect(engine).get_indexes("sessions")}
+    check("legacy unique session_id index replaced",
+          indexes.get("ix_sessions_session_id") is False and indexes.get("ux_sessions_user_session") is True)
+
+
+def test_message_writer():
+    print("=" * 60)
+    print("Message Writer Test")
+    print("=" * 60)
+
+    SessionLocal = make_database()
+    asyncio.run(batching(SessionLocal))
+    asyncio.run(queue_policies(SessionLocal))
+    asyncio.run(failures(SessionLocal))
+    asyncio.run(accounts(SessionLocal))
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_message_writer()
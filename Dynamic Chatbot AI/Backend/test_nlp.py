@@ -15,7 +15,8 @@ def test_nlp():
         ("Goodbye", "farewell"),
         ("Book a table", "booking"),
         ("This is broken", "complaint"),
-        ("Thank you", "thanks")
+        ("Thank you", "thanks"),
+        ("I know what this is", "question")  # no "hi" in "this", no "no" in "know"
     ]
     
     for text, expected in test_intents:
@@ -53,6 +54,91 @@ def test_nlp():
         for ent in entities:
             print(f"   → {ent['type']}: {ent['text']}")
     
+    # Test 4: Batch Processing
+    print("\n4. BATCH PROCESSING TEST")
+    print("-" * 50)
+    batch_texts = [text for text, _ in test_intents] + test_entities
+    batch_results = nlp.process_batch(batch_texts, batch_size=4)
+    same = batch_results == [nlp.process_message(text) for text in batch_texts]
+    status = "✓" if same else "✗"
+    print(f"{status} process_batch matches process_message for {len(batch_texts)} texts (in order)")
+    
+    consumed = []
+    def generated():
+        for i in range(1000):
+            consumed.append(i)
+            yield f"message number {i}"
+    first = next(nlp.iter_batch(generated(), batch_size=8))
+    status = "✓" if first['original_text'] == "message number 0" and len(consumed) <= 16 else "✗"
+    print(f"{status} iter_batch streams: first result after reading {len(consumed)} of 1000 texts")
+    
+    # Test 5: Trained Intent Classifier
+    print("\n5. INTENT CLASSIFIER TEST")
+    print("-" * 50)
+    import os
+    import tempfile
+    from intent_classifier import IntentClassifier
+    
+    training = [
+        ("hello there", "greeting"), ("hi how are you", "greeting"), ("good morning", "greeting"),
+        ("book a table for two", "booking"), ("reserve a room", "booking"), ("schedule a meeting", "booking"),
+        ("thank you so much", "thanks"), ("thanks a lot", "thanks"), ("i appreciate it", "thanks")
+    ]
+    classifier = IntentClassifier.fit([t for t, _ in training], [i for _, i in training])
+    path = os.path.join(tempfile.mkdtemp(), "intent_model.npz")
+    classifier.save(path)
+    loaded = IntentClassifier.load(path)
+    
+    for text, expected in [("hello again", "greeting"), ("please book a room", "booking"), ("thanks", "thanks")]:
+        intent, prob = loaded.predict(text)
+        status = "✓" if intent == expected else "✗"
+        print(f"{status} '{text}' → {intent} ({prob:.2f})")
+    
+    batch = [text for text, _ in training]
+    same = loaded.predict_batch(batch) == [loaded.predict(text) for text in batch]
+    print(f"{'✓' if same else '✗'} predict_batch matches predict after save/load")
+    
+    # Test 6: Tiered Pipeline
+    print("\n6. TIERED PIPELINE TEST")
+    print("-" * 50)
+    from nlp_pipeline import NLPPipeline, FAST, BALANCED, FULL
+    
+    pipeline = NLPPipeline(service=nlp)
+    text = "Book a table for tomorrow at 7pm, my email is test@example.com"
+    result = pipeline.analyze(text, FAST)
+    labels = [e['label'] for e in result['entities']]
+    status = "✓" if result['tier'] == FAST and result['intent'] == "booking" and "EMAIL" in labels else "✗"
+    print(f"{status} fast tier → {result['intent']}, {result['sentiment']}, {labels} ({result['ms']}ms)")
+    
+    for tier in (BALANCED, FULL):
+        result = pipeline.analyze(text, tier)
+        # Until spaCy has loaded (or when the model is missing), heavier tiers are served by the fast tier
+        expected = tier if nlp.nlp_ready else FAST
+        status = "✓" if result['tier'] == expected else "✗"
+        print(f"{status} {tier} tier requested → ran {result['tier']} (spaCy ready: {nlp.nlp_ready})")
+    if nlp.nlp_failed:
+        status = "✓" if pipeline.stats()['spacy_unavailable'] == 2 else "✗"
+        print(f"{status} missing spaCy model reported as unavailable, not ready")
+    
+    from nlp_pipeline import TIER_BUDGETS_MS, NLP_BUDGET_PROBE
+    slow = NLPPipeline(service=nlp)
+    slow._record(FULL, 1, TIER_BUDGETS_MS[FULL] * 2 / 1000)  # one analysis at twice the budget
+    skipped = sum(slow._over_budget_now(FULL) for _ in range(NLP_BUDGET_PROBE))
+    status = "✓" if skipped == NLP_BUDGET_PROBE - 1 else "✗"
+    print(f"{status} full tier over budget: skipped {skipped} of {NLP_BUDGET_PROBE} requests, the rest probe it")
+    for _ in range(4):
+        slow._record(FULL, 1, 0.0)
+    status = "✓" if not slow._over_budget_now(FULL) else "✗"
+    print(f"{status} full tier back within budget after fast runs")
+    
+    overloaded = NLPPipeline(service=nlp, load_signal=lambda: 1.0)
+    status = "✓" if overloaded.analyze(text, FULL)['tier'] == FAST else "✗"
+    print(f"{status} full tier degrades to fast at full load")
+    
+    batch = pipeline.analyze_batch(batch_texts, FAST)
+    same = [r['intent'] for r in batch] == [pipeline.analyze(t, FAST)['intent'] for t in batch_texts]
+    print(f"{'✓' if same else '✗'} analyze_batch matches analyze for {len(batch_texts)} texts")
+    
     print("\n" + "=" * 50)
     print("✓ All tests complete!")
 
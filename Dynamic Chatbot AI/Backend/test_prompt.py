@@ -0,0 +1,48 @@
+# test_prompt.py
+"""
+Test that the LLM prompt keeps the session profile in long conversations
+"""
+
+import asyncio
+
+from main import build_prompt, PROMPT_HISTORY
+from session_store import InMemorySessionStore
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+async def conversation(store, session, exchanges):
+    await store.append(session, "system", "name:Ada")
+    await store.append(session, "system", "fact:i like python")
+    for i in range(exchanges):
+        await store.append(session, "user", f"question {i}")
+        await store.append(session, "assistant", f"answer {i}")
+    return await store.get_history(session)
+
+
+def test_prompt():
+    print("=" * 60)
+    print("Prompt Builder Test")
+    print("=" * 60)
+
+    store = InMemorySessionStore()
+    session = "prompt_session"
+    exchanges = PROMPT_HISTORY // 2 + 2  # more than the prompt carries
+    history = asyncio.run(conversation(store, session, exchanges))
+
+    prompt = build_prompt(history, "what was my name again?")
+
+    print(f"\n1. AFTER {exchanges} EXCHANGES")
+    check("name still in the prompt", "System: name:Ada" in prompt)
+    check("facts still in the prompt", "System: fact:i like python" in prompt)
+    check("latest turns kept", f"Assistant: answer {exchanges - 1}" in prompt)
+    check("older turns cut", "question 0" not in prompt and "question 1\n" not in prompt)
+    check(f"{PROMPT_HISTORY} turn entries", prompt.count("User: question") + prompt.count("Assistant: answer") == PROMPT_HISTORY)
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_prompt()
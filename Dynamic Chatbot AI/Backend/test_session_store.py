@@ -0,0 +1,127 @@
+# test_session_store.py
+"""
+Test the session memory backends
+The Redis backend runs against fakeredis when it is installed, else REDIS_URL
+(skipped when neither is available)
+"""
+
+import os
+import asyncio
+from session_store import InMemorySessionStore, RedisSessionStore
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+async def exercise(store):
+    session = "test_store_session"
+    await store.delete(session)
+
+    await store.append(session, "system", "name:Ada")
+    for i in range(store.max_turns + 5):
+        await store.append(session, "user", f"message {i}")
+    await store.append(session, "system", "fact:i like python")
+
+    history = await store.get_history(session)
+    facts = [e["content"] for e in history if e["role"] == "system"]
+    turns = [e for e in history if e["role"] != "system"]
+
+    check("system facts survive turn trimming", facts == ["name:Ada", "fact:i like python"])
+    check("turns are capped", len(turns) == store.max_turns)
+    check("newest turn kept", turns[-1]["content"] == f"message {store.max_turns + 4}")
+
+    await store.append(session, "system", "name:Ada")
+    facts = [e["content"] for e in await store.get_history(session) if e["role"] == "system"]
+    check("re-stated fact moves to the end", facts == ["fact:i like python", "name:Ada"])
+
+    await store.append(session, "system", "name:Grace")
+    await store.append(session, "system", "pref:short_answers")
+    profile = await store.get_profile(session)
+    check("profile tracks the latest name", profile["name"] == "Grace")
+    check("profile tracks facts", profile["facts"] == ["i like python"])
+    check("profile tracks preferences", await store.has_preference(session, "short_answers"))
+
+    await store.delete(session)
+    check("delete clears the session", await store.get_history(session) == [])
+    check("delete clears the profile", (await store.get_profile(session))["name"] is None)
+    print(f"  stats: {await store.stats()}")
+
+
+async def fact_limit_history(store):
+    """Past max_facts the oldest plain fact goes first; names and preferences stay"""
+    session = "test_fact_limit"
+    await store.delete(session)
+    await store.append(session, "system", "name:Ada")
+    await store.append(session, "system", "pref:short_answers")
+    for i in range(store.max_facts + 2):
+        await store.append(session, "system", f"fact:i like topic {i}")
+    history = await store.get_history(session)
+    profile = await store.get_profile(session)
+    await store.delete(session)
+    return history, profile
+
+
+async def exercise_limits(store):
+    history, profile = await fact_limit_history(store)
+    contents = [e["content"] for e in history]
+    check("name and preference survive the fact limit", contents[:2] == ["name:Ada", "pref:short_answers"])
+    check("oldest facts dropped first", len(contents) == store.max_facts and "fact:i like topic 0" not in contents)
+    check("profile facts follow the trimmed list", profile["facts"] == [c[len("fact:"):] for c in contents[2:]])
+
+    session = "test_long_message"
+    await store.append(session, "user", "é" * store.max_entry_bytes)
+    stored = (await store.get_history(session))[0]["content"]
+    check("long messages are truncated", len(stored.encode("utf-8")) <= store.max_entry_bytes and set(stored) == {"é"})
+    await store.delete(session)
+
+    await store.get_history("test_never_written")
+    stats = await store.stats()
+    check("reading a missing session does not create it", stats["sessions"] == 0)
+    return history
+
+
+async def redis_client():
+    """fakeredis when installed, else REDIS_URL; None when neither is reachable"""
+    try:
+        import fakeredis
+        return fakeredis.FakeAsyncRedis(decode_responses=True)
+    except ImportError:
+        pass
+    import redis.asyncio as aioredis
+    client = aioredis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+    try:
+        await client.ping()
+    except Exception:
+        return None
+    return client
+
+
+async def run_tests():
+    print("\n1. In-memory backend")
+    await exercise(InMemorySessionStore(max_turns=10))
+    memory_history = await exercise_limits(InMemorySessionStore(max_facts=5))
+    capped = InMemorySessionStore(max_bytes=1000)
+    await capped.append("only", "user", "x" * 2000)
+    check("one session over max_bytes is evicted too", (await capped.stats())["bytes"] <= 1000)
+
+    print("\n2. Redis backend")
+    client = await redis_client()
+    if client is None:
+        print("  - skipped: install fakeredis or start Redis at REDIS_URL")
+        return
+    await exercise(RedisSessionStore(max_turns=10, client=client))
+    redis_history = await exercise_limits(RedisSessionStore(max_facts=5, client=client))
+    check("same history as the in-memory backend", redis_history == memory_history)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Session Store Tests")
+    print("=" * 60)
+
+    asyncio.run(run_tests())
+
+    print("\n" + "=" * 60)
+    print("✓ Session store tests complete!")
+    print("=" * 60)
@@ -0,0 +1,65 @@
+# test_singleflight.py
+"""
+Test single-flight coalescing of identical in-flight calls
+No server needed
+"""
+
+import asyncio
+
+from singleflight import SingleFlight
+
+
+def check(label, condition):
+    print(f"  {'✓' if condition else '✗'} {label}")
+
+
+async def exercise():
+    print("\n1. COALESCING")
+    flight = SingleFlight()
+    executions = 0
+
+    async def work():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    results = await asyncio.gather(*(flight.do("same", work) for _ in range(5)))
+    stats = flight.stats()
+    check("five concurrent callers, one execution", executions == 1 and results == ["answer"] * 5)
+    check("followers counted as coalesced", (stats["calls"], stats["coalesced"], stats["in_flight"]) == (5, 4, 0))
+
+    await asyncio.gather(flight.do("a", work), flight.do("b", work))
+    check("different keys run separately", executions == 3)
+    await flight.do("same", work)
+    check("a finished key runs again", executions == 4)
+
+    print("\n2. ERRORS AND CANCELLATION")
+
+    async def fail():
+        await asyncio.sleep(0.02)
+        raise ValueError("boom")
+
+    outcomes = await asyncio.gather(flight.do("bad", fail), flight.do("bad", fail), return_exceptions=True)
+    check("every caller sees the shared error", all(isinstance(o, ValueError) for o in outcomes))
+
+    leader = asyncio.ensure_future(flight.do("slow", work))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.do("slow", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+    check("a cancelled caller does not cancel the work for others", await follower == "answer")
+
+
+def test_singleflight():
+    print("=" * 60)
+    print("Single-Flight Test")
+    print("=" * 60)
+
+    asyncio.run(exercise())
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    test_singleflight()
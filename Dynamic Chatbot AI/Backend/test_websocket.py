@@ -0,0 +1,58 @@
+# test_websocket.py
+"""Test the multiplexed WebSocket chat endpoint (server must be running)"""
+import os
+import json
+import asyncio
+import websockets
+
+WS_URL = "ws://localhost:8000/ws/chat"
+TOKEN = os.getenv("CHATBOT_TOKEN", "")
+
+
+async def test_websocket():
+    print("\n1. Connecting and authenticating...")
+    async with websockets.connect(f"{WS_URL}?token={TOKEN}") as ws:
+        ready = json.loads(await ws.recv())
+        print(f"Handshake: {ready}")
+        if ready.get("type") != "ready":
+            return
+
+        print("\n2. Sending two sessions over one socket...")
+        turns = [
+            {"session_id": "ws_session_a", "message": "My name is Ada", "request_id": 1},
+            {"session_id": "ws_session_b", "message": "What is deep learning?", "request_id": 2},
+            {"session_id": "ws_session_a", "message": "What is my name?", "request_id": 3},
+        ]
+        for turn in turns:
+            await ws.send(json.dumps(turn))
+
+        replies = {turn["request_id"]: "" for turn in turns}
+        done = 0
+        while done < len(turns):
+            frame = json.loads(await ws.recv())
+            if frame["type"] == "token":
+                replies[frame["request_id"]] += frame["text"]
+            elif frame["type"] == "done":
+                done += 1
+                print(f"  [{frame['session_id']}#{frame['request_id']}] done in {frame['response_time']}ms")
+            elif frame["type"] == "error":
+                print(f"  ✗ {frame}")
+                done += 1
+
+        for request_id, text in replies.items():
+            print(f"  #{request_id}: {text[:60]}...")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("WebSocket Chat Test")
+    print("=" * 60)
+
+    try:
+        asyncio.run(test_websocket())
+        print("\n" + "=" * 60)
+        print("✓ WebSocket test completed!")
+        print("=" * 60)
+    except OSError:
+        print("\n✗ Error: Cannot connect to WebSocket")
+        print("Make sure the server is running: python main.py")
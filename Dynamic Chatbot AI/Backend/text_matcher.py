@@ -0,0 +1,155 @@
+# text_matcher.py
+"""
+Multi-pattern text matching for Dynamic AI Chatbot
+Aho-Corasick automaton: finds every occurrence of thousands of patterns in a
+single left-to-right pass over the text, with optional word-boundary checks
+"""
+
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+# Boundary modes
+ANY = "any"        # plain substring, like `pattern in text`
+WORD = "word"      # whole word(s): no letter/digit right before or after
+PREFIX = "prefix"  # word start only: "thank" matches "thanks", not "unthank"
+
+# Transition keys pack (state, character) into one int: state << 21 | ord(ch)
+_CHAR_BITS = 21
+
+
+class Match(NamedTuple):
+    start: int
+    end: int
+    pattern: str
+    payload: Any
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over characters
+    Usage:
+        matcher = AhoCorasick()
+        matcher.add("deep learning", payload="topic", boundary=WORD)
+        matcher.build()
+        matcher.find_all("what is deep learning?")
+    Matching is case-sensitive; lowercase both patterns and text for
+    case-insensitive use.
+    """
+
+    def __init__(self):
+        self._goto: Dict[int, int] = {}
+        self._fail: List[int] = [0]
+        self._depth: List[int] = [0]
+        self._outputs: Dict[int, List[int]] = {}  # state -> ids of patterns ending there
+        self._output_link: List[int] = [0]        # nearest proper suffix state with outputs
+        self._patterns: List[tuple] = []          # id -> (pattern, payload, boundary)
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    @property
+    def states(self) -> int:
+        return len(self._fail)
+
+    def add(self, pattern: str, payload: Any = None, boundary: str = WORD):
+        """Register a pattern; call build() once all patterns are added"""
+        if not pattern:
+            raise ValueError("Pattern must be a non-empty string")
+
+        state = 0
+        for ch in pattern:
+            key = state << _CHAR_BITS | ord(ch)
+            nxt = self._goto.get(key)
+            if nxt is None:
+                nxt = len(self._fail)
+                self._goto[key] = nxt
+                self._fail.append(0)
+                self._depth.append(self._depth[state] + 1)
+                self._output_link.append(0)
+            state = nxt
+
+        self._outputs.setdefault(state, []).append(len(self._patterns))
+        self._patterns.append((pattern, payload, boundary))
+        self._built = False
+
+    def build(self):
+        """Compute failure and output links (breadth-first over the trie)"""
+        mask = (1 << _CHAR_BITS) - 1
+        edges = sorted(
+            ((key >> _CHAR_BITS, key & mask, child) for key, child in self._goto.items()),
+            key=lambda edge: self._depth[edge[2]]
+        )
+
+        goto, fail, outputs, output_link = self._goto, self._fail, self._outputs, self._output_link
+        for parent, code, child in edges:
+            if parent == 0:
+                fail[child] = 0
+            else:
+                state = fail[parent]
+                while True:
+                    nxt = goto.get(state << _CHAR_BITS | code)
+                    if nxt is not None:
+                        fail[child] = nxt
+                        break
+                    if state == 0:
+                        fail[child] = 0
+                        break
+                    state = fail[state]
+
+            suffix = fail[child]
+            output_link[child] = suffix if suffix in outputs else output_link[suffix]
+
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Match]:
+        """Yield every (boundary-respecting) match in order of end position"""
+        if not self._built:
+            self.build()
+
+        goto, fail, outputs, output_link = self._goto, self._fail, self._outputs, self._output_link
+        patterns = self._patterns
+        length = len(text)
+        state = 0
+
+        for i, ch in enumerate(text):
+            code = ord(ch)
+            while True:
+                nxt = goto.get(state << _CHAR_BITS | code)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+
+            hit = state if state in outputs else output_link[state]
+            while hit:
+                for pattern_id in outputs[hit]:
+                    pattern, payload, boundary = patterns[pattern_id]
+                    start = i - len(pattern) + 1
+                    if boundary != ANY:
+                        if start > 0 and _is_word_char(pattern[0]) and _is_word_char(text[start - 1]):
+                            continue
+                        if (boundary == WORD and i + 1 < length
+                                and _is_word_char(pattern[-1]) and _is_word_char(text[i + 1])):
+                            continue
+                    yield Match(start, i + 1, pattern, payload)
+                hit = output_link[hit]
+
+    def find_all(self, text: str) -> List[Match]:
+        return list(self.iter_matches(text))
+
+    def first_payloads(self, text: str) -> Dict[Any, Match]:
+        """Map each payload to its first match (handy for 'which groups hit?')"""
+        found: Dict[Any, Match] = {}
+        for match in self.iter_matches(text):
+            found.setdefault(match.payload, match)
+        return found
+
+    def search(self, text: str) -> Optional[Match]:
+        """First match by end position, or None"""
+        return next(self.iter_matches(text), None)